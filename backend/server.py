@@ -1,18 +1,44 @@
-from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from storage import MongoStorage, SQLiteStorage, Storage
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, TypeAdapter, model_validator
+from typing import Awaitable, Callable, Dict, List, Literal, Optional, Union
 import uuid
 from datetime import datetime, timezone, timedelta
 import httpx
 from bs4 import BeautifulSoup
 import asyncio
+import contextvars
+import cProfile
+import fcntl
+import gzip
+import hashlib
+import ipaddress
+import json
+import multiprocessing
+import pstats
+import random
+import re
+import socket
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from xml.sax.saxutils import escape
+import aiofiles
+import brotli
+from PIL import Image, ImageOps, UnidentifiedImageError
 import paypalrestsdk
 import jwt
 import bcrypt
@@ -20,17 +46,81 @@ import bcrypt
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
-# PayPal Configuration
-paypalrestsdk.configure({
-    "mode": os.environ.get('PAYPAL_MODE', 'sandbox'),
-    "client_id": os.environ.get('PAYPAL_CLIENT_ID', ''),
-    "client_secret": os.environ.get('PAYPAL_SECRET', '')
-})
+# Storage: MongoDB by default, or an embedded SQLite file for single-process
+# deployments (STORAGE_BACKEND=sqlite). The storage connection, the shared
+# HTTP client and the image pool are created per worker in startup_event so
+# pre-forked workers never share sockets or threads created in the parent.
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo')
+SQLITE_PATH = os.environ.get('SQLITE_PATH', str(ROOT_DIR / 'funsomex.db'))
+if STORAGE_BACKEND == 'mongo':
+    mongo_url = os.environ['MONGO_URL']
+    DB_NAME = os.environ['DB_NAME']
+elif STORAGE_BACKEND != 'sqlite':
+    raise ValueError("STORAGE_BACKEND must be 'mongo' or 'sqlite'")
+storage: Optional[Storage] = None
+http_client: Optional[httpx.AsyncClient] = None
+
+# Number of worker processes (uvicorn --workers); above 1, in-process caches
+# are kept in sync through the database
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', '1'))
+if STORAGE_BACKEND == 'sqlite' and WEB_CONCURRENCY > 1:
+    raise ValueError("STORAGE_BACKEND=sqlite runs a single worker; set WEB_CONCURRENCY=1")
+
+def create_storage() -> Storage:
+    retention = timedelta(days=EXTERNAL_NEWS_RETENTION_DAYS)
+    if STORAGE_BACKEND == 'sqlite':
+        return SQLiteStorage(SQLITE_PATH, retention)
+    return MongoStorage(mongo_url, DB_NAME, retention)
+
+def configure_paypal():
+    options = {
+        "mode": os.environ.get('PAYPAL_MODE', 'sandbox'),
+        "client_id": os.environ.get('PAYPAL_CLIENT_ID', ''),
+        "client_secret": os.environ.get('PAYPAL_SECRET', '')
+    }
+    # Points the SDK at another PayPal API, e.g. a local mock in tests
+    if os.environ.get('PAYPAL_API_URL'):
+        options["endpoint"] = os.environ['PAYPAL_API_URL']
+    paypalrestsdk.configure(options)
+
+def get_http_client() -> httpx.AsyncClient:
+    global http_client
+    if http_client is None:
+        hooks = {"request": [http_request_started], "response": [http_response_received]} if PROFILING else None
+        http_client = httpx.AsyncClient(timeout=15.0, follow_redirects=True, event_hooks=hooks)
+    return http_client
+
+def _is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+async def _host_is_public(hostname: str) -> bool:
+    """Whether every address of ``hostname`` is public: not private, loopback, link-local or reserved"""
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(hostname, None, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        return False
+    return bool(infos) and all(_is_public_address(info[4][0]) for info in infos)
+
+async def _open_public_url(url: str, headers: dict, timeout: float, max_redirects: int) -> httpx.Response:
+    """Start streaming a third-party URL, checking the host of every redirect hop.
+
+    Returns the last response, still a redirect when they run out; the caller
+    closes it. Raises ValueError when a hop is not a public http(s) URL.
+    """
+    client_http = get_http_client()
+    for hop in range(max_redirects + 1):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname or not await _host_is_public(parts.hostname):
+            raise ValueError(f"Not a public URL: {url}")
+        request = client_http.build_request("GET", url, headers=headers, timeout=timeout)
+        response = await client_http.send(request, stream=True, follow_redirects=False)
+        if not response.is_redirect or hop == max_redirects:
+            return response
+        await response.aclose()
+        url = urljoin(url, response.headers.get("location", ""))
 
 # JWT Configuration
 JWT_SECRET = os.environ.get('JWT_SECRET')
@@ -64,9 +154,12 @@ def create_token(email: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-def verify_token(token: str) -> Optional[str]:
+def verify_token(token: str, purpose: Optional[str] = None) -> Optional[str]:
+    """Admin email from a token; single-purpose tokens only verify for their purpose"""
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        if payload.get("purpose") != purpose:
+            return None
         return payload.get("sub")
     except jwt.ExpiredSignatureError:
         return None
@@ -83,6 +176,41 @@ async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(
 
 # ============== MODELS ==============
 
+SUMMARY_LENGTH = 200
+
+def make_summary(text: str, length: int = SUMMARY_LENGTH) -> str:
+    """Plain-text excerpt cut at a word boundary, stored for list cards"""
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text.rfind(" ", 0, length)
+    return text[:cut if cut > length // 2 else length].rstrip(" ,.;:") + "…"
+
+def refresh_summary(fields: dict, source_field: str) -> dict:
+    """Regenerate the summary of an update that changes its source text"""
+    if fields.get(source_field) and not fields.get("summary"):
+        fields["summary"] = make_summary(fields[source_field])
+    return fields
+
+def card_fields(model) -> List[str]:
+    """Fields to load for a card model"""
+    return list(model.model_fields)
+
+# ``view=card`` list responses use the slim *Card models and projections
+ListView = Literal["card", "full"]
+_list_adapters: Dict[type, TypeAdapter] = {}
+
+def list_response(model, items: List[dict]) -> Response:
+    """Serialize a list view with the model of that view only.
+
+    A Union response_model would quietly fall back to the card model when a
+    full document fails validation; here that is an error instead.
+    """
+    adapter = _list_adapters.get(model)
+    if adapter is None:
+        adapter = _list_adapters[model] = TypeAdapter(List[model])
+    return Response(adapter.dump_json(adapter.validate_python(items)), media_type="application/json")
+
 class NewsArticle(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -97,6 +225,22 @@ class NewsArticle(BaseModel):
     is_external: bool = False
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+    @model_validator(mode="after")
+    def fill_summary(self):
+        if not self.summary:
+            self.summary = make_summary(self.content)
+        return self
+
+class NewsCard(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    title: str
+    summary: Optional[str] = None
+    image_url: Optional[str] = None
+    source: str = "FUNSOMEX"
+    category: str = "general"
+    published_date: datetime
+
 class NewsCreate(BaseModel):
     title: str
     content: str
@@ -131,17 +275,43 @@ class TeamMemberCreate(BaseModel):
     linkedin: Optional[str] = None
     order: int = 0
 
+class TeamMemberUpdate(BaseModel):
+    name: Optional[str] = None
+    role: Optional[str] = None
+    bio: Optional[str] = None
+    image_url: Optional[str] = None
+    email: Optional[str] = None
+    linkedin: Optional[str] = None
+    order: Optional[int] = None
+
 class Project(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
     description: str
+    summary: Optional[str] = None
     image_url: str
     category: str
     location: Optional[str] = None
     year: Optional[int] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+    @model_validator(mode="after")
+    def fill_summary(self):
+        if not self.summary:
+            self.summary = make_summary(self.description)
+        return self
+
+class ProjectCard(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    title: str
+    summary: Optional[str] = None
+    image_url: str
+    category: str
+    location: Optional[str] = None
+    year: Optional[int] = None
+
 class ProjectCreate(BaseModel):
     title: str
     description: str
@@ -150,6 +320,14 @@ class ProjectCreate(BaseModel):
     location: Optional[str] = None
     year: Optional[int] = None
 
+class ProjectUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    image_url: Optional[str] = None
+    category: Optional[str] = None
+    location: Optional[str] = None
+    year: Optional[int] = None
+
 class ContactMessage(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -173,6 +351,25 @@ class ExternalNews(BaseModel):
     url: str
     source: str
     date: Optional[str] = None
+    first_seen: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Filled in from the article page by the enrichment job
+    summary: Optional[str] = None
+    image_url: Optional[str] = None
+    published_at: Optional[datetime] = None
+
+class ExternalNewsCard(BaseModel):
+    title: str
+    url: str
+    source: str
+    date: Optional[str] = None
+    first_seen: Optional[datetime] = None
+    summary: Optional[str] = None
+    image_url: Optional[str] = None
+    published_at: Optional[datetime] = None
+
+class ExternalNewsPage(BaseModel):
+    items: List[dict]
+    next_cursor: Optional[str] = None
 
 class LoginRequest(BaseModel):
     email: str
@@ -203,6 +400,333 @@ async def verify_auth(admin: str = Depends(get_current_admin)):
     """Verify if token is valid"""
     return {"valid": True, "email": admin}
 
+# ============== CACHE VERSIONS ==============
+
+CACHE_SYNC_SECONDS = float(os.environ.get('CACHE_SYNC_SECONDS', '2'))
+
+# Bumped on every write so derived caches can be keyed by data version. The
+# counters live in the cache_versions collection; each worker keeps a local
+# copy that it refreshes every CACHE_SYNC_SECONDS when running multi-worker.
+collection_versions: Dict[str, int] = {}
+
+async def mark_collection_changed(*names: str):
+    for name in names:
+        version = await storage.bump_version(name)
+        collection_versions[name] = max(collection_versions.get(name, 0), version)
+
+async def sync_collection_versions():
+    for name, version in (await storage.load_versions()).items():
+        if version > collection_versions.get(name, 0):
+            collection_versions[name] = version
+
+async def run_cache_sync():
+    while True:
+        await asyncio.sleep(CACHE_SYNC_SECONDS)
+        try:
+            await sync_collection_versions()
+        except Exception as e:
+            logger.warning(f"Cache version sync failed: {e}")
+
+async def _coalesce(inflight: Dict[str, asyncio.Future], key: str, factory):
+    """Run ``factory()`` once per key of ``inflight``; concurrent callers await the same result"""
+    future = inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(factory())
+        inflight[key] = future
+        future.add_done_callback(lambda _: inflight.pop(key, None))
+    return await asyncio.shield(future)
+
+# ============== LEADER LEASE ==============
+
+NEWS_REFRESH_MINUTES = float(os.environ.get('NEWS_REFRESH_MINUTES', '0'))
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+async def acquire_lease(name: str, ttl_seconds: float) -> bool:
+    """Take or renew a named lease; True if this worker holds it"""
+    return await storage.acquire_lease(name, worker_id(), ttl_seconds)
+
+async def release_leases():
+    await storage.release_leases(worker_id())
+
+async def run_leader_schedule(name: str, interval_seconds: float, job):
+    """Run ``job`` every interval on whichever worker holds the lease"""
+    while True:
+        try:
+            if await acquire_lease(name, interval_seconds * 1.5):
+                await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Scheduled job {name} failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+# ============== JOB QUEUE ==============
+
+# Slow work (scraping, image variants, PayPal checks) runs as durable jobs
+# stored with the rest of the data, so it survives restarts and never runs
+# inside a request. Each worker process runs JOB_WORKERS consumers; claims
+# are leased, so a crashed consumer's job is picked up once its lease expires.
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', '60'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '5'))
+JOB_RETRY_BASE_SECONDS = float(os.environ.get('JOB_RETRY_BASE_SECONDS', '15'))
+JOB_RETRY_MAX_SECONDS = 3600
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', '5'))
+
+# Higher runs first
+JOB_PRIORITY_USER = 10
+JOB_PRIORITY_CONTENT = 5
+JOB_PRIORITY_MAINTENANCE = 0
+
+JobHandler = Callable[[dict], Awaitable[None]]
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+job_wakeup = asyncio.Event()
+
+class Job(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    kind: str
+    payload: dict = Field(default_factory=dict)
+    priority: int = 0
+    dedupe_key: Optional[str] = None
+    status: Literal["queued", "running", "done", "failed", "cancelled"] = "queued"
+    attempts: int = 0
+    run_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+def job_handler(kind: str):
+    def register(func: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+async def enqueue_job(kind: str, payload: Optional[dict] = None, priority: int = JOB_PRIORITY_CONTENT,
+                      dedupe_key: Optional[str] = None, delay_seconds: float = 0) -> str:
+    """Queue a job and return its id; an identical queued ``dedupe_key`` is reused"""
+    job = Job(kind=kind, payload=payload or {}, priority=priority, dedupe_key=dedupe_key,
+              run_at=datetime.now(timezone.utc) + timedelta(seconds=delay_seconds))
+    job_id, created = await storage.enqueue_job(job.model_dump())
+    if created and not delay_seconds:
+        job_wakeup.set()
+    return job_id
+
+def job_retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter"""
+    delay = min(JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), JOB_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+async def keep_job_lease(job_id: str, owner: str):
+    while await storage.extend_job_lease(job_id, owner, JOB_LEASE_SECONDS):
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+
+async def run_job(job: dict, owner: str):
+    handler = JOB_HANDLERS.get(job["kind"])
+    if handler is None:
+        await storage.finish_job(job["id"], owner, "failed", f"Tipo de tarea desconocido: {job['kind']}")
+        return
+    if job["attempts"] > JOB_MAX_ATTEMPTS:
+        # Its consumers kept dying before finishing it
+        await storage.finish_job(job["id"], owner, "failed", job.get("last_error") or "Demasiados intentos")
+        return
+    heartbeat = asyncio.create_task(keep_job_lease(job["id"], owner))
+    try:
+        await handler(job["payload"])
+    except asyncio.CancelledError:
+        # Shutting down: hand the job back instead of waiting for the lease
+        await storage.retry_job(job["id"], owner, datetime.now(timezone.utc), "Interrumpida")
+        raise
+    except Exception as e:
+        logger.warning(f"Job {job['kind']} {job['id']} failed (attempt {job['attempts']}): {e}")
+        if job["attempts"] >= JOB_MAX_ATTEMPTS:
+            await storage.finish_job(job["id"], owner, "failed", str(e))
+        else:
+            run_at = datetime.now(timezone.utc) + timedelta(seconds=job_retry_delay(job["attempts"]))
+            await storage.retry_job(job["id"], owner, run_at, str(e))
+    else:
+        await storage.finish_job(job["id"], owner, "done")
+    finally:
+        heartbeat.cancel()
+
+async def run_job_worker(slot: int):
+    """Claim and run jobs one at a time; JOB_WORKERS of these bound concurrency"""
+    owner = f"{worker_id()}:{slot}"
+    while True:
+        try:
+            job = await storage.claim_job(owner, JOB_LEASE_SECONDS)
+            if job is not None:
+                await run_job(job, owner)
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Job worker {owner} error: {e}")
+        job_wakeup.clear()
+        try:
+            await asyncio.wait_for(job_wakeup.wait(), JOB_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+# ============== EVENT BUS ==============
+
+EVENT_HISTORY_SIZE = int(os.environ.get('EVENT_HISTORY_SIZE', '500'))
+EVENT_HEARTBEAT_SECONDS = float(os.environ.get('EVENT_HEARTBEAT_SECONDS', '15'))
+EVENT_QUEUE_SIZE = 256
+# Lifetime of the ticket that authorizes opening the stream, which ends up in
+# the URL (and so in access logs); an open stream outlives its ticket
+EVENT_TICKET_SECONDS = 60
+# With a replica set, a Mongo change stream feeds the bus so every worker sees
+# writes made by the others; routes then leave publishing to the stream.
+EVENTS_CHANGE_STREAM = os.environ.get('EVENTS_CHANGE_STREAM', 'false').lower() in ('1', 'true', 'yes')
+if EVENTS_CHANGE_STREAM and STORAGE_BACKEND != 'mongo':
+    raise ValueError("EVENTS_CHANGE_STREAM requires STORAGE_BACKEND=mongo")
+EVENT_COLLECTIONS = ("news", "team", "projects", "contacts", "donations", "external_news")
+CHANGE_STREAM_ACTIONS = {"insert": "created", "update": "updated", "replace": "updated", "delete": "deleted"}
+
+class EventSubscriber:
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.dropped = False
+
+class EventBus:
+    """In-process pub/sub with a bounded history for Last-Event-ID resume.
+
+    Event ids are ``<epoch>-<seq>``; the epoch is unique per process so a client
+    resuming against another worker or after a restart is told to reset.
+    """
+
+    def __init__(self, history_size: int):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self.history: deque = deque(maxlen=history_size)
+        self.subscribers: set = set()
+
+    def publish(self, event_type: str, data: dict) -> dict:
+        self.seq += 1
+        event = {"seq": self.seq, "id": f"{self.epoch}-{self.seq}", "type": event_type, "data": data}
+        self.history.append(event)
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: disconnect it, the browser reconnects and resumes
+                subscriber.dropped = True
+                self.subscribers.discard(subscriber)
+        return event
+
+    def subscribe(self) -> EventSubscriber:
+        subscriber = EventSubscriber()
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: EventSubscriber):
+        self.subscribers.discard(subscriber)
+
+    def since(self, last_event_id: str) -> Optional[List[dict]]:
+        """Events after ``last_event_id``, or None if they are no longer available"""
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq >= self.seq:
+            return []
+        if not self.history or self.history[0]["seq"] > seq + 1:
+            return None
+        return [event for event in self.history if event["seq"] > seq]
+
+event_bus = EventBus(EVENT_HISTORY_SIZE)
+
+def publish_event(collection: str, action: str, data: dict):
+    if not EVENTS_CHANGE_STREAM:
+        event_bus.publish(f"{collection}.{action}", jsonable_encoder(data))
+
+def change_event(change: dict) -> tuple:
+    """Bus event type and data for a change stream event, shaped as publish_event sends them"""
+    action = CHANGE_STREAM_ACTIONS[change["operationType"]]
+    if action == "deleted":
+        # Deletes carry only the Mongo _id; the item's own id is in the pre-image
+        document = {"id": (change.get("fullDocumentBeforeChange") or {}).get("id")}
+    else:
+        document = dict(change.get("fullDocument") or {})
+        document.pop("_id", None)
+    return f"{change['ns']['coll']}.{action}", jsonable_encoder(document)
+
+async def enable_pre_images() -> bool:
+    """Turn on pre-images for the watched collections; False before MongoDB 6.0.
+
+    Older servers reject the fullDocumentBeforeChange option outright, so the
+    stream must not ask for it there; deletes then carry a null id.
+    """
+    try:
+        version = (await storage.db.command("buildInfo")).get("versionArray", [0])
+    except Exception as e:
+        logger.warning(f"Could not read the MongoDB version, deletes will lack the id: {e}")
+        return False
+    if version[0] < 6:
+        logger.warning("MongoDB before 6.0 has no change stream pre-images, deletes will lack the id")
+        return False
+    for name in EVENT_COLLECTIONS:
+        try:
+            await storage.db.command("collMod", name, changeStreamPreAndPostImages={"enabled": True})
+        except Exception as e:
+            logger.warning(f"No change stream pre-images for {name}, deletes will lack the id: {e}")
+    return True
+
+async def watch_change_stream():
+    """Forward Mongo change stream events for the watched collections to the bus"""
+    pipeline = [{"$match": {
+        "ns.coll": {"$in": list(EVENT_COLLECTIONS)},
+        "operationType": {"$in": list(CHANGE_STREAM_ACTIONS)},
+    }}]
+    options = {"full_document": "updateLookup"}
+    if await enable_pre_images():
+        options["full_document_before_change"] = "whenAvailable"
+    resume_token = None
+    while True:
+        try:
+            async with storage.db.watch(pipeline, resume_after=resume_token, **options) as stream:
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    event_bus.publish(*change_event(change))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Change stream error: {e}")
+            await asyncio.sleep(5)
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+async def admin_event_stream(request: Request, last_event_id: Optional[str]):
+    subscriber = event_bus.subscribe()
+    sent_seq = 0
+    try:
+        yield "retry: 5000\n\n"
+        if last_event_id:
+            missed = event_bus.since(last_event_id)
+            if missed is None:
+                yield format_sse({"id": f"{event_bus.epoch}-{event_bus.seq}", "type": "reset", "data": {}})
+                sent_seq = event_bus.seq
+            for event in missed or []:
+                yield format_sse(event)
+                sent_seq = event["seq"]
+        while not subscriber.dropped:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), EVENT_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": ping\n\n"
+                continue
+            if event["seq"] > sent_seq:
+                yield format_sse(event)
+                sent_seq = event["seq"]
+    finally:
+        event_bus.unsubscribe(subscriber)
+
 # ============== NEWS SCRAPER ==============
 
 NEWS_SOURCES = {
@@ -215,77 +739,1229 @@ NEWS_SOURCES = {
     "Portafolio": "https://www.portafolio.co/"
 }
 
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+                   "_ga", "_gl", "ref", "ref_src"}
+# Titles within SIMHASH_MAX_DISTANCE bits are near-duplicates; with one more
+# band than that, any such pair is guaranteed to share a band exactly.
+SIMHASH_MAX_DISTANCE = 4
+SIMHASH_BANDS = SIMHASH_MAX_DISTANCE + 1
+SIMHASH_MIN_TOKENS = 4
+
+def page_link(href: str, base: str) -> Optional[str]:
+    """Absolute URL of a scraped link as published, or None if it is not a page link"""
+    href = href.strip()
+    if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+        return None
+    url = urljoin(base, href)
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None
+    return url
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a page URL, used only to recognise the same story again.
+
+    Drops tracking parameters, sorts the query and ignores trailing slashes and
+    plain fragments; hash routes (``#/...``, ``#!...``) tell pages apart and stay.
+    """
+    parts = urlsplit(url)
+    host = parts.hostname.lower()
+    if parts.port and parts.port != {"http": 80, "https": 443}[parts.scheme]:
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    fragment = parts.fragment if parts.fragment.startswith(("/", "!")) else ""
+    return urlunsplit((parts.scheme, host, path, urlencode(query), fragment))
+
+def url_key(url: str) -> str:
+    """Seen-set key of a page URL; http/https, www. and tracking variants collide"""
+    parts = urlsplit(normalize_url(url))
+    host = parts.netloc.removeprefix("www.")
+    fragment = f"#{parts.fragment}" if parts.fragment else ""
+    return hashlib.sha1(f"{host}{parts.path}?{parts.query}{fragment}".encode()).hexdigest()
+
+def title_simhash(title: str) -> Optional[int]:
+    """64-bit simhash over character trigrams; None for titles too short to compare"""
+    text = unicodedata.normalize("NFKD", title.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    tokens = re.findall(r"[a-z0-9]+", text)
+    if len(tokens) < SIMHASH_MIN_TOKENS:
+        return None
+    text = " ".join(tokens)
+    weights = [0] * 64
+    for feature in (text[i:i + 3] for i in range(len(text) - 2)):
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+def simhash_bands(value: int) -> List[str]:
+    """Split a simhash into bands; near-duplicates share at least one band"""
+    bands = []
+    start = 0
+    for i in range(SIMHASH_BANDS):
+        width = (64 - start) // (SIMHASH_BANDS - i)
+        bands.append(f"{i}:{(value >> start) & ((1 << width) - 1):x}")
+        start += width
+    return bands
+
+def is_near_duplicate(fingerprint: Optional[int], others: List[int]) -> bool:
+    return fingerprint is not None and any(
+        bin(fingerprint ^ other).count("1") <= SIMHASH_MAX_DISTANCE for other in others
+    )
+
 async def scrape_news_from_source(source_name: str, url: str) -> List[ExternalNews]:
     """Scrape news from a single source"""
     news_items = []
     try:
-        async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client_http:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            response = await client_http.get(url, headers=headers)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Generic scraping - look for article titles/links
-                articles = soup.find_all(['article', 'div'], class_=lambda x: x and any(
-                    word in str(x).lower() for word in ['news', 'noticia', 'article', 'post', 'item']
-                ))[:5]
-                
-                if not articles:
-                    # Fallback: look for links with news-like patterns
-                    links = soup.find_all('a', href=True)
-                    for link in links[:10]:
-                        title = link.get_text(strip=True)
-                        if len(title) > 20 and len(title) < 200:
-                            href = link['href']
-                            if not href.startswith('http'):
-                                href = url.rstrip('/') + '/' + href.lstrip('/')
-                            news_items.append(ExternalNews(
-                                title=title[:150],
-                                url=href,
-                                source=source_name,
-                                date=datetime.now(timezone.utc).strftime("%Y-%m-%d")
-                            ))
-                            if len(news_items) >= 3:
-                                break
-                else:
-                    for article in articles[:3]:
-                        title_tag = article.find(['h1', 'h2', 'h3', 'h4', 'a'])
-                        if title_tag:
-                            title = title_tag.get_text(strip=True)
-                            link = article.find('a', href=True)
-                            href = link['href'] if link else url
-                            if not href.startswith('http'):
-                                href = url.rstrip('/') + '/' + href.lstrip('/')
-                            news_items.append(ExternalNews(
-                                title=title[:150],
-                                url=href,
-                                source=source_name,
-                                date=datetime.now(timezone.utc).strftime("%Y-%m-%d")
-                            ))
+        client_http = get_http_client()
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+        }
+        response = await client_http.get(url, headers=headers)
+        if response.status_code == 200:
+            soup = BeautifulSoup(response.text, 'html.parser')
+            base = str(response.url)
+
+            # Generic scraping - look for article titles/links
+            articles = soup.find_all(['article', 'div'], class_=lambda x: x and any(
+                word in str(x).lower() for word in ['news', 'noticia', 'article', 'post', 'item']
+            ))[:5]
+
+            if not articles:
+                # Fallback: look for links with news-like patterns
+                links = soup.find_all('a', href=True)
+                for link in links[:10]:
+                    title = link.get_text(strip=True)
+                    href = page_link(link['href'], base)
+                    if href and len(title) > 20 and len(title) < 200:
+                        news_items.append(ExternalNews(
+                            title=title[:150],
+                            url=href,
+                            source=source_name,
+                            date=datetime.now(timezone.utc).strftime("%Y-%m-%d")
+                        ))
+                        if len(news_items) >= 3:
+                            break
+            else:
+                for article in articles[:3]:
+                    title_tag = article.find(['h1', 'h2', 'h3', 'h4', 'a'])
+                    link = article.find('a', href=True)
+                    # Items without their own link would all point at the listing page
+                    href = page_link(link['href'], base) if link else None
+                    if title_tag and href:
+                        title = title_tag.get_text(strip=True)
+                        news_items.append(ExternalNews(
+                            title=title[:150],
+                            url=href,
+                            source=source_name,
+                            date=datetime.now(timezone.utc).strftime("%Y-%m-%d")
+                        ))
     except Exception as e:
         logging.error(f"Error scraping {source_name}: {e}")
     
     return news_items
 
+async def filter_new_news(items: List[ExternalNews]) -> List[tuple]:
+    """Drop items already seen, by URL key or near-duplicate title, in one query.
+
+    Returns ``(key, simhash, item)`` tuples for the genuinely new items.
+    """
+    candidates = []
+    batch_keys = set()
+    batch_hashes: List[int] = []
+    for item in items:
+        key = url_key(item.url)
+        fingerprint = title_simhash(item.title)
+        if key in batch_keys or is_near_duplicate(fingerprint, batch_hashes):
+            continue
+        batch_keys.add(key)
+        if fingerprint is not None:
+            batch_hashes.append(fingerprint)
+        candidates.append((key, fingerprint, item))
+    if not candidates:
+        return []
+
+    bands = sorted({band for fingerprint in batch_hashes for band in simhash_bands(fingerprint)})
+    known = await storage.find_seen(list(batch_keys), bands)
+    known_keys = {doc["key"] for doc in known}
+    known_hashes = [int(doc["simhash"], 16) for doc in known if doc.get("simhash")]
+    return [
+        (key, fingerprint, item) for key, fingerprint, item in candidates
+        if key not in known_keys and not is_near_duplicate(fingerprint, known_hashes)
+    ]
+
+async def record_seen_news(new_items: List[tuple]):
+    """Add items to the seen-set so later refreshes skip them"""
+    now = datetime.now(timezone.utc)
+    docs = [{
+        "key": key,
+        "url": item.url,
+        "source": item.source,
+        "simhash": f"{fingerprint:016x}" if fingerprint is not None else None,
+        "bands": simhash_bands(fingerprint) if fingerprint is not None else [],
+        "first_seen": now,
+    } for key, fingerprint, item in new_items]
+    # A concurrent refresh may have recorded some of them first
+    await storage.record_seen(docs)
+
 async def scrape_all_news() -> List[dict]:
-    """Scrape news from all sources concurrently"""
+    """Scrape all sources concurrently and store only stories not seen before"""
     tasks = [scrape_news_from_source(name, url) for name, url in NEWS_SOURCES.items()]
     results = await asyncio.gather(*tasks, return_exceptions=True)
     
-    all_news = []
+    scraped = []
     for result in results:
         if isinstance(result, list):
-            all_news.extend([n.model_dump() for n in result])
+            scraped.extend(result)
     
-    # Cache in database
-    if all_news:
-        await db.external_news.delete_many({})
-        await db.external_news.insert_many(all_news)
-        await db.external_news.create_index("source")
+    await storage.expire()
+    new_items = await filter_new_news(scraped)
+    if not new_items:
+        return []
+    # Unset fields stay missing so the enrichment job can tell what it filled.
+    # Items are stored before the seen-set records them, so a failed insert is
+    # retried by the next run; items an earlier attempt stored are skipped.
+    new_news = await storage.external_news.insert_many(
+        [item.model_dump(exclude_none=True) for _, _, item in new_items]
+    )
+    await record_seen_news(new_items)
+
+    if new_news:
+        await mark_collection_changed("external_news")
+        publish_event("external_news", "refreshed", {"count": len(new_news)})
+        await enqueue_job("enrich_external_news", {"urls": [n["url"] for n in new_news]})
     
-    return all_news
+    return new_news
+
+@job_handler("scrape_news")
+async def scrape_news_job(payload: dict):
+    await scrape_all_news()
+
+# Article pages are opened after their items are stored, by a job, so reads
+# never wait on them. A stored item keeps what was found and is marked with
+# enriched_at; items already marked are not fetched again.
+ENRICH_CONCURRENCY = int(os.environ.get('ENRICH_CONCURRENCY', '8'))
+ENRICH_PER_HOST = int(os.environ.get('ENRICH_PER_HOST', '2'))
+ENRICH_TIMEOUT_SECONDS = 10.0
+ENRICH_MAX_REDIRECTS = 5
+# Metadata lives in <head>; there is no need to download the whole page
+ENRICH_MAX_BYTES = 256 * 1024
+# Meta tag names (property, name or itemprop) in order of preference
+ARTICLE_SUMMARY_META = ("og:description", "twitter:description", "description")
+ARTICLE_IMAGE_META = ("og:image", "og:image:url", "og:image:secure_url", "twitter:image")
+ARTICLE_PUBLISHED_META = ("article:published_time", "og:published_time", "datepublished", "dc.date", "date")
+
+def _parse_published(value: str) -> Optional[datetime]:
+    value = value.strip()
+    try:
+        published = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            published = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    return published if published.tzinfo else published.replace(tzinfo=timezone.utc)
+
+def parse_article_meta(html: str, base: str) -> dict:
+    """Summary, image and publish time from an article's OpenGraph and meta tags"""
+    meta = {}
+    for tag in BeautifulSoup(html, 'html.parser').find_all('meta'):
+        name = tag.get('property') or tag.get('name') or tag.get('itemprop')
+        content = tag.get('content')
+        if name and content and content.strip():
+            meta.setdefault(name.strip().lower(), content.strip())
+
+    found = {}
+    summary = next((meta[name] for name in ARTICLE_SUMMARY_META if name in meta), None)
+    if summary:
+        found["summary"] = make_summary(summary)
+    image = next((meta[name] for name in ARTICLE_IMAGE_META if name in meta), None)
+    if image:
+        image_url = urljoin(base, image)
+        if urlsplit(image_url).scheme in ("http", "https"):
+            found["image_url"] = image_url
+    published = next((_parse_published(meta[name]) for name in ARTICLE_PUBLISHED_META if name in meta), None)
+    if published:
+        found["published_at"] = published
+        # Replaces the scrape day the item was stored with
+        found["date"] = published.strftime("%Y-%m-%d")
+    return found
+
+async def fetch_article_head(url: str) -> Optional[str]:
+    """The start of an article page, or None if it is missing, not HTML or
+    not on a public host (checked on every redirect hop).
+
+    Raises httpx.HTTPError on network errors and 5xx, which are worth retrying.
+    """
+    headers = {"User-Agent": "Mozilla/5.0 (compatible; FUNSOMEX/1.0)"}
+    try:
+        response = await _open_public_url(url, headers, ENRICH_TIMEOUT_SECONDS, ENRICH_MAX_REDIRECTS)
+    except ValueError:
+        return None
+    try:
+        if response.status_code >= 500:
+            response.raise_for_status()
+        if response.status_code != 200 or "html" not in response.headers.get("content-type", ""):
+            return None
+        chunks, size = [], 0
+        async for chunk in response.aiter_bytes(16 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= ENRICH_MAX_BYTES or b"</head>" in chunk.lower():
+                break
+        return b"".join(chunks).decode(response.charset_encoding or "utf-8", errors="replace")
+    finally:
+        await response.aclose()
+
+async def enrich_external_news(urls: List[str]) -> int:
+    """Fetch metadata for the stored items of ``urls`` not enriched yet.
+
+    Returns how many were enriched. Pages that failed are left for a retry
+    and reported by raising once the others are saved.
+    """
+    pending = await storage.external_news.unenriched(urls)
+    slots = asyncio.Semaphore(ENRICH_CONCURRENCY)
+    host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def enrich_one(url: str) -> dict:
+        host = urlsplit(url).hostname or ""
+        async with host_slots.setdefault(host, asyncio.Semaphore(ENRICH_PER_HOST)), slots:
+            html = await fetch_article_head(url)
+        return await asyncio.to_thread(parse_article_meta, html, url) if html else {}
+
+    results = await asyncio.gather(*(enrich_one(url) for url in pending), return_exceptions=True)
+    now = datetime.now(timezone.utc)
+    updates = [(url, {**found, "enriched_at": now}) for url, found in zip(pending, results) if isinstance(found, dict)]
+    if updates:
+        await storage.external_news.enrich(updates)
+        await mark_collection_changed("external_news")
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        raise RuntimeError(f"{len(errors)} of {len(pending)} articles could not be fetched: {errors[0]}")
+    return len(updates)
+
+@job_handler("enrich_external_news")
+async def enrich_external_news_job(payload: dict):
+    await enrich_external_news(payload["urls"])
+
+# ============== EXTERNAL NEWS ARCHIVE ==============
+
+# Mongo expires items through TTL indexes; SQLite purges them on each refresh.
+# The seen-set is kept twice as long.
+EXTERNAL_NEWS_RETENTION_DAYS = int(os.environ.get('EXTERNAL_NEWS_RETENTION_DAYS', '180'))
+EXTERNAL_NEWS_MAX_LIMIT = 200
+
+async def query_external_news(source: Optional[str], since: Optional[datetime], until: Optional[datetime],
+                              limit: int, cursor: Optional[str], fields: Optional[List[str]]) -> tuple:
+    """Newest-first page of external news and the cursor for the next page"""
+    limit = max(1, min(limit, EXTERNAL_NEWS_MAX_LIMIT))
+    try:
+        return await storage.external_news.page(source, since, until, limit, cursor, fields)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+# ============== FEEDS ==============
+
+SITE_URL = (os.environ.get('SITE_URL') or os.environ.get('FRONTEND_URL') or '').rstrip('/')
+FEED_ITEMS = int(os.environ.get('FEED_ITEMS', '50'))
+FEED_CACHE_CONTROL = "public, max-age=300"
+HOME_CACHE_CONTROL = "public, max-age=60"
+HOME_NEWS = int(os.environ.get('HOME_NEWS', '3'))
+HOME_EXTERNAL_NEWS = int(os.environ.get('HOME_EXTERNAL_NEWS', '6'))
+HOME_PROJECTS = int(os.environ.get('HOME_PROJECTS', '3'))
+SITE_PAGES = ("", "nosotros", "servicios", "proyectos", "equipo", "noticias", "contacto", "donar")
+
+class RenderedFeed(BaseModel):
+    body: bytes
+    etag: str
+    last_modified: datetime
+    versions: Dict[str, int]
+
+# Feeds (and the home page payload) are rendered once per data version and
+# stored in rendered_feeds, so only the first request after a change (on any
+# worker) pays for rendering.
+FEEDS = {
+    "feed.xml": ("application/rss+xml", ("news", "external_news"), FEED_CACHE_CONTROL),
+    "sitemap.xml": ("application/xml", ("news", "projects"), FEED_CACHE_CONTROL),
+    "home": ("application/json", ("news", "external_news", "projects", "donations"), HOME_CACHE_CONTROL),
+}
+rendered_feeds: Dict[str, RenderedFeed] = {}
+_feed_builds: Dict[str, asyncio.Future] = {}
+
+def _xml_text(tag: str, value) -> str:
+    return f"<{tag}>{escape(str(value))}</{tag}>" if value else ""
+
+def _as_datetime(value) -> Optional[datetime]:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if isinstance(value, datetime) and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+async def render_rss(site_url: str) -> bytes:
+    """RSS 2.0 over the newest internal and external news"""
+    news = await storage.news.find(
+        fields=["id", "title", "summary", "category", "published_date"],
+        sort=[("published_date", -1)], limit=FEED_ITEMS,
+    )
+    external, _ = await query_external_news(None, None, None, FEED_ITEMS, None, card_fields(ExternalNewsCard))
+    entries = [
+        (_as_datetime(n["published_date"]), n["title"], f"{site_url}/noticias#{n['id']}", n.get("summary"),
+         n.get("category"), n["id"])
+        for n in news
+    ] + [
+        (_as_datetime(e["first_seen"]), e["title"], e["url"], e.get("summary"), e["source"], e["url"])
+        for e in external
+    ]
+    entries.sort(key=lambda entry: entry[0], reverse=True)
+    items = "".join(
+        "<item>"
+        + _xml_text("title", title) + _xml_text("link", link) + _xml_text("description", summary)
+        + _xml_text("category", category)
+        + f'<guid isPermaLink="false">{escape(guid)}</guid>'
+        + _xml_text("pubDate", format_datetime(date, usegmt=True))
+        + "</item>"
+        for date, title, link, summary, category, guid in entries[:FEED_ITEMS]
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>'
+        + _xml_text("title", "FUNSOMEX - Noticias") + _xml_text("link", f"{site_url}/noticias")
+        + _xml_text("description", "Noticias de FUNSOMEX y de fuentes institucionales de Córdoba y Sucre")
+        + "<language>es-co</language>"
+        + f'<atom:link href="{escape(site_url)}/api/feed.xml" rel="self" type="application/rss+xml"/>'
+        + items + "</channel></rss>"
+    ).encode()
+
+async def render_sitemap(site_url: str) -> bytes:
+    """Sitemap of the public pages, dated by their newest content"""
+    latest_news = await storage.news.find_one({}, ["published_date"], sort=[("published_date", -1)])
+    latest_project = await storage.projects.find_one({}, ["created_at"], sort=[("created_at", -1)])
+    lastmod = {
+        "noticias": latest_news and _as_datetime(latest_news["published_date"]),
+        "proyectos": latest_project and _as_datetime(latest_project["created_at"]),
+    }
+    urls = "".join(
+        "<url>" + _xml_text("loc", f"{site_url}/{page}")
+        + (_xml_text("lastmod", lastmod[page].date().isoformat()) if lastmod.get(page) else "")
+        + "</url>"
+        for page in SITE_PAGES
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + urls + "</urlset>"
+    ).encode()
+
+class HomePage(BaseModel):
+    foundation_info: dict
+    news: List[NewsCard]
+    # Passed through as stored, like /api/external-news
+    external_news: List[dict]
+    projects: List[ProjectCard]
+    donation_stats: dict
+
+async def render_home(site_url: str) -> bytes:
+    """Everything the home page shows, read concurrently as cards"""
+    info, news, (external, _), projects, stats = await asyncio.gather(
+        get_foundation_info(),
+        storage.news.find(None, card_fields(NewsCard), sort=[("published_date", -1)], limit=HOME_NEWS),
+        query_external_news(None, None, None, HOME_EXTERNAL_NEWS, None, card_fields(ExternalNewsCard)),
+        storage.projects.find(None, card_fields(ProjectCard), sort=[("created_at", -1)], limit=HOME_PROJECTS),
+        get_donation_stats(),
+    )
+    return HomePage(
+        foundation_info=info, news=news, external_news=external, projects=projects, donation_stats=stats,
+    ).model_dump_json().encode()
+
+FEED_RENDERERS = {"feed.xml": render_rss, "sitemap.xml": render_sitemap, "home": render_home}
+
+async def get_rendered_feed(name: str, site_url: str) -> RenderedFeed:
+    """Current rendering of a feed, regenerated only when its collections changed"""
+    versions = {collection: collection_versions.get(collection, 0) for collection in FEEDS[name][1]}
+    cached = rendered_feeds.get(name)
+    if cached and cached.versions == versions:
+        return cached
+
+    async def refresh():
+        stored = await storage.load_rendered(name)
+        if stored and stored["versions"] == versions:
+            feed = RenderedFeed(**stored)
+        else:
+            body = await FEED_RENDERERS[name](site_url)
+            feed = RenderedFeed(
+                body=body,
+                etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+                # Unchanged output keeps its date so crawlers still get 304s
+                last_modified=stored["last_modified"] if stored and stored["body"] == body
+                else datetime.now(timezone.utc).replace(microsecond=0),
+                versions=versions,
+            )
+            await storage.save_rendered(name, feed.model_dump())
+        rendered_feeds[name] = feed
+        return feed
+
+    return await _coalesce(_feed_builds, f"{name}:{sorted(versions.items())}", refresh)
+
+def feed_response(request: Request, name: str, feed: RenderedFeed) -> Response:
+    last_modified = _as_datetime(feed.last_modified)
+    # Weak: the same validator covers every encoding the middleware sends,
+    # and 304s repeat exactly what the 200 carried
+    headers = {
+        "ETag": f"W/{feed.etag}",
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": FEEDS[name][2],
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if feed.etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    elif request.headers.get("if-modified-since"):
+        try:
+            if last_modified <= parsedate_to_datetime(request.headers["if-modified-since"]):
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+    return Response(content=feed.body, media_type=FEEDS[name][0], headers=headers)
+
+# ============== IMAGE PROXY ==============
+
+IMAGE_CACHE_DIR = Path(os.environ.get('IMAGE_CACHE_DIR', str(ROOT_DIR / 'image_cache')))
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_MB', '512')) * 1024 * 1024
+# Files used this recently are never evicted: another worker may be about to send them
+IMAGE_CACHE_GRACE_SECONDS = 60
+IMAGE_MAX_SOURCE_BYTES = int(os.environ.get('IMAGE_MAX_SOURCE_MB', '15')) * 1024 * 1024
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '2'))
+IMAGE_WIDTHS = (160, 320, 480, 640, 960, 1280, 1920)
+IMAGE_DEFAULT_WIDTH = 1280
+IMAGE_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+IMAGE_MAX_REDIRECTS = 3
+# The proxy only serves images whose host is referenced by stored content
+# (the image_url of news, projects, team members and enriched external news)
+# or listed here
+IMAGE_ALLOWED_HOSTS = frozenset(
+    host.strip().lower() for host in os.environ.get('IMAGE_ALLOWED_HOSTS', '').split(',') if host.strip()
+)
+IMAGE_SOURCE_COLLECTIONS = ("news", "projects", "team")
+_image_source_hosts: Dict[tuple, frozenset] = {}
+_image_host_loads: Dict[str, asyncio.Future] = {}
+
+def _image_width_bucket(width: Optional[int]) -> int:
+    """Round a requested width up to the nearest bucket so variants stay few"""
+    if not width:
+        return IMAGE_DEFAULT_WIDTH
+    for bucket in IMAGE_WIDTHS:
+        if width <= bucket:
+            return bucket
+    return IMAGE_WIDTHS[-1]
+
+def _validate_image_source(url: str) -> str:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise HTTPException(status_code=400, detail="URL de imagen inválida")
+    return url
+
+async def _check_image_host(url: str):
+    """Reject sources whose host resolves to a private, loopback, link-local or reserved address"""
+    if not await _host_is_public(urlsplit(_validate_image_source(url)).hostname):
+        raise HTTPException(status_code=400, detail="URL de imagen inválida")
+
+async def image_source_hosts() -> frozenset:
+    """Hosts referenced by stored images, recomputed when that content changes"""
+    versions = tuple(collection_versions.get(name, 0) for name in (*IMAGE_SOURCE_COLLECTIONS, "external_news"))
+    if versions in _image_source_hosts:
+        return _image_source_hosts[versions]
+
+    async def load():
+        hosts = set(IMAGE_ALLOWED_HOSTS)
+        urls = await storage.external_news.image_urls()
+        for name in IMAGE_SOURCE_COLLECTIONS:
+            urls += [doc.get("image_url") for doc in await getattr(storage, name).find(None, ["image_url"])]
+        for url in urls:
+            host = urlsplit(url or "").hostname
+            if host:
+                hosts.add(host.lower())
+        _image_source_hosts.clear()
+        _image_source_hosts[versions] = frozenset(hosts)
+        return _image_source_hosts[versions]
+
+    return await _coalesce(_image_host_loads, str(versions), load)
+
+def _render_image_variant(source_path: str, target_path: str, width: int, image_format: str) -> int:
+    """Resize a cached original into a variant. Runs in the image worker pool."""
+    pil_format = IMAGE_FORMATS[image_format][0]
+    with Image.open(source_path) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.width > width:
+            img.thumbnail((width, width * 10), Image.LANCZOS)
+        if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            rgba = img.convert("RGBA")
+            background.paste(rgba, mask=rgba.split()[-1])
+            img = background
+        elif pil_format == "WEBP" and img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        tmp_path = f"{target_path}.{uuid.uuid4().hex}.tmp"
+        img.save(tmp_path, pil_format, quality=82, optimize=True)
+    os.replace(tmp_path, target_path)
+    return os.path.getsize(target_path)
+
+class ImageCache:
+    """Content-addressed on-disk store for originals and variants with LRU eviction.
+
+    Originals live under ``originals/<sha256 of the bytes>`` and variants under
+    ``variants/<digest>-<width>.<ext>``; ``urls/<sha256 of the url>`` maps a
+    source URL to the digest of its content so each source is fetched once.
+
+    Every worker shares the directory, so it is also the LRU state: each use
+    bumps the file's mtime, and eviction scans the directory under a file lock
+    once this worker has written a fiftieth of the budget since its last scan.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, grace_seconds: float = IMAGE_CACHE_GRACE_SECONDS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+        self.scan_bytes = max(max_bytes // 50, 1)
+        self.added_bytes = 0
+
+    def load(self):
+        for sub in ("originals", "variants", "urls"):
+            (self.root / sub).mkdir(parents=True, exist_ok=True)
+        # Temporary files of another live worker are younger than this
+        stale = time.time() - 3600
+        for sub in ("originals", "variants"):
+            for path in (self.root / sub).glob("*.tmp"):
+                try:
+                    if path.stat().st_mtime < stale:
+                        path.unlink()
+                except FileNotFoundError:
+                    pass
+        self.evict()
+
+    def url_key_path(self, url: str) -> Path:
+        return self.root / "urls" / hashlib.sha256(url.encode()).hexdigest()
+
+    def original_path(self, digest: str) -> Path:
+        return self.root / "originals" / digest
+
+    def variant_path(self, digest: str, width: int, image_format: str) -> Path:
+        return self.root / "variants" / f"{digest}-{width}.{image_format}"
+
+    def lookup_digest(self, url: str) -> Optional[str]:
+        path = self.url_key_path(url)
+        try:
+            digest = path.read_text().strip()
+        except FileNotFoundError:
+            return None
+        if not self.original_path(digest).exists():
+            path.unlink(missing_ok=True)
+            return None
+        return digest
+
+    def remember_url(self, url: str, digest: str):
+        path = self.url_key_path(url)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(digest)
+        os.replace(tmp_path, path)
+
+    def touch(self, path: Path) -> bool:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def add(self, path: Path, size: int):
+        self.added_bytes += size
+        if self.added_bytes >= self.scan_bytes:
+            self.evict(keep=str(path))
+
+    def evict(self, keep: Optional[str] = None):
+        """Delete least recently used files until the directory fits the budget"""
+        with open(self.root / ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.added_bytes = 0
+            files = []
+            for sub in ("originals", "variants"):
+                for entry in os.scandir(self.root / sub):
+                    if entry.name.endswith(".tmp"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, entry.path, stat.st_size))
+            total = sum(size for _, _, size in files)
+            recent = time.time() - self.grace_seconds
+            for mtime, path, size in sorted(files):
+                if total <= self.max_bytes or mtime >= recent:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+image_cache = ImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES)
+_image_pool: Optional[ProcessPoolExecutor] = None
+# In-flight work per kind, so keys of different callers never meet
+_source_fetches: Dict[str, asyncio.Future] = {}
+_variant_renders: Dict[str, asyncio.Future] = {}
+
+def get_image_pool() -> ProcessPoolExecutor:
+    global _image_pool
+    if _image_pool is None:
+        # forkserver children start clean instead of inheriting the event
+        # loop, Mongo client threads and sockets of the worker
+        _image_pool = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _image_pool
+
+async def _open_image_source(url: str) -> httpx.Response:
+    """Start streaming a source image, checking the host of every redirect hop"""
+    try:
+        response = await _open_public_url(
+            _validate_image_source(url), {"User-Agent": "FUNSOMEX-ImageProxy/1.0"}, 20.0, IMAGE_MAX_REDIRECTS
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="URL de imagen inválida")
+    if response.is_redirect:
+        await response.aclose()
+        raise HTTPException(status_code=502, detail="No se pudo obtener la imagen")
+    return response
+
+async def _fetch_image_source(url: str) -> str:
+    """Download a source image into the cache and return its content digest"""
+    digest = image_cache.lookup_digest(url)
+    if digest:
+        return digest
+    tmp_path = image_cache.root / "originals" / f"{uuid.uuid4().hex}.tmp"
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        response = await _open_image_source(url)
+        try:
+            content_type = response.headers.get("content-type", "")
+            if response.status_code != 200 or not content_type.startswith("image/"):
+                raise HTTPException(status_code=502, detail="No se pudo obtener la imagen")
+            async with aiofiles.open(tmp_path, "wb") as out:
+                async for chunk in response.aiter_bytes(64 * 1024):
+                    size += len(chunk)
+                    if size > IMAGE_MAX_SOURCE_BYTES:
+                        raise HTTPException(status_code=413, detail="Imagen demasiado grande")
+                    hasher.update(chunk)
+                    await out.write(chunk)
+        finally:
+            await response.aclose()
+    except httpx.HTTPError as e:
+        tmp_path.unlink(missing_ok=True)
+        logger.warning(f"Image fetch failed for {url}: {e}")
+        raise HTTPException(status_code=502, detail="No se pudo obtener la imagen")
+    except HTTPException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    digest = hasher.hexdigest()
+    original = image_cache.original_path(digest)
+    os.replace(tmp_path, original)
+    image_cache.add(original, size)
+    image_cache.remember_url(url, digest)
+    return digest
+
+async def get_image_variant(url: str, width: int, image_format: str) -> Path:
+    """Return the path of a cached variant, fetching and rendering it on first use"""
+    digest = image_cache.lookup_digest(url)
+    if digest:
+        variant = image_cache.variant_path(digest, width, image_format)
+        if image_cache.touch(variant):
+            return variant
+    digest = await _coalesce(_source_fetches, url, lambda: _fetch_image_source(url))
+    variant = image_cache.variant_path(digest, width, image_format)
+    if image_cache.touch(variant):
+        return variant
+
+    async def render():
+        original = image_cache.original_path(digest)
+        image_cache.touch(original)
+        loop = asyncio.get_running_loop()
+        try:
+            size = await loop.run_in_executor(
+                get_image_pool(), _render_image_variant, str(original), str(variant), width, image_format
+            )
+        except BrokenProcessPool:
+            global _image_pool
+            _image_pool = None
+            logger.error(f"Image worker pool crashed while rendering {url}")
+            raise HTTPException(status_code=503, detail="Servicio de imágenes no disponible")
+        except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+            logger.warning(f"Image render failed for {url}: {e}")
+            raise HTTPException(status_code=415, detail="Formato de imagen no soportado")
+        except Exception:
+            logger.exception(f"Image render failed for {url}")
+            raise HTTPException(status_code=500, detail="No se pudo procesar la imagen")
+        image_cache.add(variant, size)
+        return variant
+
+    return await _coalesce(_variant_renders, variant.name, render)
+
+# Width each public page requests (see imageUrl() in the frontend); variants
+# are rendered ahead of the first visit whenever content gets a new image.
+IMAGE_PAGE_WIDTHS = {"news": 640, "projects": 640, "team": 480}
+IMAGE_PREWARM_FORMAT = "webp"
+
+async def prewarm_images(collection: str, urls: List[Optional[str]]):
+    width = IMAGE_PAGE_WIDTHS[collection]
+    for url in dict.fromkeys(url for url in urls if url and url.startswith(("http://", "https://"))):
+        await enqueue_job("image_variants", {"url": url, "widths": [width]}, dedupe_key=f"image:{width}:{url}")
+
+@job_handler("image_variants")
+async def image_variants_job(payload: dict):
+    try:
+        source = _validate_image_source(payload["url"])
+        for width in payload["widths"]:
+            await get_image_variant(source, _image_width_bucket(width), IMAGE_PREWARM_FORMAT)
+    except HTTPException as e:
+        if e.status_code >= 500:
+            raise  # Worth retrying
+        logger.info(f"Skipping image variants for {payload['url']}: {e.detail}")
+
+# ============== PROFILING ==============
+
+# Off unless PROFILING=1. Then a request is profiled with cProfile when it
+# carries an admin token in X-Profile or falls in the PROFILE_SAMPLE_RATE
+# sample, and the database and outgoing HTTP calls it makes are timed. Each
+# report is kept in PROFILE_DIR, which holds the newest PROFILE_MAX_REPORTS.
+# When off, neither the middleware nor the timing hooks are installed.
+PROFILING = os.environ.get('PROFILING', '0') == '1'
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = Path(os.environ.get('PROFILE_DIR', str(ROOT_DIR / 'profiles')))
+PROFILE_MAX_REPORTS = int(os.environ.get('PROFILE_MAX_REPORTS', '50'))
+PROFILE_TOP_FUNCTIONS = 40
+# Streams never finish, and profiling the profile routes is noise
+PROFILE_SKIP_PATHS = ("/api/admin/events", "/api/admin/profiles")
+PROFILE_ID_PATTERN = re.compile(r"^\d{8}T\d{12}-[0-9a-f]{8}$")
+
+# Calls made by the request being profiled, as (kind, name, start, seconds)
+profile_calls: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("profile_calls", default=None)
+
+def record_call(kind: str, name: str, seconds: float):
+    calls = profile_calls.get()
+    if calls is not None:
+        calls.append((kind, name, time.perf_counter() - seconds, seconds))
+
+async def http_request_started(request: httpx.Request):
+    if profile_calls.get() is not None:
+        request.extensions["profile_start"] = time.perf_counter()
+
+async def http_response_received(response: httpx.Response):
+    start = response.request.extensions.get("profile_start")
+    if start is not None:
+        url = response.request.url
+        record_call("http", f"{response.request.method} {url.host}{url.path}", time.perf_counter() - start)
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    status: int
+    trigger: Literal["header", "sample"]
+    started_at: datetime
+    duration_ms: float
+
+class ProfileStore:
+    """Ring buffer of reports on disk: ``<id>.json`` plus ``<id>.pstats``.
+
+    Ids start with the UTC start time, so name order is age order.
+    """
+
+    def __init__(self, root: Path, max_reports: int):
+        self.root = root
+        self.max_reports = max_reports
+
+    def path(self, profile_id: str, ext: str) -> Optional[Path]:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        return self.root / f"{profile_id}.{ext}"
+
+    def save(self, report: dict, profiler: cProfile.Profile):
+        self.root.mkdir(parents=True, exist_ok=True)
+        stats_path = self.root / f"{report['id']}.pstats"
+        profiler.dump_stats(str(stats_path.with_suffix(".tmp")))
+        os.replace(stats_path.with_suffix(".tmp"), stats_path)
+        json_path = self.root / f"{report['id']}.json"
+        json_path.with_suffix(".tmp").write_text(json.dumps(report, default=str))
+        os.replace(json_path.with_suffix(".tmp"), json_path)
+        for old in sorted(self.root.glob("*.json"))[:-self.max_reports or None]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".pstats").unlink(missing_ok=True)
+
+    def list(self) -> List[dict]:
+        summaries = []
+        for path in sorted(self.root.glob("*.json"), reverse=True):
+            try:
+                report = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue  # Pruned or still being written
+            summaries.append({field: report[field] for field in ProfileSummary.model_fields})
+        return summaries
+
+profile_store = ProfileStore(PROFILE_DIR, PROFILE_MAX_REPORTS)
+
+def profile_report(scope, trigger: str, status: int, started_at: datetime, start: float, duration: float,
+                   calls: list, profiler: cProfile.Profile) -> dict:
+    functions = sorted(pstats.Stats(profiler).stats.items(), key=lambda item: item[1][3], reverse=True)
+    totals: Dict[str, dict] = {}
+    for kind, _, _, seconds in calls:
+        total = totals.setdefault(kind, {"count": 0, "ms": 0.0})
+        total["count"] += 1
+        total["ms"] += seconds * 1000
+    return {
+        "id": f"{started_at:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}",
+        "method": scope["method"],
+        "path": scope["path"],
+        "query": scope["query_string"].decode("latin-1"),
+        "status": status,
+        "trigger": trigger,
+        "started_at": started_at.isoformat(),
+        "duration_ms": duration * 1000,
+        "worker": worker_id(),
+        "call_totals": totals,
+        "calls": [
+            {"kind": kind, "name": name, "at_ms": (at - start) * 1000, "ms": seconds * 1000}
+            for kind, name, at, seconds in sorted(calls, key=lambda call: call[2])
+        ],
+        # cProfile sees the whole event loop thread, so work interleaved from
+        # other requests shows up here too
+        "functions": [
+            {"function": pstats.func_std_string(func), "calls": nc, "own_ms": tt * 1000, "cumulative_ms": ct * 1000}
+            for func, (_, nc, tt, ct, _) in functions[:PROFILE_TOP_FUNCTIONS]
+        ],
+    }
+
+class ProfilingMiddleware:
+    """Profile requests that ask for it with an admin token or are sampled.
+
+    One request is profiled at a time; others pass through untouched.
+    """
+
+    def __init__(self, app, sample_rate: float = PROFILE_SAMPLE_RATE, store: ProfileStore = profile_store):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.store = store
+        self.active = False
+
+    def trigger(self, scope) -> Optional[str]:
+        if self.active or scope["path"].startswith(PROFILE_SKIP_PATHS):
+            return None
+        token = Headers(scope=scope).get("x-profile")
+        if token and verify_token(token):
+            return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self.trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.active = True
+        calls: list = []
+        token = profile_calls.set(calls)
+        profiler = cProfile.Profile()
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profiler.disable()
+            duration = time.perf_counter() - start
+            profile_calls.reset(token)
+            self.active = False
+            report = profile_report(scope, trigger, status, started_at, start, duration, calls, profiler)
+            try:
+                await asyncio.to_thread(self.store.save, report, profiler)
+            except OSError as e:
+                logger.warning(f"Could not save profile {report['id']}: {e}")
+
+# ============== RESPONSE COMPRESSION ==============
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '5'))
+COMPRESSION_CACHE_ENTRIES = int(os.environ.get('COMPRESSION_CACHE_ENTRIES', '256'))
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/xml", "application/rss+xml",
+                      "application/atom+xml", "application/javascript")
+
+# Public GET routes whose compressed bodies may be memoized, with the
+# collections their payload is derived from.
+CACHEABLE_ROUTES = {
+    "/api/news": ("news",),
+    "/api/external-news": ("external_news",),
+    "/api/news-sources": (),
+    "/api/team": ("team",),
+    "/api/projects": ("projects",),
+    "/api/foundation-info": (),
+    "/api/donations/stats": ("donations",),
+    "/api/feed.xml": FEEDS["feed.xml"][1],
+    "/api/sitemap.xml": FEEDS["sitemap.xml"][1],
+    "/api/home": FEEDS["home"][1],
+}
+
+def _negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    for encoding in ("br", "gzip"):
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+class CompressionMiddleware:
+    """Compress single-chunk responses and memoize bodies of cacheable GET routes.
+
+    Memoized entries are keyed by path, query, encoding and the versions of the
+    collections behind the route, and are only reused when the uncompressed
+    body digest still matches. Streaming responses pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, cache_entries: int = COMPRESSION_CACHE_ENTRIES):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache_entries = cache_entries
+        self.cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    def cache_key(self, scope, encoding: str) -> Optional[tuple]:
+        if scope["method"] != "GET":
+            return None
+        collections = CACHEABLE_ROUTES.get(scope["path"].rstrip("/"))
+        if collections is None:
+            return None
+        versions = tuple(collection_versions.get(name, 0) for name in collections)
+        return (scope["path"], scope["query_string"], encoding, versions)
+
+    def compress(self, body: bytes, encoding: str, key: Optional[tuple]) -> bytes:
+        if key is None:
+            return compress_body(body, encoding)
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        cached = self.cache.get(key)
+        if cached is not None and cached[0] == digest:
+            self.cache.move_to_end(key)
+            return cached[1]
+        compressed = compress_body(body, encoding)
+        self.cache[key] = (digest, compressed)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_entries:
+            self.cache.popitem(last=False)
+        return compressed
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        key = self.cache_key(scope, encoding)
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if ("content-encoding" in headers or content_type.startswith("text/event-stream")
+                        or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            pending, start_message = start_message, None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                await send(pending)
+                await send(message)
+                return
+            compressed = self.compress(body, encoding, key if pending["status"] == 200 else None)
+            headers = MutableHeaders(raw=pending["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await send(pending)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+# ============== BULK OPERATIONS ==============
+
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', '1000'))
+
+class NewsBulkUpdate(NewsUpdate):
+    id: str
+
+class NewsBulkRequest(BaseModel):
+    create: List[NewsCreate] = []
+    update: List[NewsBulkUpdate] = []
+    delete: List[str] = []
+
+class TeamMemberBulkUpdate(TeamMemberUpdate):
+    id: str
+
+class TeamBulkRequest(BaseModel):
+    create: List[TeamMemberCreate] = []
+    update: List[TeamMemberBulkUpdate] = []
+    delete: List[str] = []
+
+class TeamReorderRequest(BaseModel):
+    ids: List[str]
+
+class ProjectBulkUpdate(ProjectUpdate):
+    id: str
+
+class ProjectBulkRequest(BaseModel):
+    create: List[ProjectCreate] = []
+    update: List[ProjectBulkUpdate] = []
+    delete: List[str] = []
+
+class BulkItemResult(BaseModel):
+    op: str
+    id: str
+    ok: bool
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    failed: int = 0
+    results: List[BulkItemResult]
+
+async def run_bulk(collection: str, creates: List[dict], updates: List[tuple], deletes: List[str],
+                   not_found: str) -> BulkResult:
+    """Apply creates, ``(id, fields)`` updates and deletes as one unordered bulk write.
+
+    Updates and deletes for unknown ids, or for an id already targeted earlier
+    in the batch, are reported per item without being sent; the collection
+    version is bumped once for the whole batch.
+    """
+    if len(creates) + len(updates) + len(deletes) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Máximo {BULK_MAX_ITEMS} elementos por lote")
+    results: List[BulkItemResult] = []
+    ops = {"create": [], "update": [], "delete": []}
+    op_results = {"create": [], "update": [], "delete": []}
+    images: List[tuple] = []
+
+    target_ids = [item_id for item_id, _ in updates] + list(deletes)
+    existing = set()
+    if target_ids:
+        found = await getattr(storage, collection).find({"id": {"$in": target_ids}}, ["id"])
+        existing = {doc["id"] for doc in found}
+
+    def queue(op, item_id, operation, image_url=None):
+        result = BulkItemResult(op=op, id=item_id, ok=True)
+        results.append(result)
+        ops[op].append(operation)
+        op_results[op].append(result)
+        if image_url:
+            images.append((result, image_url))
+
+    # Operations in one bulk write run in no particular order, so each id is
+    # only acted on once per batch
+    targeted = set()
+
+    def check(item_id) -> Optional[str]:
+        if item_id in targeted:
+            return "Elemento repetido en el lote"
+        targeted.add(item_id)
+        return None if item_id in existing else not_found
+
+    for doc in creates:
+        queue("create", doc["id"], doc, doc.get("image_url"))
+    for item_id, fields in updates:
+        error = check(item_id) or (None if fields else "No hay datos para actualizar")
+        if error:
+            results.append(BulkItemResult(op="update", id=item_id, ok=False, error=error))
+        else:
+            queue("update", item_id, (item_id, fields), fields.get("image_url"))
+    for item_id in deletes:
+        error = check(item_id)
+        if error:
+            results.append(BulkItemResult(op="delete", id=item_id, ok=False, error=error))
+        else:
+            queue("delete", item_id, item_id)
+
+    sent = op_results["create"] + op_results["update"] + op_results["delete"]
+    if sent:
+        errors = await getattr(storage, collection).bulk_write(ops["create"], ops["update"], ops["delete"])
+        for index, message in errors.items():
+            sent[index].ok = False
+            sent[index].error = message
+        if any(result.ok for result in sent):
+            await mark_collection_changed(collection)
+            if collection in IMAGE_PAGE_WIDTHS:
+                await prewarm_images(collection, [url for result, url in images if result.ok])
+            publish_event(collection, "bulk", {
+                action: [result.id for result in sent if result.ok and result.op == action]
+                for action in ("create", "update", "delete")
+            })
+
+    summary = BulkResult(results=results)
+    for result in results:
+        if not result.ok:
+            summary.failed += 1
+        elif result.op == "create":
+            summary.created += 1
+        elif result.op == "update":
+            summary.updated += 1
+        else:
+            summary.deleted += 1
+    return summary
 
 # ============== API ROUTES ==============
 
@@ -294,20 +1970,16 @@ async def root():
     return {"message": "FUNSOMEX API - Fundación Social y Financiera Mexion"}
 
 # --- News Routes ---
-@api_router.get("/news", response_model=List[NewsArticle])
-async def get_news(limit: int = 20, category: Optional[str] = None):
+@api_router.get("/news", response_model=None, responses={200: {"model": Union[List[NewsArticle], List[NewsCard]]}})
+async def get_news(limit: int = 20, category: Optional[str] = None, view: ListView = "full"):
     query = {} if not category else {"category": category}
-    news = await db.news.find(query, {"_id": 0}).sort("published_date", -1).limit(limit).to_list(limit)
-    for item in news:
-        if isinstance(item.get('published_date'), str):
-            item['published_date'] = datetime.fromisoformat(item['published_date'].replace('Z', '+00:00'))
-        if isinstance(item.get('created_at'), str):
-            item['created_at'] = datetime.fromisoformat(item['created_at'].replace('Z', '+00:00'))
-    return news
+    fields = card_fields(NewsCard) if view == "card" else None
+    news = await storage.news.find(query, fields, sort=[("published_date", -1)], limit=limit)
+    return list_response(NewsCard if view == "card" else NewsArticle, news)
 
 @api_router.get("/news/{news_id}", response_model=NewsArticle)
 async def get_news_by_id(news_id: str):
-    news = await db.news.find_one({"id": news_id}, {"_id": 0})
+    news = await storage.news.find_one({"id": news_id})
     if not news:
         raise HTTPException(status_code=404, detail="Noticia no encontrada")
     if isinstance(news.get('published_date'), str):
@@ -316,43 +1988,71 @@ async def get_news_by_id(news_id: str):
         news['created_at'] = datetime.fromisoformat(news['created_at'].replace('Z', '+00:00'))
     return news
 
-@api_router.post("/news", response_model=NewsArticle)
-async def create_news(news_data: NewsCreate, admin: str = Depends(get_current_admin)):
-    news_obj = NewsArticle(**news_data.model_dump())
+def news_to_doc(news_obj: NewsArticle) -> dict:
     doc = news_obj.model_dump()
     doc['published_date'] = doc['published_date'].isoformat()
     doc['created_at'] = doc['created_at'].isoformat()
-    await db.news.insert_one(doc)
+    return doc
+
+@api_router.post("/news", response_model=NewsArticle)
+async def create_news(news_data: NewsCreate, admin: str = Depends(get_current_admin)):
+    news_obj = NewsArticle(**news_data.model_dump())
+    doc = news_to_doc(news_obj)
+    await storage.news.insert_one(doc)
+    await mark_collection_changed("news")
+    await prewarm_images("news", [news_obj.image_url])
+    publish_event("news", "created", {"id": news_obj.id, "title": news_obj.title})
     return news_obj
 
 @api_router.put("/news/{news_id}", response_model=NewsArticle)
 async def update_news(news_id: str, news_data: NewsUpdate, admin: str = Depends(get_current_admin)):
-    update_dict = {k: v for k, v in news_data.model_dump().items() if v is not None}
+    update_dict = refresh_summary({k: v for k, v in news_data.model_dump().items() if v is not None}, "content")
     if not update_dict:
         raise HTTPException(status_code=400, detail="No hay datos para actualizar")
-    result = await db.news.update_one({"id": news_id}, {"$set": update_dict})
-    if result.matched_count == 0:
+    if not await storage.news.update_one({"id": news_id}, update_dict):
         raise HTTPException(status_code=404, detail="Noticia no encontrada")
+    await mark_collection_changed("news")
+    await prewarm_images("news", [update_dict.get("image_url")])
+    publish_event("news", "updated", {"id": news_id})
     return await get_news_by_id(news_id)
 
 @api_router.delete("/news/{news_id}")
 async def delete_news(news_id: str, admin: str = Depends(get_current_admin)):
-    result = await db.news.delete_one({"id": news_id})
-    if result.deleted_count == 0:
+    if not await storage.news.delete_one({"id": news_id}):
         raise HTTPException(status_code=404, detail="Noticia no encontrada")
+    await mark_collection_changed("news")
+    publish_event("news", "deleted", {"id": news_id})
     return {"message": "Noticia eliminada"}
 
+@api_router.post("/news/bulk", response_model=BulkResult)
+async def bulk_news(bulk: NewsBulkRequest, admin: str = Depends(get_current_admin)):
+    """Create, update and delete many news articles in one request"""
+    creates = [news_to_doc(NewsArticle(**item.model_dump())) for item in bulk.create]
+    updates = [(item.id, refresh_summary(item.model_dump(exclude={"id"}, exclude_none=True), "content"))
+               for item in bulk.update]
+    return await run_bulk("news", creates, updates, bulk.delete, "Noticia no encontrada")
+
 # --- External News Routes ---
 @api_router.get("/external-news")
-async def get_external_news(source: Optional[str] = None):
-    query = {} if not source else {"source": source}
-    news = await db.external_news.find(query, {"_id": 0}).to_list(50)
+async def get_external_news(source: Optional[str] = None, view: ListView = "full", limit: int = 50,
+                            since: Optional[datetime] = None, until: Optional[datetime] = None):
+    fields = card_fields(ExternalNewsCard) if view == "card" else None
+    news, _ = await query_external_news(source, since, until, limit, None, fields)
     return news
 
+@api_router.get("/external-news/archive", response_model=ExternalNewsPage)
+async def get_external_news_archive(source: Optional[str] = None, view: ListView = "card", limit: int = 50,
+                                    since: Optional[datetime] = None, until: Optional[datetime] = None,
+                                    cursor: Optional[str] = None):
+    """Retained external news, newest first, paginated with ``next_cursor``"""
+    fields = card_fields(ExternalNewsCard) if view == "card" else None
+    items, next_cursor = await query_external_news(source, since, until, limit, cursor, fields)
+    return ExternalNewsPage(items=items, next_cursor=next_cursor)
+
 @api_router.post("/external-news/refresh")
-async def refresh_external_news(background_tasks: BackgroundTasks):
-    background_tasks.add_task(scrape_all_news)
-    return {"message": "Actualizando noticias externas..."}
+async def refresh_external_news():
+    job_id = await enqueue_job("scrape_news", priority=JOB_PRIORITY_USER, dedupe_key="scrape_news")
+    return {"message": "Actualizando noticias externas...", "job_id": job_id}
 
 @api_router.get("/news-sources")
 async def get_news_sources():
@@ -361,60 +2061,132 @@ async def get_news_sources():
 # --- Team Routes ---
 @api_router.get("/team", response_model=List[TeamMember])
 async def get_team():
-    members = await db.team.find({}, {"_id": 0}).sort("order", 1).to_list(50)
+    members = await storage.team.find(sort=[("order", 1)], limit=50)
     return members
 
 @api_router.post("/team", response_model=TeamMember)
 async def create_team_member(member_data: TeamMemberCreate, admin: str = Depends(get_current_admin)):
     member_obj = TeamMember(**member_data.model_dump())
     doc = member_obj.model_dump()
-    await db.team.insert_one(doc)
+    await storage.team.insert_one(doc)
+    await mark_collection_changed("team")
+    await prewarm_images("team", [member_obj.image_url])
+    publish_event("team", "created", {"id": member_obj.id, "name": member_obj.name})
     return member_obj
 
 @api_router.delete("/team/{member_id}")
 async def delete_team_member(member_id: str, admin: str = Depends(get_current_admin)):
-    result = await db.team.delete_one({"id": member_id})
-    if result.deleted_count == 0:
+    if not await storage.team.delete_one({"id": member_id}):
         raise HTTPException(status_code=404, detail="Miembro no encontrado")
+    await mark_collection_changed("team")
+    publish_event("team", "deleted", {"id": member_id})
     return {"message": "Miembro eliminado"}
 
+@api_router.post("/team/bulk", response_model=BulkResult)
+async def bulk_team(bulk: TeamBulkRequest, admin: str = Depends(get_current_admin)):
+    """Create, update and delete many team members in one request"""
+    creates = [TeamMember(**item.model_dump()).model_dump() for item in bulk.create]
+    updates = [(item.id, item.model_dump(exclude={"id"}, exclude_none=True)) for item in bulk.update]
+    return await run_bulk("team", creates, updates, bulk.delete, "Miembro no encontrado")
+
+@api_router.put("/team/reorder", response_model=BulkResult)
+async def reorder_team(reorder: TeamReorderRequest, admin: str = Depends(get_current_admin)):
+    """Set each member's order to its position in ``ids``"""
+    updates = [(member_id, {"order": position}) for position, member_id in enumerate(reorder.ids)]
+    return await run_bulk("team", [], updates, [], "Miembro no encontrado")
+
 # --- Projects/Gallery Routes ---
-@api_router.get("/projects", response_model=List[Project])
-async def get_projects(category: Optional[str] = None):
+@api_router.get("/projects", response_model=None, responses={200: {"model": Union[List[Project], List[ProjectCard]]}})
+async def get_projects(category: Optional[str] = None, view: ListView = "full"):
     query = {} if not category else {"category": category}
-    projects = await db.projects.find(query, {"_id": 0}).sort("created_at", -1).to_list(50)
-    for proj in projects:
-        if isinstance(proj.get('created_at'), str):
-            proj['created_at'] = datetime.fromisoformat(proj['created_at'].replace('Z', '+00:00'))
-    return projects
+    fields = card_fields(ProjectCard) if view == "card" else None
+    projects = await storage.projects.find(query, fields, sort=[("created_at", -1)], limit=50)
+    return list_response(ProjectCard if view == "card" else Project, projects)
+
+def project_to_doc(project_obj: Project) -> dict:
+    doc = project_obj.model_dump()
+    doc['created_at'] = doc['created_at'].isoformat()
+    return doc
 
 @api_router.post("/projects", response_model=Project)
 async def create_project(project_data: ProjectCreate, admin: str = Depends(get_current_admin)):
     project_obj = Project(**project_data.model_dump())
-    doc = project_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.projects.insert_one(doc)
+    doc = project_to_doc(project_obj)
+    await storage.projects.insert_one(doc)
+    await mark_collection_changed("projects")
+    await prewarm_images("projects", [project_obj.image_url])
+    publish_event("projects", "created", {"id": project_obj.id, "title": project_obj.title})
     return project_obj
 
 @api_router.delete("/projects/{project_id}")
 async def delete_project(project_id: str, admin: str = Depends(get_current_admin)):
-    result = await db.projects.delete_one({"id": project_id})
-    if result.deleted_count == 0:
+    if not await storage.projects.delete_one({"id": project_id}):
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+    await mark_collection_changed("projects")
+    publish_event("projects", "deleted", {"id": project_id})
     return {"message": "Proyecto eliminado"}
 
+@api_router.post("/projects/bulk", response_model=BulkResult)
+async def bulk_projects(bulk: ProjectBulkRequest, admin: str = Depends(get_current_admin)):
+    """Create, update and delete many projects in one request"""
+    creates = [project_to_doc(Project(**item.model_dump())) for item in bulk.create]
+    updates = [(item.id, refresh_summary(item.model_dump(exclude={"id"}, exclude_none=True), "description"))
+               for item in bulk.update]
+    return await run_bulk("projects", creates, updates, bulk.delete, "Proyecto no encontrado")
+
+# --- Image Proxy Routes ---
+@api_router.get("/images")
+async def get_image(request: Request, url: str, w: Optional[int] = None, format: Optional[str] = None):
+    """Serve a resized, cached variant of an image referenced by site content"""
+    source = _validate_image_source(url)
+    if urlsplit(source).hostname.lower() not in await image_source_hosts():
+        raise HTTPException(status_code=403, detail="Origen de imagen no permitido")
+    headers = {"Cache-Control": IMAGE_CACHE_CONTROL}
+    if format is None:
+        format = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+        headers["Vary"] = "Accept"
+    elif format not in IMAGE_FORMATS:
+        raise HTTPException(status_code=400, detail="Formato no soportado")
+    width = _image_width_bucket(w)
+    path = await get_image_variant(source, width, format)
+    return FileResponse(path, media_type=IMAGE_FORMATS[format][1], headers=headers)
+
+# --- Feed Routes ---
+def public_site_url() -> str:
+    """Origin for public links; never taken from the request, whose Host is client-controlled"""
+    if not SITE_URL:
+        raise HTTPException(status_code=503, detail="SITE_URL no configurada")
+    return SITE_URL
+
+@api_router.get("/feed.xml")
+async def get_feed(request: Request):
+    feed = await get_rendered_feed("feed.xml", public_site_url())
+    return feed_response(request, "feed.xml", feed)
+
+@api_router.get("/sitemap.xml")
+async def get_sitemap(request: Request):
+    feed = await get_rendered_feed("sitemap.xml", public_site_url())
+    return feed_response(request, "sitemap.xml", feed)
+
+# --- Home Page ---
+@api_router.get("/home")
+async def get_home(request: Request):
+    """Foundation info, latest news, projects and donation totals in one response"""
+    return feed_response(request, "home", await get_rendered_feed("home", SITE_URL))
+
 # --- Contact Routes ---
 @api_router.post("/contact", response_model=ContactMessage)
 async def submit_contact(contact_data: ContactCreate):
     contact_obj = ContactMessage(**contact_data.model_dump())
     doc = contact_obj.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
-    await db.contacts.insert_one(doc)
+    await storage.contacts.insert_one(doc)
+    publish_event("contacts", "created", contact_obj.model_dump())
     return contact_obj
 
 @api_router.get("/contact", response_model=List[ContactMessage])
 async def get_contacts(admin: str = Depends(get_current_admin)):
-    contacts = await db.contacts.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
+    contacts = await storage.contacts.find(sort=[("created_at", -1)], limit=100)
     for contact in contacts:
         if isinstance(contact.get('created_at'), str):
             contact['created_at'] = datetime.fromisoformat(contact['created_at'].replace('Z', '+00:00'))
@@ -422,11 +2194,59 @@ async def get_contacts(admin: str = Depends(get_current_admin)):
 
 @api_router.put("/contact/{contact_id}/read")
 async def mark_contact_read(contact_id: str, admin: str = Depends(get_current_admin)):
-    result = await db.contacts.update_one({"id": contact_id}, {"$set": {"read": True}})
-    if result.matched_count == 0:
+    if not await storage.contacts.update_one({"id": contact_id}, {"read": True}):
         raise HTTPException(status_code=404, detail="Mensaje no encontrado")
+    publish_event("contacts", "updated", {"id": contact_id, "read": True})
     return {"message": "Marcado como leído"}
 
+# --- Admin Events ---
+async def get_current_admin_sse(ticket: Optional[str] = None,
+                                credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Like get_current_admin, but EventSource cannot set headers so accept ?ticket=
+    from POST /admin/events/ticket instead of the admin token"""
+    if credentials:
+        email = verify_token(credentials.credentials)
+    else:
+        email = verify_token(ticket or "", purpose="events")
+    if not email:
+        raise HTTPException(status_code=401, detail="No autorizado")
+    return email
+
+@api_router.post("/admin/events/ticket")
+async def admin_events_ticket(admin: str = Depends(get_current_admin)):
+    """Short-lived ticket that only opens the event stream, for the EventSource URL"""
+    payload = {
+        "sub": admin,
+        "purpose": "events",
+        "exp": datetime.now(timezone.utc) + timedelta(seconds=EVENT_TICKET_SECONDS),
+    }
+    return {"ticket": jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM), "expires_in": EVENT_TICKET_SECONDS}
+
+@api_router.get("/admin/events")
+async def admin_events(request: Request, admin: str = Depends(get_current_admin_sse)):
+    """Server-Sent Events stream of inbox, donation and content changes"""
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("lastEventId")
+    return StreamingResponse(
+        admin_event_stream(request, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/admin/profiles", response_model=List[ProfileSummary])
+async def list_profiles(admin: str = Depends(get_current_admin)):
+    """Stored request profiles, newest first (admin)"""
+    return await asyncio.to_thread(profile_store.list)
+
+@api_router.get("/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: Literal["json", "pstats"] = "json",
+                      admin: str = Depends(get_current_admin)):
+    """Download a profile as the JSON report or cProfile stats (admin)"""
+    path = profile_store.path(profile_id, format)
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    media_type = "application/json" if format == "json" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=path.name)
+
 # --- Foundation Info ---
 @api_router.get("/foundation-info")
 async def get_foundation_info():
@@ -489,6 +2309,14 @@ async def get_foundation_info():
         }
     }
 
+# --- Job Routes ---
+@api_router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str, admin: str = Depends(get_current_admin)):
+    job = await storage.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Tarea no encontrada")
+    return job
+
 # --- PayPal Donation Routes ---
 class DonationCreate(BaseModel):
     amount: float
@@ -557,7 +2385,10 @@ async def create_paypal_payment(donation: DonationCreate):
             )
             doc = donation_record.model_dump()
             doc['created_at'] = doc['created_at'].isoformat()
-            await db.donations.insert_one(doc)
+            await storage.donations.insert_one(doc)
+            # Settle it from PayPal's side if the donor never comes back
+            await enqueue_job("reconcile_donation", {"payment_id": payment.id},
+                              dedupe_key=f"donation:{payment.id}", delay_seconds=PAYPAL_APPROVAL_SECONDS)
             
             # Find approval URL
             for link in payment.links:
@@ -585,10 +2416,9 @@ async def execute_paypal_payment(payment_id: str, payer_id: str):
         
         if payment.execute({"payer_id": payer_id}):
             # Update donation record
-            await db.donations.update_one(
-                {"paypal_payment_id": payment_id},
-                {"$set": {"status": "completed"}}
-            )
+            await storage.donations.update_one({"paypal_payment_id": payment_id}, {"status": "completed"})
+            await mark_collection_changed("donations")
+            publish_event("donations", "updated", {"paypal_payment_id": payment_id, "status": "completed"})
             return {
                 "success": True,
                 "message": "¡Gracias por tu donación! Tu apoyo ayuda a transformar vidas.",
@@ -596,19 +2426,147 @@ async def execute_paypal_payment(payment_id: str, payer_id: str):
             }
         else:
             logger.error(f"PayPal execution error: {payment.error}")
-            await db.donations.update_one(
-                {"paypal_payment_id": payment_id},
-                {"$set": {"status": "failed"}}
-            )
+            await storage.donations.update_one({"paypal_payment_id": payment_id}, {"status": "failed"})
+            publish_event("donations", "updated", {"paypal_payment_id": payment_id, "status": "failed"})
             raise HTTPException(status_code=400, detail=f"Error al ejecutar pago: {payment.error}")
     except Exception as e:
         logger.error(f"PayPal payment execution error: {str(e)}")
+        # The payment may still have gone through; check again shortly
+        await enqueue_job("reconcile_donation", {"payment_id": payment_id}, priority=JOB_PRIORITY_USER,
+                          dedupe_key=f"donation:{payment_id}", delay_seconds=60)
         raise HTTPException(status_code=500, detail=f"Error al ejecutar el pago: {str(e)}")
 
+# PayPal approval links expire after three hours
+PAYPAL_APPROVAL_SECONDS = 3 * 3600 + 300
+# Payment states that settle a donation
+PAYPAL_FINAL_STATES = {"approved": "completed", "failed": "failed", "canceled": "failed", "expired": "failed"}
+
+@job_handler("reconcile_donation")
+async def reconcile_donation_job(payload: dict):
+    """Align a donation left in ``created`` with the payment state at PayPal"""
+    payment_id = payload["payment_id"]
+    status = PAYPAL_FINAL_STATES.get(await paypal_payment_state(payment_id))
+    if status and await storage.donations.update_one(
+        {"paypal_payment_id": payment_id, "status": "created"}, {"status": status}
+    ):
+        await mark_collection_changed("donations")
+        publish_event("donations", "updated", {"paypal_payment_id": payment_id, "status": status})
+
+async def paypal_payment_state(payment_id: str) -> str:
+    payment = await asyncio.to_thread(paypalrestsdk.Payment.find, payment_id)
+    return payment.state
+
+def paypal_outage(error: Exception) -> bool:
+    """True for errors that say nothing about the payment: transport, 5xx, rejected credentials"""
+    return not isinstance(error, paypalrestsdk.exceptions.ClientError) or isinstance(
+        error, (paypalrestsdk.exceptions.UnauthorizedAccess, paypalrestsdk.exceptions.ForbiddenAccess)
+    )
+
+# The sweep catches donations whose own reconcile job was lost or gave up.
+# It walks stale donations in (created_at, id) order a page at a time and
+# stores a checkpoint after each page, so an interrupted run resumes there.
+DONATION_RECONCILE_MINUTES = float(os.environ.get('DONATION_RECONCILE_MINUTES', '60'))
+DONATION_RECONCILE_BATCH = int(os.environ.get('DONATION_RECONCILE_BATCH', '200'))
+# Still unapproved after this long: the donor is not coming back
+DONATION_ABANDON_HOURS = float(os.environ.get('DONATION_ABANDON_HOURS', '72'))
+PAYPAL_CONCURRENCY = int(os.environ.get('PAYPAL_CONCURRENCY', '4'))
+PAYPAL_REQUESTS_PER_SECOND = float(os.environ.get('PAYPAL_REQUESTS_PER_SECOND', '5'))
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self.next_at = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = asyncio.get_running_loop().time()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+async def reconcile_stale_donations() -> Dict[str, int]:
+    """Settle every stale ``created`` donation from PayPal; returns counts"""
+    now = datetime.now(timezone.utc)
+    stale_before = (now - timedelta(seconds=PAYPAL_APPROVAL_SECONDS)).isoformat()
+    abandon_before = (now - timedelta(hours=DONATION_ABANDON_HOURS)).isoformat()
+    slots = asyncio.Semaphore(PAYPAL_CONCURRENCY)
+    limiter = RateLimiter(PAYPAL_REQUESTS_PER_SECOND)
+    counts = {"checked": 0, "updated": 0, "errors": 0}
+
+    async def settle(donation: dict) -> Optional[str]:
+        try:
+            async with slots:
+                await limiter.wait()
+                state = await paypal_payment_state(donation["paypal_payment_id"])
+        except paypalrestsdk.ResourceNotFound:
+            # PayPal has no such payment, so it can never be approved
+            return "failed"
+        except Exception as error:
+            # Refused for this payment alone on every sweep: give up once abandoned
+            if not paypal_outage(error) and donation["created_at"] < abandon_before:
+                return "failed"
+            raise
+        status = PAYPAL_FINAL_STATES.get(state)
+        if status is None and donation["created_at"] < abandon_before:
+            status = "failed"
+        return status
+
+    checkpoint = await storage.load_checkpoint("donation-reconcile")
+    while True:
+        created_at = {"$lt": stale_before}
+        if checkpoint:
+            created_at["$gte"] = checkpoint["created_at"]
+        page = await storage.donations.find(
+            {"status": "created", "created_at": created_at}, ["id", "paypal_payment_id", "created_at"],
+            sort=[("created_at", 1), ("id", 1)], limit=DONATION_RECONCILE_BATCH,
+        )
+        full_page = len(page) == DONATION_RECONCILE_BATCH
+        if checkpoint:
+            page = [d for d in page if (d["created_at"], d["id"]) > (checkpoint["created_at"], checkpoint["id"])]
+        if not page:
+            break
+        results = await asyncio.gather(*(settle(d) for d in page), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+        if len(errors) == len(page) and all(paypal_outage(e) for e in errors):
+            # PayPal is down or refusing us; retry the job from this checkpoint
+            raise errors[0]
+        updates = [(d["id"], {"status": r}) for d, r in zip(page, results) if isinstance(r, str)]
+        # A donation settled by its own job since the page was read keeps that status
+        failed = await storage.donations.bulk_write([], updates, [], {"status": "created"}) if updates else {}
+        counts["checked"] += len(page)
+        counts["updated"] += len(updates) - len(failed)
+        counts["errors"] += len(errors) + len(failed)
+        if len(updates) > len(failed):
+            await mark_collection_changed("donations")
+            publish_event("donations", "reconciled", {"updated": len(updates) - len(failed)})
+        checkpoint = {"created_at": page[-1]["created_at"], "id": page[-1]["id"]}
+        await storage.save_checkpoint("donation-reconcile", checkpoint)
+        if not full_page:
+            break
+    # Donations skipped on errors are retried by the next sweep from the start
+    await storage.save_checkpoint("donation-reconcile", None)
+    return counts
+
+@job_handler("reconcile_donations")
+async def reconcile_donations_job(payload: dict):
+    counts = await reconcile_stale_donations()
+    logger.info(f"Donation reconciliation: {counts['checked']} checked, "
+                f"{counts['updated']} updated, {counts['errors']} errors")
+
+@api_router.post("/donations/reconcile")
+async def reconcile_donations(admin: str = Depends(get_current_admin)):
+    """Queue a sweep of stale donations against PayPal (admin)"""
+    job_id = await enqueue_job("reconcile_donations", priority=JOB_PRIORITY_USER, dedupe_key="reconcile_donations")
+    return {"message": "Conciliando donaciones con PayPal...", "job_id": job_id}
+
 @api_router.get("/donations")
 async def get_donations(admin: str = Depends(get_current_admin)):
     """Get all donations (admin)"""
-    donations = await db.donations.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
+    donations = await storage.donations.find(sort=[("created_at", -1)], limit=100)
     for donation in donations:
         if isinstance(donation.get('created_at'), str):
             donation['created_at'] = datetime.fromisoformat(donation['created_at'].replace('Z', '+00:00'))
@@ -617,21 +2575,8 @@ async def get_donations(admin: str = Depends(get_current_admin)):
 @api_router.get("/donations/stats")
 async def get_donation_stats():
     """Get donation statistics"""
-    pipeline = [
-        {"$match": {"status": "completed"}},
-        {"$group": {
-            "_id": None,
-            "total_amount": {"$sum": "$amount"},
-            "total_count": {"$sum": 1}
-        }}
-    ]
-    result = await db.donations.aggregate(pipeline).to_list(1)
-    if result:
-        return {
-            "total_amount": result[0]["total_amount"],
-            "total_donations": result[0]["total_count"]
-        }
-    return {"total_amount": 0, "total_donations": 0}
+    total_amount, total_count = await storage.donations.total("amount", {"status": "completed"})
+    return {"total_amount": total_amount, "total_donations": total_count}
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -644,6 +2589,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(CompressionMiddleware)
+
+# Outermost, so a profile includes compression
+if PROFILING:
+    app.add_middleware(ProfilingMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -651,17 +2602,69 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def backfill_summaries():
+    """Store summaries for documents written before they were generated"""
+    for collection, source_field in (("news", "content"), ("projects", "description")):
+        docs = await getattr(storage, collection).find({"summary": None}, ["id", source_field])
+        if docs:
+            await getattr(storage, collection).bulk_write([], [
+                (doc["id"], {"summary": make_summary(doc.get(source_field, ""))}) for doc in docs
+            ], [])
+
 @app.on_event("startup")
 async def startup_event():
+    global storage
     # Initialize external news on startup
     logger.info("Initializing FUNSOMEX API...")
-    # Create indexes
-    await db.news.create_index("id", unique=True)
-    await db.news.create_index("category")
-    await db.team.create_index("id", unique=True)
-    await db.projects.create_index("id", unique=True)
-    await db.contacts.create_index("id", unique=True)
+    # Per-worker resources; connect also creates the indexes
+    storage = create_storage()
+    if PROFILING:
+        storage.observer = lambda name, seconds: record_call("db", name, seconds)
+    await storage.connect()
+    configure_paypal()
+    if not SITE_URL:
+        logger.warning("SITE_URL/FRONTEND_URL not set; the RSS feed and sitemap are disabled")
+    get_http_client()
+    get_image_pool()
+    image_cache.load()
+    await backfill_summaries()
+    await sync_collection_versions()
+    app.state.background_tasks = []
+    if WEB_CONCURRENCY > 1:
+        app.state.background_tasks.append(asyncio.create_task(run_cache_sync()))
+    if EVENTS_CHANGE_STREAM:
+        app.state.background_tasks.append(asyncio.create_task(watch_change_stream()))
+    if NEWS_REFRESH_MINUTES > 0:
+        app.state.background_tasks.append(asyncio.create_task(
+            run_leader_schedule("news-refresh", NEWS_REFRESH_MINUTES * 60, lambda: enqueue_job(
+                "scrape_news", priority=JOB_PRIORITY_MAINTENANCE, dedupe_key="scrape_news"
+            ))
+        ))
+    if DONATION_RECONCILE_MINUTES > 0:
+        app.state.background_tasks.append(asyncio.create_task(
+            run_leader_schedule("donation-reconcile", DONATION_RECONCILE_MINUTES * 60, lambda: enqueue_job(
+                "reconcile_donations", priority=JOB_PRIORITY_MAINTENANCE, dedupe_key="reconcile_donations"
+            ))
+        ))
+    for slot in range(JOB_WORKERS):
+        app.state.background_tasks.append(asyncio.create_task(run_job_worker(slot)))
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    global http_client, _image_pool
+    tasks = getattr(app.state, "background_tasks", [])
+    for task in tasks:
+        task.cancel()
+    # Let interrupted jobs hand themselves back before storage closes
+    await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        await release_leases()
+    except Exception as e:
+        logger.warning(f"Could not release leases: {e}")
+    await storage.close()
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+    if _image_pool is not None:
+        _image_pool.shutdown(wait=False, cancel_futures=True)
+        _image_pool = None
@@ -0,0 +1,1163 @@
+"""Storage backends for the FUNSOMEX API.
+
+Routes talk to a :class:`Storage` instead of a database driver. It exposes one
+:class:`Collection` per domain collection (news, team, projects, contacts,
+donations), the external news archive and the handful of bookkeeping queries
+the app needs (cache versions, leases, the scraper seen-set and rendered
+feeds).
+
+``MongoStorage`` is the production backend. ``SQLiteStorage`` keeps everything
+in one file for single-process deployments and CI; it is selected with
+``STORAGE_BACKEND=sqlite``.
+
+Filters are a small subset of the Mongo query language, understood by both
+backends: equality (``None`` also matches a missing field), ``$in``, ``$gt``,
+``$gte``, ``$lt``, ``$lte`` and ``$exists``.
+"""
+import asyncio
+import base64
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+Sort = Sequence[Tuple[str, int]]
+# Called with an operation name and its duration in seconds
+Observer = Callable[[str, float], None]
+
+# Domain collections and their secondary indexes; every document is keyed by
+# a unique ``id`` field. Each query the routes make must be served by one of
+# these without a full scan or an in-memory sort; tests/test_index_audit.py
+# checks that with ``explain``.
+COLLECTIONS: Dict[str, List[Sort]] = {
+    # Newest first, optionally within a category
+    "news": [[("published_date", -1)], [("category", 1), ("published_date", -1)]],
+    "team": [[("order", 1)]],
+    "projects": [[("created_at", -1)], [("category", 1), ("created_at", -1)]],
+    "contacts": [[("created_at", -1)]],
+    # By PayPal id on execute, newest first for the admin, and by status for
+    # the stats and the reconciliation sweep's (created_at, id) walk
+    "donations": [[("paypal_payment_id", 1)], [("created_at", -1)], [("status", 1), ("created_at", 1), ("id", 1)]],
+}
+
+
+def encode_cursor(first_seen: datetime, key) -> str:
+    if first_seen.tzinfo is None:
+        first_seen = first_seen.replace(tzinfo=timezone.utc)
+    raw = f"{int(first_seen.timestamp() * 1000)}:{key}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Split an archive cursor into its timestamp and tie-breaker; ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        millis, key = raw.split(":")
+        return datetime.fromtimestamp(int(millis) / 1000, tz=timezone.utc), key
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("invalid cursor") from e
+
+
+class Collection(ABC):
+    """Documents of one domain collection, keyed by their ``id`` field"""
+
+    @abstractmethod
+    async def find(self, where: Optional[dict] = None, fields: Optional[Iterable[str]] = None,
+                   sort: Optional[Sort] = None, limit: int = 0) -> List[dict]:
+        """Matching documents, restricted to ``fields`` when given"""
+
+    async def find_one(self, where: dict, fields: Optional[Iterable[str]] = None,
+                       sort: Optional[Sort] = None) -> Optional[dict]:
+        docs = await self.find(where, fields, sort, limit=1)
+        return docs[0] if docs else None
+
+    @abstractmethod
+    async def insert_one(self, doc: dict):
+        """Store a new document; its ``id`` must not exist yet"""
+
+    @abstractmethod
+    async def update_one(self, where: dict, fields: dict) -> bool:
+        """Set ``fields`` on the first match; False if nothing matched"""
+
+    @abstractmethod
+    async def delete_one(self, where: dict) -> bool:
+        """Delete the first match; False if nothing matched"""
+
+    @abstractmethod
+    async def count(self, where: Optional[dict] = None) -> int:
+        ...
+
+    @abstractmethod
+    async def total(self, field: str, where: Optional[dict] = None) -> Tuple[float, int]:
+        """Sum of ``field`` over the matches and the number of matches"""
+
+    @abstractmethod
+    async def bulk_write(self, creates: List[dict], updates: List[Tuple[str, dict]],
+                         deletes: List[str], where: Optional[dict] = None) -> Dict[int, str]:
+        """Apply creates, ``(id, fields)`` updates and deletes, unordered.
+
+        Updates only apply to items that also match ``where``; the others are
+        left as they are. Returns the error message of each failed operation by its index in
+        ``creates + updates + deletes``.
+        """
+
+    @abstractmethod
+    async def explain(self, where: Optional[dict] = None, sort: Optional[Sort] = None) -> List[str]:
+        """Steps of the plan for ``find(where, sort=sort)`` that scan the whole
+        collection or sort in memory; empty when an index serves it"""
+
+
+class ExternalNewsArchive(ABC):
+    """Scraped news, kept for the retention window and read newest first"""
+
+    @abstractmethod
+    async def insert_many(self, docs: List[dict]) -> List[dict]:
+        """Store the docs whose ``url`` is not stored yet; returns those stored.
+
+        Storing the same items again is a no-op, so a failed refresh can retry.
+        """
+
+    @abstractmethod
+    async def page(self, source: Optional[str], since: Optional[datetime], until: Optional[datetime],
+                   limit: int, cursor: Optional[str], fields: Optional[Iterable[str]]) -> Tuple[List[dict], Optional[str]]:
+        """One page ordered by ``first_seen`` then insertion, and the cursor of the next.
+
+        Raises ValueError for a malformed cursor.
+        """
+
+    @abstractmethod
+    async def unenriched(self, urls: List[str]) -> List[str]:
+        """Those of ``urls`` whose stored item has no ``enriched_at`` yet"""
+
+    @abstractmethod
+    async def enrich(self, updates: List[Tuple[str, dict]]):
+        """Set fields on the item stored under each ``(url, fields)``"""
+
+    @abstractmethod
+    async def image_urls(self) -> List[str]:
+        """The distinct ``image_url`` of stored items that have one"""
+
+    @abstractmethod
+    async def explain(self, source: Optional[str], since: Optional[datetime],
+                      until: Optional[datetime]) -> List[str]:
+        """Like :meth:`Collection.explain`, for the first page of a query"""
+
+
+# Finished jobs are kept this long for inspection
+JOB_RETENTION = timedelta(days=7)
+
+
+class Storage(ABC):
+    """A storage backend; ``connect`` must be awaited before use"""
+
+    news: Collection
+    team: Collection
+    projects: Collection
+    contacts: Collection
+    donations: Collection
+    external_news: ExternalNewsArchive
+
+    def __init__(self, retention: timedelta):
+        self.retention = retention
+        # The seen-set outlives the items so expired stories are not scraped back in
+        self.seen_retention = retention * 2
+        # Set before connect to time every database call (used by profiling)
+        self.observer: Optional[Observer] = None
+
+    @abstractmethod
+    async def connect(self):
+        """Open connections and create indexes"""
+
+    @abstractmethod
+    async def close(self):
+        ...
+
+    @abstractmethod
+    async def expire(self):
+        """Drop external news and seen entries past their retention"""
+
+    @abstractmethod
+    async def bump_version(self, name: str) -> int:
+        """Increment and return the cache version of ``name``"""
+
+    @abstractmethod
+    async def load_versions(self) -> Dict[str, int]:
+        ...
+
+    @abstractmethod
+    async def acquire_lease(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        """Take or renew a named lease; True if ``holder`` now holds it"""
+
+    @abstractmethod
+    async def release_leases(self, holder: str):
+        ...
+
+    @abstractmethod
+    async def find_seen(self, keys: List[str], bands: List[str]) -> List[dict]:
+        """Seen-set entries whose key is in ``keys`` or which share one of ``bands``"""
+
+    @abstractmethod
+    async def record_seen(self, docs: List[dict]) -> Set[int]:
+        """Insert seen-set entries; returns the indexes of keys that already existed"""
+
+    @abstractmethod
+    async def load_rendered(self, name: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def save_rendered(self, name: str, doc: dict):
+        ...
+
+    @abstractmethod
+    async def load_checkpoint(self, name: str) -> Optional[dict]:
+        """Where the batch job ``name`` left off, or None"""
+
+    @abstractmethod
+    async def save_checkpoint(self, name: str, value: Optional[dict]):
+        """Record progress of ``name``; None clears it"""
+
+    # Jobs move from queued to running and end as done, failed or cancelled.
+    # A running job whose lease expired can be claimed again.
+
+    @abstractmethod
+    async def enqueue_job(self, job: dict) -> Tuple[str, bool]:
+        """Queue a job; False with the existing id if its ``dedupe_key`` is already queued"""
+
+    @abstractmethod
+    async def claim_job(self, owner: str, lease_seconds: float) -> Optional[dict]:
+        """Lease the most urgent runnable job to ``owner``, counting the attempt"""
+
+    @abstractmethod
+    async def extend_job_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        ...
+
+    @abstractmethod
+    async def finish_job(self, job_id: str, owner: str, status: str, error: Optional[str] = None) -> bool:
+        """End a job ``owner`` holds as done or failed"""
+
+    @abstractmethod
+    async def retry_job(self, job_id: str, owner: str, run_at: datetime, error: str) -> bool:
+        """Queue a job ``owner`` holds again at ``run_at``"""
+
+    @abstractmethod
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        ...
+
+
+# ============== MONGODB ==============
+
+def _projection(fields: Optional[Iterable[str]]) -> dict:
+    return {"_id": 0, **{name: 1 for name in fields}} if fields else {"_id": 0}
+
+
+def _stage_problems(plan) -> List[str]:
+    """COLLSCAN and blocking SORT stages anywhere in an explain() plan, and
+    FETCH stages that filter what the index scan could not"""
+    if isinstance(plan, list):
+        return [problem for step in plan for problem in _stage_problems(step)]
+    if not isinstance(plan, dict):
+        return []
+    problems = [plan["stage"]] if plan.get("stage") in ("COLLSCAN", "SORT") else []
+    if plan.get("stage") == "FETCH" and plan.get("filter"):
+        problems.append("FETCH with filter")
+    return problems + [problem for key, value in plan.items() if key != "rejectedPlans"
+                       for problem in _stage_problems(value)]
+
+
+class MongoCollection(Collection):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def find(self, where=None, fields=None, sort=None, limit=0):
+        cursor = self.collection.find(where or {}, _projection(fields))
+        if sort:
+            cursor = cursor.sort(list(sort))
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(limit or None)
+
+    async def find_one(self, where, fields=None, sort=None):
+        return await self.collection.find_one(where, _projection(fields), sort=list(sort) if sort else None)
+
+    async def insert_one(self, doc):
+        # insert_one adds _id to the document it is given
+        await self.collection.insert_one(dict(doc))
+
+    async def update_one(self, where, fields):
+        result = await self.collection.update_one(where, {"$set": fields})
+        return result.matched_count > 0
+
+    async def delete_one(self, where):
+        result = await self.collection.delete_one(where)
+        return result.deleted_count > 0
+
+    async def count(self, where=None):
+        return await self.collection.count_documents(where or {})
+
+    async def total(self, field, where=None):
+        result = await self.collection.aggregate([
+            {"$match": where or {}},
+            {"$group": {"_id": None, "total": {"$sum": f"${field}"}, "count": {"$sum": 1}}},
+        ]).to_list(1)
+        return (result[0]["total"], result[0]["count"]) if result else (0, 0)
+
+    async def bulk_write(self, creates, updates, deletes, where=None):
+        ops = [InsertOne(dict(doc)) for doc in creates]
+        ops += [UpdateOne({**(where or {}), "id": item_id}, {"$set": fields}) for item_id, fields in updates]
+        ops += [DeleteOne({"id": item_id}) for item_id in deletes]
+        if not ops:
+            return {}
+        try:
+            await self.collection.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            return {
+                error["index"]: error.get("errmsg", "Error de escritura")
+                for error in e.details.get("writeErrors", [])
+            }
+        return {}
+
+    async def explain(self, where=None, sort=None):
+        cursor = self.collection.find(where or {})
+        if sort:
+            cursor = cursor.sort(list(sort))
+        plan = await cursor.explain()
+        return _stage_problems(plan["queryPlanner"]["winningPlan"])
+
+
+class MongoExternalNewsArchive(ExternalNewsArchive):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def insert_many(self, docs):
+        if not docs:
+            return []
+        result = await self.collection.bulk_write([
+            UpdateOne({"url": doc["url"]}, {"$setOnInsert": dict(doc)}, upsert=True) for doc in docs
+        ], ordered=False)
+        if not result.upserted_ids:
+            return []
+        stored = await self.collection.find(
+            {"_id": {"$in": list(result.upserted_ids.values())}}, {"url": 1}
+        ).to_list(None)
+        urls = {doc["url"] for doc in stored}
+        return [doc for doc in docs if doc["url"] in urls]
+
+    def _query(self, source, since, until, cursor):
+        # Keyset pagination on (first_seen, _id): every page is an index range
+        # scan on (source, first_seen, _id) or (first_seen, _id)
+        query = {}
+        if source:
+            query["source"] = source
+        first_seen = {}
+        if since:
+            first_seen["$gte"] = since
+        if until:
+            first_seen["$lt"] = until
+        if cursor:
+            cursor_time, key = decode_cursor(cursor)
+            try:
+                cursor_id = ObjectId(key)
+            except InvalidId as e:
+                raise ValueError("invalid cursor") from e
+            first_seen["$lte"] = cursor_time
+            query["$nor"] = [{"first_seen": cursor_time, "_id": {"$gte": cursor_id}}]
+        if first_seen:
+            query["first_seen"] = first_seen
+        return query
+
+    async def page(self, source, since, until, limit, cursor, fields):
+        query = self._query(source, since, until, cursor)
+        # The cursor needs both sort keys even when the caller leaves them out
+        projection = {name: 1 for name in fields} | {"_id": 1, "first_seen": 1} if fields else None
+        docs = await self.collection.find(query, projection).sort(
+            [("first_seen", -1), ("_id", -1)]
+        ).limit(limit + 1).to_list(limit + 1)
+        next_cursor = encode_cursor(docs[limit - 1]["first_seen"], docs[limit - 1]["_id"]) if len(docs) > limit else None
+        for doc in docs:
+            doc.pop("_id")
+        return docs[:limit], next_cursor
+
+    async def unenriched(self, urls):
+        docs = await self.collection.find(
+            {"url": {"$in": urls}, "enriched_at": {"$exists": False}}, {"_id": 0, "url": 1}
+        ).to_list(None)
+        return [doc["url"] for doc in docs]
+
+    async def enrich(self, updates):
+        if updates:
+            await self.collection.bulk_write(
+                [UpdateOne({"url": url}, {"$set": fields}) for url, fields in updates], ordered=False
+            )
+
+    async def image_urls(self):
+        return [url for url in await self.collection.distinct("image_url") if url]
+
+    async def explain(self, source, since, until):
+        plan = await self.collection.find(self._query(source, since, until, None)).sort(
+            [("first_seen", -1), ("_id", -1)]
+        ).explain()
+        return _stage_problems(plan["queryPlanner"]["winningPlan"])
+
+
+class _CommandTimer(monitoring.CommandListener):
+    """Reports each Mongo command as ``<command> <collection>``"""
+
+    def __init__(self, observer: Observer):
+        self.observer = observer
+        self.names: Dict[int, str] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        self.names[event.request_id] = f"{event.command_name} {target}" if isinstance(target, str) else event.command_name
+
+    def succeeded(self, event):
+        self.observer(self.names.pop(event.request_id, event.command_name), event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.succeeded(event)
+
+
+class MongoStorage(Storage):
+    def __init__(self, url: str, name: str, retention: timedelta):
+        super().__init__(retention)
+        self.url = url
+        self.name = name
+        self.client = None
+        self.db = None
+
+    async def connect(self):
+        if self.observer:
+            self.client = AsyncIOMotorClient(self.url, event_listeners=[_CommandTimer(self.observer)])
+        else:
+            self.client = AsyncIOMotorClient(self.url)
+        self.db = self.client[self.name]
+        for name in COLLECTIONS:
+            setattr(self, name, MongoCollection(self.db[name]))
+        self.external_news = MongoExternalNewsArchive(self.db.external_news)
+
+        for name, indexes in COLLECTIONS.items():
+            await self.db[name].create_index("id", unique=True)
+            for keys in indexes:
+                await self.db[name].create_index(list(keys))
+        await self.db.external_news.create_index([("source", 1), ("first_seen", -1), ("_id", -1)])
+        await self.db.external_news.create_index([("first_seen", -1), ("_id", -1)])
+        await self.db.external_news.create_index("url")
+        await self.ensure_ttl_index("external_news", "first_seen", self.retention)
+        await self.db.news_seen.create_index("bands")
+        await self.ensure_ttl_index("news_seen", "first_seen", self.seen_retention)
+        await self.db.jobs.create_index("id", unique=True)
+        await self.db.jobs.create_index([("status", 1), ("priority", -1), ("run_at", 1)])
+        await self.db.jobs.create_index([("status", 1), ("lease_expires", 1)])
+        await self.db.jobs.create_index(
+            "dedupe_key", unique=True,
+            partialFilterExpression={"status": "queued", "dedupe_key": {"$type": "string"}},
+        )
+        await self.ensure_ttl_index("jobs", "finished_at", JOB_RETENTION)
+        await self.backfill_first_seen()
+
+    async def close(self):
+        if self.client:
+            self.client.close()
+
+    async def ensure_ttl_index(self, collection: str, field: str, retention: timedelta):
+        """Create a TTL index, updating expireAfterSeconds if the retention changed"""
+        seconds = int(retention.total_seconds())
+        try:
+            await self.db[collection].create_index(field, expireAfterSeconds=seconds)
+        except OperationFailure as e:
+            if e.code != 85:  # IndexOptionsConflict
+                raise
+            await self.db.command("collMod", collection, index={"keyPattern": {field: 1}, "expireAfterSeconds": seconds})
+
+    async def backfill_first_seen(self):
+        """Date items stored before first_seen existed from their ObjectId"""
+        docs = await self.db.external_news.find({"first_seen": {"$exists": False}}, {"_id": 1}).to_list(None)
+        if docs:
+            await self.db.external_news.bulk_write([
+                UpdateOne({"_id": doc["_id"]}, {"$set": {"first_seen": doc["_id"].generation_time}})
+                for doc in docs
+            ], ordered=False)
+
+    async def expire(self):
+        pass  # TTL indexes expire documents server-side
+
+    async def bump_version(self, name):
+        doc = await self.db.cache_versions.find_one_and_update(
+            {"_id": name}, {"$inc": {"v": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return doc["v"]
+
+    async def load_versions(self):
+        return {doc["_id"]: doc["v"] async for doc in self.db.cache_versions.find({})}
+
+    async def acquire_lease(self, name, holder, ttl_seconds):
+        now = datetime.now(timezone.utc)
+        try:
+            await self.db.leases.update_one(
+                {"_id": name, "$or": [{"holder": holder}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            # Another holder's lease is still valid
+            return False
+
+    async def release_leases(self, holder):
+        await self.db.leases.delete_many({"holder": holder})
+
+    async def find_seen(self, keys, bands):
+        docs = await self.db.news_seen.find(
+            {"$or": [{"_id": {"$in": keys}}, {"bands": {"$in": bands}}]}, {"_id": 1, "simhash": 1}
+        ).to_list(None)
+        return [{"key": doc["_id"], "simhash": doc.get("simhash")} for doc in docs]
+
+    async def record_seen(self, docs):
+        try:
+            await self.db.news_seen.insert_many(
+                [{"_id": doc["key"], **{k: v for k, v in doc.items() if k != "key"}} for doc in docs],
+                ordered=False,
+            )
+        except BulkWriteError as e:
+            return {error["index"] for error in e.details.get("writeErrors", [])}
+        return set()
+
+    async def load_rendered(self, name):
+        return await self.db.rendered_feeds.find_one({"_id": name})
+
+    async def save_rendered(self, name, doc):
+        await self.db.rendered_feeds.replace_one({"_id": name}, doc, upsert=True)
+
+    async def load_checkpoint(self, name):
+        doc = await self.db.checkpoints.find_one({"_id": name})
+        return doc["value"] if doc else None
+
+    async def save_checkpoint(self, name, value):
+        if value is None:
+            await self.db.checkpoints.delete_one({"_id": name})
+        else:
+            await self.db.checkpoints.replace_one({"_id": name}, {"value": value}, upsert=True)
+
+    async def enqueue_job(self, job):
+        while True:
+            try:
+                await self.db.jobs.insert_one(dict(job))
+                return job["id"], True
+            except DuplicateKeyError:
+                # Merge into the queued duplicate, keeping the more urgent schedule
+                existing = await self.db.jobs.find_one_and_update(
+                    {"dedupe_key": job["dedupe_key"], "status": "queued"},
+                    {"$max": {"priority": job["priority"]}, "$min": {"run_at": job["run_at"]}},
+                    projection={"_id": 0, "id": 1},
+                )
+                if existing:
+                    return existing["id"], False
+
+    async def claim_job(self, owner, lease_seconds):
+        now = datetime.now(timezone.utc)
+        return await self.db.jobs.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "run_at": {"$lte": now}},
+                {"status": "running", "lease_expires": {"$lt": now}},
+            ]},
+            {"$set": {"status": "running", "lease_owner": owner,
+                      "lease_expires": now + timedelta(seconds=lease_seconds)},
+             "$inc": {"attempts": 1}},
+            sort=[("priority", -1), ("run_at", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _held(self, job_id, owner):
+        return {"id": job_id, "status": "running", "lease_owner": owner}
+
+    async def extend_job_lease(self, job_id, owner, lease_seconds):
+        result = await self.db.jobs.update_one(self._held(job_id, owner), {"$set": {
+            "lease_expires": datetime.now(timezone.utc) + timedelta(seconds=lease_seconds),
+        }})
+        return result.matched_count > 0
+
+    async def finish_job(self, job_id, owner, status, error=None):
+        result = await self.db.jobs.update_one(self._held(job_id, owner), {"$set": {
+            "status": status, "last_error": error, "finished_at": datetime.now(timezone.utc),
+            "lease_owner": None, "lease_expires": None,
+        }})
+        return result.matched_count > 0
+
+    async def retry_job(self, job_id, owner, run_at, error):
+        try:
+            result = await self.db.jobs.update_one(self._held(job_id, owner), {"$set": {
+                "status": "queued", "run_at": run_at, "last_error": error,
+                "lease_owner": None, "lease_expires": None,
+            }})
+        except DuplicateKeyError:
+            # An identical job was queued meanwhile and will do the work
+            return await self.finish_job(job_id, owner, "cancelled", error)
+        return result.matched_count > 0
+
+    async def get_job(self, job_id):
+        return await self.db.jobs.find_one({"id": job_id}, {"_id": 0})
+
+
+# ============== SQLITE ==============
+
+def _sql_value(value):
+    """Bind parameter for a value compared against JSON-extracted data"""
+    if isinstance(value, datetime):
+        return _iso(value)
+    return value
+
+
+def _iso(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return _iso(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _dumps(doc: dict) -> str:
+    return json.dumps(doc, default=_json_default, ensure_ascii=False)
+
+
+def _millis(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _from_millis(value: Optional[int]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc) if value is not None else None
+
+
+def _column(field: str) -> str:
+    if not field.replace("_", "").isalnum():
+        raise ValueError(f"invalid field name: {field}")
+    return "id" if field == "id" else f"json_extract(data, '$.{field}')"
+
+
+def _where(where: Optional[dict]) -> Tuple[str, list]:
+    """Translate a filter into a SQL condition and its parameters"""
+    clauses, params = [], []
+    comparisons = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+    for field, condition in (where or {}).items():
+        column = _column(field)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, value in condition.items():
+            if op == "$eq" and value is None:
+                clauses.append(f"{column} IS NULL")
+            elif op == "$eq":
+                clauses.append(f"{column} = ?")
+                params.append(_sql_value(value))
+            elif op == "$in":
+                values = list(value)
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})" if values else "0")
+                params.extend(_sql_value(v) for v in values)
+            elif op in comparisons:
+                clauses.append(f"{column} {comparisons[op]} ?")
+                params.append(_sql_value(value))
+            elif op == "$exists":
+                json_path = f"'$.{field}'"
+                clauses.append(f"json_type(data, {json_path}) IS {'NOT ' if value else ''}NULL")
+            else:
+                raise ValueError(f"unsupported operator: {op}")
+    return (" AND ".join(clauses) or "1"), params
+
+
+def _order_by(sort: Optional[Sort], tiebreak: str = "") -> str:
+    terms = [f"{_column(field)} {'DESC' if direction < 0 else 'ASC'}" for field, direction in sort or ()]
+    if tiebreak:
+        terms.append(tiebreak)
+    return f" ORDER BY {', '.join(terms)}" if terms else ""
+
+
+def _query_plan_problems(conn, sql: str, params: list, filtered: bool) -> List[str]:
+    """Full table scans and temporary sort trees in EXPLAIN QUERY PLAN.
+
+    A filtered query that walks a whole index (SCAN ... USING INDEX) only got
+    its order from it and reads every row, so that counts as a scan too.
+    """
+    details = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    return [detail for detail in details
+            if (detail.startswith("SCAN ") and (filtered or " INDEX " not in detail)) or "TEMP B-TREE" in detail]
+
+
+def _pick(doc: dict, fields: Optional[Iterable[str]]) -> dict:
+    return {name: doc[name] for name in fields if name in doc} if fields else doc
+
+
+class SQLiteCollection(Collection):
+    def __init__(self, storage: "SQLiteStorage", name: str):
+        self.storage = storage
+        self.name = name
+
+    def _select(self, where, sort, limit) -> Tuple[str, list]:
+        condition, params = _where(where)
+        # Like Mongo, unsorted results come in whatever order the plan yields
+        sql = f"SELECT data FROM {self.name} WHERE {condition}{_order_by(sort, 'rowid ASC' if sort else '')}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return sql, params
+
+    def _find(self, conn, where, sort, limit):
+        sql, params = self._select(where, sort, limit)
+        return [json.loads(row[0]) for row in conn.execute(sql, params)]
+
+    async def find(self, where=None, fields=None, sort=None, limit=0):
+        docs = await self.storage.run(self._find, where, sort, limit)
+        return [_pick(doc, fields) for doc in docs]
+
+    def _insert(self, conn, doc):
+        conn.execute(f"INSERT INTO {self.name} (id, data) VALUES (?, ?)", (doc["id"], _dumps(doc)))
+
+    async def insert_one(self, doc):
+        try:
+            await self.storage.run(self._insert, doc)
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e)) from e
+
+    def _update(self, conn, where, fields):
+        condition, params = _where(where)
+        row = conn.execute(f"SELECT rowid, data FROM {self.name} WHERE {condition} LIMIT 1", params).fetchone()
+        if row is None:
+            return False
+        doc = json.loads(row[1])
+        doc.update(fields)
+        conn.execute(f"UPDATE {self.name} SET id = ?, data = ? WHERE rowid = ?", (doc["id"], _dumps(doc), row[0]))
+        return True
+
+    async def update_one(self, where, fields):
+        return await self.storage.run(self._update, where, fields)
+
+    def _delete(self, conn, where):
+        condition, params = _where(where)
+        cursor = conn.execute(
+            f"DELETE FROM {self.name} WHERE rowid = (SELECT rowid FROM {self.name} WHERE {condition} LIMIT 1)", params
+        )
+        return cursor.rowcount > 0
+
+    async def delete_one(self, where):
+        return await self.storage.run(self._delete, where)
+
+    def _count(self, conn, where):
+        condition, params = _where(where)
+        return conn.execute(f"SELECT COUNT(*) FROM {self.name} WHERE {condition}", params).fetchone()[0]
+
+    async def count(self, where=None):
+        return await self.storage.run(self._count, where)
+
+    def _total(self, conn, field, where):
+        condition, params = _where(where)
+        total, count = conn.execute(
+            f"SELECT COALESCE(SUM({_column(field)}), 0), COUNT(*) FROM {self.name} WHERE {condition}", params
+        ).fetchone()
+        return total, count
+
+    async def total(self, field, where=None):
+        return await self.storage.run(self._total, field, where)
+
+    def _bulk_write(self, conn, creates, updates, deletes, where):
+        errors = {}
+        index = 0
+        conn.execute("BEGIN")
+        try:
+            for doc in creates:
+                try:
+                    self._insert(conn, doc)
+                except sqlite3.IntegrityError as e:
+                    errors[index] = f"E11000 duplicate key error: {e}"
+                index += 1
+            for item_id, fields in updates:
+                self._update(conn, {**(where or {}), "id": item_id}, fields)
+                index += 1
+            for item_id in deletes:
+                self._delete(conn, {"id": item_id})
+                index += 1
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return errors
+
+    async def bulk_write(self, creates, updates, deletes, where=None):
+        return await self.storage.run(self._bulk_write, creates, updates, deletes, where)
+
+    async def explain(self, where=None, sort=None):
+        return await self.storage.run(_query_plan_problems, *self._select(where, sort, 0), bool(where))
+
+
+class SQLiteExternalNewsArchive(ExternalNewsArchive):
+    def __init__(self, storage: "SQLiteStorage"):
+        self.storage = storage
+
+    def _insert_many(self, conn, docs):
+        inserted = []
+        conn.execute("BEGIN")
+        for doc in docs:
+            cursor = conn.execute(
+                "INSERT INTO external_news (source, first_seen, data) SELECT ?, ?, ? WHERE NOT EXISTS "
+                "(SELECT 1 FROM external_news WHERE json_extract(data, '$.url') = ?)",
+                (doc["source"], _millis(doc["first_seen"]), _dumps(doc), doc["url"]),
+            )
+            if cursor.rowcount:
+                inserted.append(doc)
+        conn.execute("COMMIT")
+        return inserted
+
+    async def insert_many(self, docs):
+        return await self.storage.run(self._insert_many, docs) if docs else []
+
+    def _select(self, source, since, until, limit, after) -> Tuple[str, list]:
+        clauses, params = [], []
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if since:
+            clauses.append("first_seen >= ?")
+            params.append(_millis(since))
+        if until:
+            clauses.append("first_seen < ?")
+            params.append(_millis(until))
+        if after:
+            clauses.append("(first_seen < ? OR (first_seen = ? AND seq < ?))")
+            params.extend((after[0], after[0], after[1]))
+        condition = " AND ".join(clauses) or "1"
+        return (f"SELECT seq, first_seen, data FROM external_news WHERE {condition} "
+                f"ORDER BY first_seen DESC, seq DESC LIMIT ?", params + [limit + 1])
+
+    def _page(self, conn, source, since, until, limit, after):
+        return conn.execute(*self._select(source, since, until, limit, after)).fetchall()
+
+    async def page(self, source, since, until, limit, cursor, fields):
+        after = None
+        if cursor:
+            cursor_time, key = decode_cursor(cursor)
+            if not key.isdigit():
+                raise ValueError("invalid cursor")
+            after = (_millis(cursor_time), int(key))
+        rows = await self.storage.run(self._page, source, since, until, limit, after)
+        next_cursor = None
+        if len(rows) > limit:
+            seq, first_seen = rows[limit - 1][:2]
+            next_cursor = encode_cursor(datetime.fromtimestamp(first_seen / 1000, tz=timezone.utc), seq)
+        return [_pick(json.loads(row[2]), fields) for row in rows[:limit]], next_cursor
+
+    def _unenriched(self, conn, urls):
+        rows = conn.execute(
+            f"SELECT json_extract(data, '$.url') FROM external_news WHERE json_extract(data, '$.url') "
+            f"IN ({', '.join('?' * len(urls))}) AND json_type(data, '$.enriched_at') IS NULL", list(urls)
+        )
+        return [row[0] for row in rows]
+
+    async def unenriched(self, urls):
+        return await self.storage.run(self._unenriched, urls) if urls else []
+
+    def _image_urls(self, conn):
+        rows = conn.execute(
+            "SELECT DISTINCT json_extract(data, '$.image_url') FROM external_news "
+            "WHERE json_type(data, '$.image_url') = 'text'"
+        )
+        return [row[0] for row in rows]
+
+    async def image_urls(self):
+        return await self.storage.run(self._image_urls)
+
+    def _enrich(self, conn, updates):
+        conn.execute("BEGIN")
+        conn.executemany(
+            "UPDATE external_news SET data = json_patch(data, ?) WHERE json_extract(data, '$.url') = ?",
+            [(_dumps(fields), url) for url, fields in updates],
+        )
+        conn.execute("COMMIT")
+
+    async def enrich(self, updates):
+        if updates:
+            await self.storage.run(self._enrich, updates)
+
+    async def explain(self, source, since, until):
+        return await self.storage.run(_query_plan_problems, *self._select(source, since, until, 1, None),
+                                      bool(source or since or until))
+
+
+def _operation_name(func) -> str:
+    """``find news`` for a collection's ``_find``; ``query`` for inline SQL"""
+    name = func.__name__.lstrip("_")
+    if name == "<lambda>":
+        return "query"
+    collection = getattr(getattr(func, "__self__", None), "name", None)
+    return f"{name} {collection}" if isinstance(collection, str) else name
+
+
+class SQLiteStorage(Storage):
+    """Embedded backend; one connection used from a single worker thread"""
+
+    def __init__(self, path: str, retention: timedelta):
+        super().__init__(retention)
+        self.path = path
+        self.conn: Optional[sqlite3.Connection] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        for name in COLLECTIONS:
+            setattr(self, name, SQLiteCollection(self, name))
+        self.external_news = SQLiteExternalNewsArchive(self)
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        if self.observer is None:
+            return await loop.run_in_executor(self.executor, func, self.conn, *args)
+        start = loop.time()
+        try:
+            return await loop.run_in_executor(self.executor, func, self.conn, *args)
+        finally:
+            self.observer(_operation_name(func), loop.time() - start)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for name, indexes in COLLECTIONS.items():
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (id TEXT NOT NULL UNIQUE, data TEXT NOT NULL)")
+            for keys in indexes:
+                index_name = f"{name}_{'_'.join(field for field, _ in keys)}"
+                columns = ", ".join(f"{_column(field)} {'DESC' if d < 0 else 'ASC'}" for field, d in keys)
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {name} ({columns})")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS external_news (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL, first_seen INTEGER NOT NULL, data TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS external_news_source_first_seen
+                ON external_news (source, first_seen DESC, seq DESC);
+            CREATE INDEX IF NOT EXISTS external_news_first_seen ON external_news (first_seen DESC, seq DESC);
+            CREATE INDEX IF NOT EXISTS external_news_url ON external_news (json_extract(data, '$.url'));
+            CREATE TABLE IF NOT EXISTS news_seen (
+                key TEXT PRIMARY KEY, first_seen INTEGER NOT NULL, data TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS news_seen_first_seen ON news_seen (first_seen);
+            CREATE TABLE IF NOT EXISTS news_seen_bands (
+                band TEXT NOT NULL, key TEXT NOT NULL REFERENCES news_seen (key) ON DELETE CASCADE);
+            CREATE INDEX IF NOT EXISTS news_seen_bands_band ON news_seen_bands (band);
+            CREATE INDEX IF NOT EXISTS news_seen_bands_key ON news_seen_bands (key);
+            CREATE TABLE IF NOT EXISTS cache_versions (name TEXT PRIMARY KEY, v INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS rendered_feeds (name TEXT PRIMARY KEY, body BLOB NOT NULL, data TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS checkpoints (name TEXT PRIMARY KEY, data TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, priority INTEGER NOT NULL,
+                run_at INTEGER NOT NULL, attempts INTEGER NOT NULL, dedupe_key TEXT,
+                lease_owner TEXT, lease_expires INTEGER, finished_at INTEGER, data TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS jobs_runnable ON jobs (status, priority DESC, run_at);
+            CREATE INDEX IF NOT EXISTS jobs_lease ON jobs (status, lease_expires);
+            CREATE UNIQUE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key) WHERE status = 'queued';
+            CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+        """)
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    async def connect(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self.conn = await asyncio.get_running_loop().run_in_executor(self.executor, self._connect)
+        await self.expire()
+
+    async def close(self):
+        if self.conn:
+            await self.run(lambda conn: conn.close())
+            self.conn = None
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+
+    def _expire(self, conn, news_before, seen_before, jobs_before):
+        conn.execute("BEGIN")
+        conn.execute("DELETE FROM external_news WHERE first_seen < ?", (news_before,))
+        conn.execute("DELETE FROM news_seen WHERE first_seen < ?", (seen_before,))
+        conn.execute("DELETE FROM jobs WHERE finished_at < ?", (jobs_before,))
+        conn.execute("COMMIT")
+
+    async def expire(self):
+        now = datetime.now(timezone.utc)
+        await self.run(self._expire, _millis(now - self.retention), _millis(now - self.seen_retention),
+                       _millis(now - JOB_RETENTION))
+
+    async def bump_version(self, name):
+        return await self.run(lambda conn: conn.execute(
+            "INSERT INTO cache_versions (name, v) VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET v = v + 1 RETURNING v", (name,)
+        ).fetchone()[0])
+
+    async def load_versions(self):
+        return await self.run(lambda conn: dict(conn.execute("SELECT name, v FROM cache_versions")))
+
+    async def acquire_lease(self, name, holder, ttl_seconds):
+        now = datetime.now(timezone.utc).timestamp()
+        row = await self.run(lambda conn: conn.execute(
+            "INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at "
+            "WHERE leases.holder = excluded.holder OR leases.expires_at < ? RETURNING holder",
+            (name, holder, now + ttl_seconds, now)
+        ).fetchone())
+        return row is not None
+
+    async def release_leases(self, holder):
+        await self.run(lambda conn: conn.execute("DELETE FROM leases WHERE holder = ?", (holder,)))
+
+    def _find_seen(self, conn, keys, bands):
+        keys_sql = ", ".join("?" * len(keys)) or "NULL"
+        bands_sql = ", ".join("?" * len(bands)) or "NULL"
+        rows = conn.execute(
+            f"SELECT key, data FROM news_seen WHERE key IN ({keys_sql}) "
+            f"OR key IN (SELECT key FROM news_seen_bands WHERE band IN ({bands_sql}))", list(keys) + list(bands)
+        )
+        return [{"key": key, "simhash": json.loads(data).get("simhash")} for key, data in rows]
+
+    async def find_seen(self, keys, bands):
+        return await self.run(self._find_seen, keys, bands)
+
+    def _record_seen(self, conn, docs):
+        existing = set()
+        conn.execute("BEGIN")
+        for index, doc in enumerate(docs):
+            cursor = conn.execute(
+                "INSERT INTO news_seen (key, first_seen, data) VALUES (?, ?, ?) ON CONFLICT (key) DO NOTHING",
+                (doc["key"], _millis(doc["first_seen"]), _dumps(doc)),
+            )
+            if cursor.rowcount == 0:
+                existing.add(index)
+            else:
+                conn.executemany("INSERT INTO news_seen_bands (band, key) VALUES (?, ?)",
+                                 [(band, doc["key"]) for band in doc.get("bands", [])])
+        conn.execute("COMMIT")
+        return existing
+
+    async def record_seen(self, docs):
+        return await self.run(self._record_seen, docs)
+
+    def _load_rendered(self, conn, name):
+        row = conn.execute("SELECT body, data FROM rendered_feeds WHERE name = ?", (name,)).fetchone()
+        return {**json.loads(row[1]), "body": bytes(row[0])} if row else None
+
+    async def load_rendered(self, name):
+        return await self.run(self._load_rendered, name)
+
+    async def save_rendered(self, name, doc):
+        data = _dumps({k: v for k, v in doc.items() if k != "body"})
+        await self.run(lambda conn: conn.execute(
+            "INSERT OR REPLACE INTO rendered_feeds (name, body, data) VALUES (?, ?, ?)", (name, doc["body"], data)
+        ))
+
+    async def load_checkpoint(self, name):
+        row = await self.run(lambda conn: conn.execute(
+            "SELECT data FROM checkpoints WHERE name = ?", (name,)
+        ).fetchone())
+        return json.loads(row[0]) if row else None
+
+    async def save_checkpoint(self, name, value):
+        if value is None:
+            await self.run(lambda conn: conn.execute("DELETE FROM checkpoints WHERE name = ?", (name,)))
+        else:
+            data = _dumps(value)
+            await self.run(lambda conn: conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (name, data) VALUES (?, ?)", (name, data)
+            ))
+
+    def _job(self, row) -> dict:
+        job_id, kind, status, priority, run_at, attempts, dedupe_key, lease_owner, lease_expires, finished_at, data = row
+        return {
+            "id": job_id, "kind": kind, "status": status, "priority": priority, "run_at": _from_millis(run_at),
+            "attempts": attempts, "dedupe_key": dedupe_key, "lease_owner": lease_owner,
+            "lease_expires": _from_millis(lease_expires), "finished_at": _from_millis(finished_at),
+            **json.loads(data),
+        }
+
+    def _enqueue_job(self, conn, job):
+        data = _dumps({k: job[k] for k in ("payload", "last_error", "created_at")})
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, priority, run_at, attempts, dedupe_key, data) "
+                "VALUES (?, ?, 'queued', ?, ?, 0, ?, ?)",
+                (job["id"], job["kind"], job["priority"], _millis(job["run_at"]), job["dedupe_key"], data),
+            )
+            return job["id"], True
+        except sqlite3.IntegrityError:
+            # Merge into the queued duplicate, keeping the more urgent schedule
+            row = conn.execute(
+                "UPDATE jobs SET priority = MAX(priority, ?), run_at = MIN(run_at, ?) "
+                "WHERE dedupe_key = ? AND status = 'queued' RETURNING id",
+                (job["priority"], _millis(job["run_at"]), job["dedupe_key"]),
+            ).fetchone()
+            return row[0], False
+
+    async def enqueue_job(self, job):
+        return await self.run(self._enqueue_job, job)
+
+    def _claim_job(self, conn, owner, lease_seconds):
+        now = _millis(datetime.now(timezone.utc))
+        candidates = conn.execute(
+            "SELECT id, priority, run_at FROM jobs WHERE status = 'queued' AND run_at <= ? "
+            "ORDER BY priority DESC, run_at LIMIT 1", (now,)
+        ).fetchall() + conn.execute(
+            "SELECT id, priority, run_at FROM jobs WHERE status = 'running' AND lease_expires < ? "
+            "ORDER BY priority DESC, run_at LIMIT 1", (now,)
+        ).fetchall()
+        if not candidates:
+            return None
+        job_id = min(candidates, key=lambda row: (-row[1], row[2]))[0]
+        row = conn.execute(
+            "UPDATE jobs SET status = 'running', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+            "WHERE id = ? RETURNING " + _JOB_COLUMNS,
+            (owner, now + int(lease_seconds * 1000), job_id),
+        ).fetchone()
+        return self._job(row)
+
+    async def claim_job(self, owner, lease_seconds):
+        return await self.run(self._claim_job, owner, lease_seconds)
+
+    async def extend_job_lease(self, job_id, owner, lease_seconds):
+        expires = _millis(datetime.now(timezone.utc)) + int(lease_seconds * 1000)
+        return await self.run(lambda conn: conn.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+            (expires, job_id, owner)
+        ).rowcount > 0)
+
+    def _finish_job(self, conn, job_id, owner, status, error):
+        return conn.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, lease_owner = NULL, lease_expires = NULL, "
+            "data = json_set(data, '$.last_error', ?) WHERE id = ? AND status = 'running' AND lease_owner = ?",
+            (status, _millis(datetime.now(timezone.utc)), error, job_id, owner)
+        ).rowcount > 0
+
+    async def finish_job(self, job_id, owner, status, error=None):
+        return await self.run(self._finish_job, job_id, owner, status, error)
+
+    def _retry_job(self, conn, job_id, owner, run_at, error):
+        try:
+            return conn.execute(
+                "UPDATE jobs SET status = 'queued', run_at = ?, lease_owner = NULL, lease_expires = NULL, "
+                "data = json_set(data, '$.last_error', ?) WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (_millis(run_at), error, job_id, owner)
+            ).rowcount > 0
+        except sqlite3.IntegrityError:
+            # An identical job was queued meanwhile and will do the work
+            return self._finish_job(conn, job_id, owner, "cancelled", error)
+
+    async def retry_job(self, job_id, owner, run_at, error):
+        return await self.run(self._retry_job, job_id, owner, run_at, error)
+
+    async def get_job(self, job_id):
+        row = await self.run(lambda conn: conn.execute(
+            f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone())
+        return self._job(row) if row else None
+
+
+_JOB_COLUMNS = "id, kind, status, priority, run_at, attempts, dedupe_key, lease_owner, lease_expires, finished_at, data"
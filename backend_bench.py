@@ -0,0 +1,440 @@
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import httpx
+from pydantic import TypeAdapter
+
+BACKEND_DIR = Path(__file__).parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+import server  # noqa: E402
+
+WORDS = (
+    "la fundación comunidad indígena desarrollo social proyecto córdoba sucre programa "
+    "bienestar economía cultura deporte formación capacitación salud mental familias "
+    "municipio gobernación contraloría boletín recursos inversión educación jóvenes "
+    "mujeres emprendimiento territorio sabana san andrés de sotavento resguardo zenú"
+).split()
+
+
+def fill_image_cache(root, max_bytes, worker, files, size):
+    """One worker writing ``files`` variants into a shared image cache; returns seconds"""
+    cache = server.ImageCache(Path(root), max_bytes, grace_seconds=0)
+    cache.load()
+    start = time.perf_counter()
+    for i in range(files):
+        path = cache.variant_path(f"{worker}-{i:05d}", 320, "webp")
+        path.write_bytes(b"x" * size)
+        cache.add(path, size)
+    return time.perf_counter() - start
+
+
+def paragraph(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+class RoundTrips(httpx.AsyncBaseTransport):
+    """Adds a network round trip to every request, sent over a few connections"""
+
+    def __init__(self, transport, rtt, connections):
+        self.transport = transport
+        self.rtt = rtt
+        self.slots = asyncio.Semaphore(connections)
+
+    async def handle_async_request(self, request):
+        async with self.slots:
+            await asyncio.sleep(self.rtt)
+            return await self.transport.handle_async_request(request)
+
+
+class FunsomexBenchmark:
+    def __init__(self, iterations=50, seed=7):
+        self.iterations = iterations
+        self.rng = random.Random(seed)
+
+    def news_payload(self, count=20, content_words=900):
+        items = []
+        for i in range(count):
+            items.append({
+                "id": f"news-{i}",
+                "title": paragraph(self.rng, 10),
+                "content": "\n\n".join(paragraph(self.rng, content_words // 6) for _ in range(6)),
+                "summary": paragraph(self.rng, 30),
+                "image_url": f"https://images.unsplash.com/photo-{1550000000 + i}?w=800&q=80",
+                "source": "FUNSOMEX",
+                "source_url": None,
+                "category": self.rng.choice(["general", "proyectos", "comunidad"]),
+                "published_date": "2026-01-15T10:00:00+00:00",
+                "is_external": False,
+                "created_at": "2026-01-15T10:00:00+00:00",
+            })
+        return json.dumps(items).encode()
+
+    def external_news_payload(self, count=50):
+        items = []
+        for i in range(count):
+            source = self.rng.choice(list(server.NEWS_SOURCES))
+            items.append({
+                "title": paragraph(self.rng, 14)[:150],
+                "url": f"{server.NEWS_SOURCES[source].rstrip('/')}/noticia-{i}",
+                "source": source,
+                "date": "2026-01-15",
+            })
+        return json.dumps(items).encode()
+
+    def time_ms(self, func, *args):
+        samples = []
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            func(*args)
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
+
+    def bench_encodings(self, name, body):
+        """CPU cost and bytes on the wire per encoding and level"""
+        print(f"\n📦 {name}: {len(body) / 1024:.1f} KiB uncompressed")
+        print(f"   {'encoding':<10}{'level':>6}{'bytes':>10}{'ratio':>8}{'ms':>9}")
+        for encoding, levels in (("gzip", (1, 6, 9)), ("br", (1, 5, 9))):
+            for level in levels:
+                if encoding == "gzip":
+                    func = lambda data, lvl=level: server.gzip.compress(data, compresslevel=lvl, mtime=0)
+                else:
+                    func = lambda data, lvl=level: server.brotli.compress(data, quality=lvl)
+                size = len(func(body))
+                ms = self.time_ms(func, body)
+                print(f"   {encoding:<10}{level:>6}{size:>10}{len(body) / size:>8.1f}{ms:>9.3f}")
+
+    def bench_middleware(self, name, body, encoding="br"):
+        """Per-request cost of the middleware with a cold vs memoized body"""
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": body})
+
+        middleware = server.CompressionMiddleware(app)
+        scope = {
+            "type": "http", "method": "GET", "path": "/api/news", "query_string": b"",
+            "headers": [(b"accept-encoding", encoding.encode())],
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            pass
+
+        async def run(cold):
+            samples = []
+            for _ in range(self.iterations):
+                if cold:
+                    server.collection_versions["news"] = server.collection_versions.get("news", 0) + 1
+                start = time.perf_counter()
+                await middleware(scope, receive, send)
+                samples.append((time.perf_counter() - start) * 1000)
+            return statistics.median(samples)
+
+        cold = asyncio.run(run(cold=True))
+        warm = asyncio.run(run(cold=False))
+        print(f"\n⚡ Middleware {name} ({encoding}): cold {cold:.3f} ms, memoized {warm:.3f} ms")
+        return cold, warm
+
+    def bench_views(self, count=20, content_words=900):
+        """Validation + serialization cost and size of full vs card list views"""
+        docs = json.loads(self.news_payload(count, content_words))
+        print(f"\n🗂️  /api/news views ({count} articles of ~{content_words} words)")
+        print(f"   {'view':<8}{'bytes':>10}{'ms':>9}")
+        for view, model in (("full", server.NewsArticle), ("card", server.NewsCard)):
+            adapter = TypeAdapter(List[model])
+            fields = server.card_fields(model) if view == "card" else None
+            rows = [{k: v for k, v in doc.items() if k in fields} for doc in docs] if fields else docs
+            size = len(adapter.dump_json(adapter.validate_python(rows)))
+            ms = self.time_ms(lambda: adapter.dump_json(adapter.validate_python(rows)))
+            print(f"   {view:<8}{size:>10}{ms:>9.3f}")
+
+    async def storage_latencies(self, storage, count):
+        """Median latency in ms of the storage calls made by the hot routes"""
+        docs = json.loads(self.news_payload(count, content_words=300))
+        external = json.loads(self.external_news_payload(count))
+        now = server.datetime.now(server.timezone.utc)
+        for i, item in enumerate(external):
+            item["first_seen"] = now - server.timedelta(minutes=i // 10)
+        for doc in docs:
+            await storage.news.insert_one(doc)
+        await storage.external_news.insert_many(external)
+
+        card = server.card_fields(server.NewsCard)
+        operations = {
+            "news list (card)": lambda: storage.news.find(None, card, sort=[("published_date", -1)], limit=20),
+            "news by category": lambda: storage.news.find({"category": "proyectos"}, card,
+                                                          sort=[("published_date", -1)], limit=20),
+            "news by id": lambda: storage.news.find_one({"id": f"news-{self.rng.randrange(count)}"}),
+            "news update": lambda: storage.news.update_one({"id": f"news-{self.rng.randrange(count)}"},
+                                                           {"category": self.rng.choice(["general", "comunidad"])}),
+            "external page": lambda: storage.external_news.page(None, None, None, 50, None,
+                                                                 server.card_fields(server.ExternalNewsCard)),
+            "cache version bump": lambda: storage.bump_version("news"),
+        }
+        results = {}
+        for name, operation in operations.items():
+            samples = []
+            for _ in range(self.iterations):
+                start = time.perf_counter()
+                await operation()
+                samples.append((time.perf_counter() - start) * 1000)
+            results[name] = statistics.median(samples)
+        return results
+
+    def bench_storage(self, mongo_url=None, count=500):
+        """Median latency of the same storage calls on each backend"""
+        retention = server.timedelta(days=180)
+
+        async def run(backend):
+            if backend == "sqlite":
+                with tempfile.TemporaryDirectory() as tmp:
+                    storage = server.SQLiteStorage(str(Path(tmp) / "bench.db"), retention)
+                    await storage.connect()
+                    try:
+                        return await self.storage_latencies(storage, count)
+                    finally:
+                        await storage.close()
+            storage = server.MongoStorage(mongo_url, f"funsomex_bench_{os.getpid()}", retention)
+            await storage.connect()
+            try:
+                return await self.storage_latencies(storage, count)
+            finally:
+                await storage.client.drop_database(storage.name)
+                await storage.close()
+
+        backends = ["sqlite"] + (["mongo"] if mongo_url else [])
+        results = {backend: asyncio.run(run(backend)) for backend in backends}
+        print(f"\n🗄️  Storage backends ({count} news, {count} external news), median ms")
+        print(f"   {'operation':<22}" + "".join(f"{backend:>10}" for backend in backends))
+        for name in results["sqlite"]:
+            print(f"   {name:<22}" + "".join(f"{results[backend][name]:>10.3f}" for backend in backends))
+        return results
+
+    def bench_image_cache(self, file_counts=(1000, 5000, 20000), workers=4, files=500, size=20 * 1024):
+        """Eviction scan cost by cache size, and several workers sharing one budget"""
+        print("\n🖼️  Image cache")
+        print(f"   {'files':<10}{'scan ms':>10}")
+        for count in file_counts:
+            with tempfile.TemporaryDirectory() as tmp:
+                cache = server.ImageCache(Path(tmp), 1 << 40)
+                cache.load()
+                for i in range(count):
+                    cache.variant_path(f"{i:06d}", 320, "webp").write_bytes(b"x")
+                print(f"   {count:<10}{self.time_ms(cache.evict):>10.2f}")
+
+        max_bytes = files * size // 2
+        with tempfile.TemporaryDirectory() as tmp:
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                seconds = pool.starmap(fill_image_cache, [(tmp, max_bytes, n, files, size) for n in range(workers)])
+            stored = sum(path.stat().st_size for path in (Path(tmp) / "variants").iterdir())
+        print(f"   {workers} workers x {files} files of {size // 1024} KB into {max_bytes // 1024} KB: "
+              f"{workers * files / max(seconds):.0f} adds/s, {stored // 1024} KB left on disk")
+
+    async def seed_home(self, storage, count=50):
+        """Home page content: news, external news, projects and donations"""
+        for doc in json.loads(self.news_payload(count // 2, content_words=300)):
+            await storage.news.insert_one(doc)
+        now = server.datetime.now(server.timezone.utc)
+        external = json.loads(self.external_news_payload(count))
+        for i, item in enumerate(external):
+            item["first_seen"] = now - server.timedelta(minutes=i)
+        await storage.external_news.insert_many(external)
+        for i in range(count // 2):
+            await storage.projects.insert_one(server.project_to_doc(server.Project(
+                title=paragraph(self.rng, 6), description=paragraph(self.rng, 200), category="salud",
+                image_url=f"https://images.unsplash.com/photo-{1560000000 + i}?w=800&q=80",
+            )))
+        for i in range(count):
+            await storage.donations.insert_one({
+                "id": f"donation-{i}", "paypal_payment_id": f"PAY-{i}", "amount": 10.0, "currency": "USD",
+                "status": "completed", "created_at": now.isoformat(),
+            })
+
+    async def page_load(self, paths, rtt, connections, iterations, after_write=False):
+        """Median ms to fetch ``paths`` concurrently, and compressed bytes received"""
+        transport = RoundTrips(httpx.ASGITransport(app=server.app), rtt, connections)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                     headers={"accept-encoding": "br, gzip"}) as http:
+            samples = []
+            size = 0
+            for _ in range(iterations):
+                if after_write:
+                    for name in ("news", "projects"):
+                        server.collection_versions[name] = server.collection_versions.get(name, 0) + 1
+                start = time.perf_counter()
+                responses = await asyncio.gather(*(http.get(path) for path in paths))
+                samples.append((time.perf_counter() - start) * 1000)
+                size = sum(int(r.headers.get("content-length", len(r.content))) for r in responses)
+        return statistics.median(samples), size
+
+    def bench_home(self, mongo_url=None, rtt_ms=150.0):
+        """The home page as five requests vs the aggregated /api/home"""
+        pages = {
+            "5 requests": ["/api/foundation-info", f"/api/news?view=card&limit={server.HOME_NEWS}",
+                           f"/api/external-news?view=card&limit={server.HOME_EXTERNAL_NEWS}",
+                           "/api/projects?view=card", "/api/donations/stats"],
+            "/api/home": ["/api/home"],
+        }
+        scenarios = {
+            "server only": (0.0, 5, self.iterations, False),
+            "after a write": (0.0, 5, self.iterations, True),
+            f"RTT {rtt_ms:.0f} ms, 1 conn": (rtt_ms / 1000, 1, 5, False),
+            f"RTT {rtt_ms:.0f} ms, 6 conns": (rtt_ms / 1000, 6, 5, False),
+        }
+        retention = server.timedelta(days=180)
+
+        async def run(backend):
+            if backend == "sqlite":
+                tmp = tempfile.TemporaryDirectory()
+                storage = server.SQLiteStorage(str(Path(tmp.name) / "home.db"), retention)
+            else:
+                storage = server.MongoStorage(mongo_url, f"funsomex_bench_home_{os.getpid()}", retention)
+            await storage.connect()
+            server.storage = storage
+            server.collection_versions.clear()
+            server.rendered_feeds.clear()
+            try:
+                await self.seed_home(storage)
+                await server.sync_collection_versions()
+                return {
+                    (scenario, page): await self.page_load(paths, *args)
+                    for scenario, args in scenarios.items() for page, paths in pages.items()
+                }
+            finally:
+                if backend == "mongo":
+                    await storage.client.drop_database(storage.name)
+                await storage.close()
+                if backend == "sqlite":
+                    tmp.cleanup()
+
+        for backend in ["sqlite"] + (["mongo"] if mongo_url else []):
+            results = asyncio.run(run(backend))
+            print(f"\n🏠 Home page on {backend}: five requests vs /api/home, median ms")
+            print(f"   {'scenario':<24}" + "".join(f"{page:>14}" for page in pages))
+            for scenario in scenarios:
+                print(f"   {scenario:<24}" + "".join(f"{results[scenario, page][0]:>14.1f}" for page in pages))
+            print(f"   {'bytes (br)':<24}" + "".join(f"{results['server only', page][1]:>14}" for page in pages))
+
+    async def load(self, base_url, paths, concurrency, duration):
+        """Closed-loop load: ``concurrency`` clients request ``paths`` in turn"""
+        latencies = []
+        errors = 0
+        # server's logging setup would log every request of the load itself
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        deadline = time.perf_counter() + duration
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0,
+                                     headers={"accept-encoding": "br, gzip"}) as http:
+            async def worker(offset):
+                nonlocal errors
+                i = offset
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        response = await http.get(paths[i % len(paths)])
+                        response.raise_for_status()
+                        latencies.append((time.perf_counter() - start) * 1000)
+                    except httpx.HTTPError:
+                        errors += 1
+                    i += 1
+            await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        latencies.sort()
+        return {
+            "rps": len(latencies) / duration,
+            "p50": latencies[len(latencies) // 2] if latencies else 0.0,
+            "p99": latencies[int(len(latencies) * 0.99)] if latencies else 0.0,
+            "errors": errors,
+        }
+
+    def bench_workers(self, worker_counts, paths, concurrency=64, duration=10.0, port=8765):
+        """Throughput of a real uvicorn server at different worker counts.
+
+        The server starts with the backend .env, so MONGO_URL must be reachable.
+        """
+        print(f"\n🧵 Workers: {', '.join(paths)} with {concurrency} concurrent clients for {duration:.0f}s")
+        print(f"   {'workers':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for workers in worker_counts:
+            env = dict(os.environ, WEB_CONCURRENCY=str(workers))
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port),
+                 "--workers", str(workers), "--log-level", "warning"],
+                cwd=BACKEND_DIR, env=env,
+            )
+            base_url = f"http://127.0.0.1:{port}"
+            try:
+                for _ in range(100):
+                    try:
+                        if httpx.get(f"{base_url}/api/", timeout=1.0).status_code == 200:
+                            break
+                    except httpx.HTTPError:
+                        pass
+                    time.sleep(0.3)
+                else:
+                    print(f"   {workers:<10}server did not start")
+                    continue
+                asyncio.run(self.load(base_url, paths, concurrency, 2.0))  # warm-up
+                result = asyncio.run(self.load(base_url, paths, concurrency, duration))
+                print(f"   {workers:<10}{result['rps']:>10.0f}{result['p50']:>10.1f}{result['p99']:>10.1f}{result['errors']:>8}")
+            finally:
+                proc.terminate()
+                proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FUNSOMEX backend benchmarks")
+    parser.add_argument("--workers", default="",
+                        help="comma-separated worker counts to load-test, e.g. 1,2,4 (needs MongoDB)")
+    parser.add_argument("--paths", default="/api/foundation-info,/api/news,/api/projects",
+                        help="comma-separated paths requested during the worker load test")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--mongo-url", default=os.environ.get("BENCH_MONGO_URL"),
+                        help="MongoDB to compare against the embedded SQLite storage")
+    parser.add_argument("--rtt", type=float, default=150.0,
+                        help="simulated round-trip time in ms for the home page comparison")
+    args = parser.parse_args()
+
+    print("🚀 Starting FUNSOMEX benchmarks...")
+    print("=" * 50)
+
+    bench = FunsomexBenchmark()
+    news = bench.news_payload()
+    short_news = bench.news_payload(content_words=150)
+    external = bench.external_news_payload()
+
+    print("\n🗜️  Compression")
+    bench.bench_encodings("/api/news (long articles)", news)
+    bench.bench_encodings("/api/news (short articles)", short_news)
+    bench.bench_encodings("/api/external-news", external)
+    bench.bench_middleware("/api/news", news, "br")
+    bench.bench_middleware("/api/news", news, "gzip")
+    bench.bench_views()
+    bench.bench_storage(args.mongo_url)
+    bench.bench_home(args.mongo_url, args.rtt)
+    bench.bench_image_cache()
+
+    if args.workers:
+        bench.bench_workers([int(n) for n in args.workers.split(",")], args.paths.split(","),
+                            concurrency=args.concurrency, duration=args.duration)
+
+    print("\n" + "=" * 50)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import requests
 import sys
 import json
+from urllib.parse import quote
 from datetime import datetime
 
 class FunsomexAPITester:
@@ -60,7 +61,8 @@ class FunsomexAPITester:
                 print(f"❌ Failed - Expected {expected_status}, got {response.status_code}")
                 print(f"   Response: {response.text[:200]}")
 
-            return success, response.json() if success and response.text else {}
+            is_json = 'json' in response.headers.get('content-type', '')
+            return success, response.json() if success and response.text and is_json else {}
 
         except requests.exceptions.Timeout:
             self.failed_tests.append({
@@ -148,6 +150,10 @@ class FunsomexAPITester:
         success, news_list = self.run_test("Get All News", "GET", "news", 200)
         results.append(success)
         
+        # Card view omits the article body
+        success, news_cards = self.run_test("Get News Cards", "GET", "news?view=card", 200)
+        results.append(success and all('content' not in item for item in news_cards))
+        
         # Create news
         news_data = {
             "title": "Test News Article",
@@ -158,6 +164,13 @@ class FunsomexAPITester:
         success, created_news = self.run_test("Create News", "POST", "news", 200, news_data, auth_required=True)
         results.append(success)
         
+        # Summary is generated when missing
+        news_without_summary = {"title": "Test News Without Summary", "content": "Generated summary test. " * 30}
+        success, generated = self.run_test("Create News (Auto Summary)", "POST", "news", 200, news_without_summary, auth_required=True)
+        results.append(success and bool(generated.get('summary')))
+        if success and 'id' in generated:
+            self.run_test("Delete News (Auto Summary)", "DELETE", f"news/{generated['id']}", 200, auth_required=True)
+        
         if success and 'id' in created_news:
             news_id = created_news['id']
             
@@ -270,10 +283,24 @@ class FunsomexAPITester:
         # Get news sources
         success, sources = self.run_test("Get News Sources", "GET", "news-sources", 200)
         results.append(success)
-        
-        # Refresh external news (background task)
-        success, _ = self.run_test("Refresh External News", "POST", "external-news/refresh", 200)
+
+        # Archive pages follow next_cursor
+        success, page = self.run_test("Get External News Archive", "GET", "external-news/archive?limit=5", 200)
+        results.append(success)
+        if success and page.get("next_cursor"):
+            success, _ = self.run_test("Get External News Archive Next Page", "GET", f"external-news/archive?limit=5&cursor={page['next_cursor']}", 200)
+            results.append(success)
+
+        # Malformed cursors are rejected
+        success, _ = self.run_test("Get External News Archive Invalid Cursor", "GET", "external-news/archive?cursor=invalid", 400)
         results.append(success)
+
+        # Refresh external news (queued job)
+        success, refresh = self.run_test("Refresh External News", "POST", "external-news/refresh", 200)
+        results.append(success and bool(refresh.get('job_id')))
+        if success and refresh.get('job_id'):
+            success, _ = self.run_test("Get Refresh Job", "GET", f"jobs/{refresh['job_id']}", 200, auth_required=True)
+            results.append(success)
         
         return all(results)
 
@@ -312,6 +339,106 @@ class FunsomexAPITester:
         
         return all(results)
 
+    def test_bulk_endpoints(self):
+        """Test bulk admin operations"""
+        results = []
+        
+        # Create several news articles in one batch
+        bulk_data = {
+            "create": [
+                {"title": f"Bulk News {i}", "content": "Bulk test content for FUNSOMEX.", "category": "general"}
+                for i in range(3)
+            ]
+        }
+        success, created = self.run_test("Bulk Create News", "POST", "news/bulk", 200, bulk_data, auth_required=True)
+        results.append(success)
+        
+        if success and created.get('created') == 3:
+            ids = [item['id'] for item in created['results']]
+            
+            # Update one, delete all, and report the unknown id per item
+            bulk_data = {
+                "update": [{"id": ids[0], "title": "Bulk News Updated"}],
+                "delete": ids + ["missing-id"]
+            }
+            success, response = self.run_test("Bulk Update/Delete News", "POST", "news/bulk", 200, bulk_data, auth_required=True)
+            results.append(success and response.get('deleted') == 3 and response.get('failed') == 1)
+        
+        # Create team members and reorder them
+        team_data = {
+            "create": [
+                {"name": f"Bulk Member {i}", "role": "Test Role", "bio": "Bulk test member.", "order": i}
+                for i in range(2)
+            ]
+        }
+        success, created = self.run_test("Bulk Create Team", "POST", "team/bulk", 200, team_data, auth_required=True)
+        results.append(success)
+        
+        if success and created.get('created') == 2:
+            ids = [item['id'] for item in created['results']]
+            success, _ = self.run_test("Reorder Team", "PUT", "team/reorder", 200, {"ids": ids[::-1]}, auth_required=True)
+            results.append(success)
+            success, _ = self.run_test("Bulk Delete Team", "POST", "team/bulk", 200, {"delete": ids}, auth_required=True)
+            results.append(success)
+        
+        # Bulk endpoints require auth
+        old_token = self.auth_token
+        self.auth_token = None
+        success, _ = self.run_test("Bulk Projects (No Auth)", "POST", "projects/bulk", 401, {"delete": []}, auth_required=True)
+        results.append(success)
+        self.auth_token = old_token
+        
+        return all(results)
+
+    def test_admin_events(self):
+        """Test admin SSE stream requires auth"""
+        success, _ = self.run_test("Admin Events (No Auth)", "GET", "admin/events", 401)
+        return success
+
+    def test_image_proxy(self):
+        """Test image proxy endpoint"""
+        results = []
+        projects = requests.get(f"{self.base_url}/projects?view=card", timeout=30).json()
+        sources = [p["image_url"] for p in projects if p.get("image_url", "").startswith(("http://", "https://"))]
+        
+        # Resized variant of an image used by a project
+        if sources:
+            success, _ = self.run_test("Image Proxy Variant", "GET", f"images?url={quote(sources[0], safe='')}&w=320&format=webp", 200)
+            results.append(success)
+        
+        # Hosts not referenced by site content are refused
+        source = "http://metadata.google.internal/computeMetadata/v1/"
+        success, _ = self.run_test("Image Proxy Unknown Host", "GET", f"images?url={quote(source, safe='')}", 403)
+        results.append(success)
+        
+        # Non-http sources are rejected
+        success, _ = self.run_test("Image Proxy Invalid URL", "GET", "images?url=file%3A%2F%2F%2Fetc%2Fpasswd", 400)
+        results.append(success)
+        
+        return all(results)
+
+    def test_feeds(self):
+        """Test RSS feed, sitemap and home page payload with conditional requests"""
+        results = []
+        
+        for name in ("feed.xml", "sitemap.xml", "home"):
+            response = requests.get(f"{self.base_url}/{name}", timeout=30)
+            success, _ = self.run_test(f"Get {name}", "GET", name, 200)
+            results.append(success)
+            etag = response.headers.get("ETag")
+            self.tests_run += 1
+            revalidated = bool(etag) and requests.get(f"{self.base_url}/{name}", headers={"If-None-Match": etag}, timeout=30).status_code == 304
+            if revalidated:
+                self.tests_passed += 1
+                self.passed_tests.append(f"Revalidate {name}")
+                print(f"✅ Passed - {name} answers 304 for a matching ETag")
+            else:
+                self.failed_tests.append({"test": f"Revalidate {name}", "expected": 304, "actual": None, "response": ""})
+                print(f"❌ Failed - {name} was not revalidated")
+            results.append(revalidated)
+        
+        return all(results)
+
     def test_root_endpoint(self):
         """Test root API endpoint"""
         return self.run_test("API Root", "GET", "", 200)[0]
@@ -350,6 +477,18 @@ def main():
     print("\n💰 Testing Donation Endpoints...")
     tester.test_donation_endpoints()
     
+    print("\n📚 Testing Bulk Endpoints...")
+    tester.test_bulk_endpoints()
+    
+    print("\n📡 Testing Admin Events...")
+    tester.test_admin_events()
+    
+    print("\n🖼️  Testing Image Proxy...")
+    tester.test_image_proxy()
+    
+    print("\n📰 Testing Feeds...")
+    tester.test_feeds()
+    
     print("\n🏠 Testing Root Endpoint...")
     tester.test_root_endpoint()
     
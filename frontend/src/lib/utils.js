@@ -4,3 +4,14 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs) {
   return twMerge(clsx(inputs));
 }
+
+const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+
+// Route external images through the backend proxy so the browser receives a
+// resized, cached variant instead of the original full-size file.
+export function imageUrl(src, width) {
+  if (!src || !/^https?:\/\//.test(src)) {
+    return src;
+  }
+  return `${API}/images?url=${encodeURIComponent(src)}&w=${width}`;
+}
@@ -38,6 +38,22 @@ import { toast } from "sonner";
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
+// Every event the backend sends is "<collection>.<action>"; with
+// EVENTS_CHANGE_STREAM bulk writes arrive as one event per document.
+const EVENT_COLLECTIONS = ["news", "team", "projects", "contacts", "donations", "external_news"];
+const EVENT_ACTIONS = ["created", "updated", "deleted", "bulk", "reconciled", "refreshed"];
+const EVENT_TYPES = EVENT_COLLECTIONS.flatMap((collection) =>
+  EVENT_ACTIONS.map((action) => `${collection}.${action}`)
+);
+// Endpoint behind each collection shown in the panel, and whether it needs the token
+const COLLECTION_ENDPOINTS = {
+  news: ["news", false],
+  team: ["team", false],
+  projects: ["projects", false],
+  contacts: ["contact", true],
+  donations: ["donations", true],
+};
+
 const AdminPage = () => {
   const navigate = useNavigate();
   const [isAuthenticated, setIsAuthenticated] = useState(false);
@@ -108,12 +124,101 @@ const AdminPage = () => {
     }
   };
 
+  // Live updates pushed by the backend instead of polling. EventSource cannot
+  // send headers, so the URL carries a short-lived ticket instead of the token.
+  useEffect(() => {
+    if (!isAuthenticated) return;
+    let source = null;
+    let stopped = false;
+    let lastEventId = "";
+    // A burst of events for one collection triggers a single refetch
+    const pending = {};
+    const scheduleRefresh = (collection) => {
+      if (!COLLECTION_ENDPOINTS[collection] || pending[collection]) return;
+      pending[collection] = setTimeout(() => {
+        delete pending[collection];
+        if (!stopped) refreshCollection(collection);
+      }, 300);
+    };
+
+    const connect = async () => {
+      let ticket;
+      try {
+        const response = await axios.post(`${API}/admin/events/ticket`, null, {
+          headers: getAuthHeaders(),
+        });
+        ticket = response.data.ticket;
+      } catch (error) {
+        if (error.response?.status === 401) {
+          handleLogout();
+        } else if (!stopped) {
+          setTimeout(connect, 5000);
+        }
+        return;
+      }
+      if (stopped) return;
+      const params = new URLSearchParams({ ticket });
+      if (lastEventId) params.set("lastEventId", lastEventId);
+      source = new EventSource(`${API}/admin/events?${params}`);
+
+      const on = (type, handler) =>
+        source.addEventListener(type, (event) => {
+          lastEventId = event.lastEventId || lastEventId;
+          handler(event);
+        });
+      EVENT_TYPES.forEach((type) =>
+        on(type, (event) => {
+          const [collection, action] = type.split(".");
+          if (collection === "contacts" && action === "created") {
+            toast.info(`Nuevo mensaje de ${JSON.parse(event.data).name}`);
+          }
+          scheduleRefresh(collection);
+        })
+      );
+      on("reset", () => fetchAllData());
+      // Reconnects reuse the URL; once the ticket has expired the browser
+      // gives up, so fetch a new one and resume from the last event
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && !stopped) {
+          setTimeout(connect, 5000);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      Object.values(pending).forEach(clearTimeout);
+      if (source) source.close();
+    };
+  }, [isAuthenticated]);
+
   const handleLogout = () => {
     localStorage.removeItem("funsomex_token");
     toast.success("Sesión cerrada");
     navigate("/login");
   };
 
+  const refreshCollection = async (collection) => {
+    const setters = {
+      news: setNews,
+      team: setTeam,
+      projects: setProjects,
+      contacts: setContacts,
+      donations: setDonations,
+    };
+    const [path, needsToken] = COLLECTION_ENDPOINTS[collection];
+    try {
+      const response = await axios.get(`${API}/${path}`, {
+        headers: needsToken ? getAuthHeaders() : {},
+      });
+      setters[collection](response.data);
+    } catch (error) {
+      console.error(`Error refreshing ${collection}:`, error);
+      if (error.response?.status === 401) handleLogout();
+    }
+  };
+
   const fetchAllData = async () => {
     setLoading(true);
     try {
@@ -40,12 +40,9 @@ const HomePage = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [infoRes, newsRes] = await Promise.all([
-          axios.get(`${API}/foundation-info`),
-          axios.get(`${API}/external-news`),
-        ]);
-        setFoundationInfo(infoRes.data);
-        setExternalNews(newsRes.data.slice(0, 6));
+        const response = await axios.get(`${API}/home`);
+        setFoundationInfo(response.data.foundation_info);
+        setExternalNews(response.data.external_news);
       } catch (error) {
         console.error("Error fetching data:", error);
       } finally {
@@ -361,6 +358,11 @@ const HomePage = () => {
                   <h3 className="font-semibold text-foreground group-hover:text-primary transition-colors line-clamp-3">
                     {news.title}
                   </h3>
+                  {news.summary && (
+                    <p className="text-sm text-muted-foreground line-clamp-2 mt-2">
+                      {news.summary}
+                    </p>
+                  )}
                   <div className="flex items-center gap-1 mt-3 text-sm text-muted-foreground group-hover:text-secondary transition-colors">
                     <span>Leer más</span>
                     <ExternalLink className="w-4 h-4" />
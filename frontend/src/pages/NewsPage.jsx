@@ -12,6 +12,7 @@ import {
   SelectValue,
 } from "@/components/ui/select";
 import { toast } from "sonner";
+import { imageUrl } from "@/lib/utils";
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
@@ -30,8 +31,8 @@ const NewsPage = () => {
   const fetchData = async () => {
     try {
       const [externalRes, internalRes, sourcesRes] = await Promise.all([
-        axios.get(`${API}/external-news`),
-        axios.get(`${API}/news`),
+        axios.get(`${API}/external-news?view=card`),
+        axios.get(`${API}/news?view=card`),
         axios.get(`${API}/news-sources`),
       ]);
       setExternalNews(externalRes.data);
@@ -51,7 +52,7 @@ const NewsPage = () => {
       toast.success("Actualizando noticias externas...");
       // Wait a bit and then fetch updated news
       setTimeout(async () => {
-        const response = await axios.get(`${API}/external-news`);
+        const response = await axios.get(`${API}/external-news?view=card`);
         setExternalNews(response.data);
         setRefreshing(false);
         toast.success("Noticias actualizadas");
@@ -138,7 +139,7 @@ const NewsPage = () => {
                     {news.image_url && (
                       <div className="h-48 overflow-hidden rounded-t-xl">
                         <img
-                          src={news.image_url}
+                          src={imageUrl(news.image_url, 640)}
                           alt={news.title}
                           className="w-full h-full object-cover"
                         />
@@ -150,7 +151,7 @@ const NewsPage = () => {
                       </span>
                       <h3 className="font-bold text-lg mb-2">{news.title}</h3>
                       <p className="text-muted-foreground text-sm line-clamp-3">
-                        {news.summary || news.content}
+                        {news.summary}
                       </p>
                     </CardContent>
                   </Card>
@@ -257,6 +258,16 @@ const NewsPage = () => {
                   data-testid={`external-news-${index}`}
                 >
                   <Card className="h-full bg-white border-border card-hover group">
+                    {news.image_url && (
+                      <div className="h-40 overflow-hidden rounded-t-xl">
+                        <img
+                          src={imageUrl(news.image_url, 640)}
+                          alt={news.title}
+                          loading="lazy"
+                          className="w-full h-full object-cover"
+                        />
+                      </div>
+                    )}
                     <CardContent className="p-6">
                       <div className="flex items-center gap-2 mb-3">
                         <span
@@ -275,6 +286,11 @@ const NewsPage = () => {
                       <h3 className="font-semibold text-foreground group-hover:text-primary transition-colors line-clamp-3 mb-4">
                         {news.title}
                       </h3>
+                      {news.summary && (
+                        <p className="text-sm text-muted-foreground line-clamp-3 mb-4">
+                          {news.summary}
+                        </p>
+                      )}
                       <div className="flex items-center gap-1 text-sm text-muted-foreground group-hover:text-secondary transition-colors">
                         <span>Leer más</span>
                         <ExternalLink className="w-4 h-4" />
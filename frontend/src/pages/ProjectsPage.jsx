@@ -11,6 +11,7 @@ import {
   SelectTrigger,
   SelectValue,
 } from "@/components/ui/select";
+import { imageUrl } from "@/lib/utils";
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
@@ -103,7 +104,7 @@ const ProjectsPage = () => {
   useEffect(() => {
     const fetchProjects = async () => {
       try {
-        const response = await axios.get(`${API}/projects`);
+        const response = await axios.get(`${API}/projects?view=card`);
         if (response.data && response.data.length > 0) {
           setProjects(response.data);
           setFilteredProjects(response.data);
@@ -226,7 +227,7 @@ const ProjectsPage = () => {
                   <Card className="h-full overflow-hidden border-border bg-white card-hover group">
                     <div className="relative h-48 overflow-hidden">
                       <img
-                        src={project.image_url}
+                        src={imageUrl(project.image_url, 640)}
                         alt={project.title}
                         className="w-full h-full object-cover transition-transform duration-500 group-hover:scale-110"
                       />
@@ -241,7 +242,7 @@ const ProjectsPage = () => {
                         {project.title}
                       </h3>
                       <p className="text-muted-foreground text-sm mb-4 line-clamp-2">
-                        {project.description}
+                        {project.summary || project.description}
                       </p>
                       <div className="flex items-center gap-4 text-sm text-muted-foreground">
                         {project.location && (
@@ -3,6 +3,7 @@ import { motion } from "framer-motion";
 import axios from "axios";
 import { Mail, Linkedin, Users } from "lucide-react";
 import { Card, CardContent } from "@/components/ui/card";
+import { imageUrl } from "@/lib/utils";
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
@@ -127,7 +128,7 @@ const TeamPage = () => {
                   <div className="relative">
                     <div className="h-64 overflow-hidden">
                       <img
-                        src={member.image_url}
+                        src={imageUrl(member.image_url, 480)}
                         alt={member.name}
                         className="w-full h-full object-cover transition-transform duration-500 hover:scale-110"
                       />
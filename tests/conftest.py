@@ -0,0 +1,110 @@
+"""Shared fixtures: the app on a throwaway database and a local mock of the PayPal REST API"""
+import json
+import sys
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+from storage import SQLiteStorage  # noqa: E402
+
+
+@pytest.fixture
+def app_state(tmp_path, monkeypatch):
+    """Start the app on a fresh SQLite database, without background work or another test's caches"""
+    monkeypatch.setattr(server, "JOB_WORKERS", 0)
+    monkeypatch.setattr(server, "DONATION_RECONCILE_MINUTES", 0)
+    # Versions and renderings are per process; start from this test's database
+    monkeypatch.setattr(server, "collection_versions", {})
+    monkeypatch.setattr(server, "rendered_feeds", {})
+    monkeypatch.setattr(server, "_image_source_hosts", {})
+    monkeypatch.setattr(server, "create_storage",
+                        lambda: SQLiteStorage(str(tmp_path / "server.db"), timedelta(days=30)))
+
+
+@pytest.fixture
+def public_client(app_state):
+    """A client without credentials"""
+    with TestClient(server.app) as client:
+        yield client
+
+
+@pytest.fixture
+def client(public_client):
+    """A client whose requests pass as the admin's"""
+    server.app.dependency_overrides[server.get_current_admin] = lambda: "admin"
+    yield public_client
+    server.app.dependency_overrides.clear()
+
+
+class MockPayPal(ThreadingHTTPServer):
+    """Answers OAuth token and payment lookups; records concurrency"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), MockPayPalHandler)
+        self.states = {}
+        self.broken = set()
+        self.rejected = set()
+        self.lookups = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class MockPayPalHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.reply(200, {"access_token": "token", "token_type": "Bearer", "expires_in": 3600})
+
+    def do_GET(self):
+        paypal = self.server
+        payment_id = self.path.rsplit("/", 1)[-1]
+        with paypal.lock:
+            paypal.lookups.append((payment_id, time.monotonic()))
+            paypal.active += 1
+            paypal.max_active = max(paypal.max_active, paypal.active)
+        time.sleep(0.02)
+        with paypal.lock:
+            paypal.active -= 1
+        if payment_id in paypal.broken:
+            self.reply(500, {"name": "INTERNAL_SERVICE_ERROR"})
+        elif payment_id in paypal.rejected:
+            self.reply(422, {"name": "UNPROCESSABLE_ENTITY"})
+        elif payment_id not in paypal.states:
+            self.reply(404, {"name": "INVALID_RESOURCE_ID"})
+        else:
+            self.reply(200, {"id": payment_id, "state": paypal.states[payment_id]})
+
+
+@pytest.fixture
+def paypal(monkeypatch):
+    mock = MockPayPal()
+    thread = threading.Thread(target=mock.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("PAYPAL_API_URL", mock.url)
+    server.configure_paypal()
+    yield mock
+    mock.shutdown()
+    mock.server_close()
@@ -0,0 +1,56 @@
+"""Bulk create/update/delete: per-item results, totals and image pre-warming"""
+import server
+
+
+def create_news(client, count):
+    return [client.post("/api/news", json={"title": f"Noticia {i}", "content": "Texto"}).json()["id"]
+            for i in range(count)]
+
+
+def test_each_id_is_acted_on_once_per_batch(client):
+    first, second, third = create_news(client, 3)
+
+    result = client.post("/api/news/bulk", json={
+        "update": [{"id": first, "title": "Uno"}, {"id": first, "title": "Otra vez"}, {"id": "missing", "title": "X"}],
+        "delete": [second, second, first, third],
+    }).json()
+
+    assert (result["updated"], result["deleted"], result["failed"]) == (1, 2, 4)
+    assert [(item["op"], item["id"], item["error"]) for item in result["results"] if not item["ok"]] == [
+        ("update", first, "Elemento repetido en el lote"),
+        ("update", "missing", "Noticia no encontrada"),
+        ("delete", second, "Elemento repetido en el lote"),
+        ("delete", first, "Elemento repetido en el lote"),
+    ]
+    assert [news["title"] for news in client.get("/api/news").json()] == ["Uno"]
+
+    reorder = client.put("/api/team/reorder", json={"ids": ["a", "a"]}).json()
+    assert reorder["failed"] == 2 and reorder["results"][1]["error"] == "Elemento repetido en el lote"
+
+
+def test_only_written_images_are_prewarmed(client, monkeypatch):
+    taken = client.post("/api/projects", json={
+        "title": "Existente", "description": "Descripción", "category": "salud",
+        "image_url": "https://example.com/existente.jpg",
+    }).json()["id"]
+    warmed = []
+
+    async def prewarm(collection, urls):
+        warmed.extend(urls)
+    monkeypatch.setattr(server, "prewarm_images", prewarm)
+    # The first create collides with a stored id, so the bulk write rejects it
+    project_to_doc = server.project_to_doc
+    monkeypatch.setattr(server, "project_to_doc", lambda project: {
+        **project_to_doc(project), **({"id": taken} if project.title == "Repetido" else {}),
+    })
+
+    result = client.post("/api/projects/bulk", json={
+        "create": [
+            {"title": "Repetido", "description": "D", "category": "salud", "image_url": "https://example.com/1.jpg"},
+            {"title": "Nuevo", "description": "D", "category": "salud", "image_url": "https://example.com/2.jpg"},
+        ],
+        "update": [{"id": "missing", "image_url": "https://example.com/3.jpg"}],
+    }).json()
+
+    assert (result["created"], result["failed"]) == (1, 2)
+    assert warmed == ["https://example.com/2.jpg"]
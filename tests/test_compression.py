@@ -0,0 +1,133 @@
+"""Response compression: negotiation, what gets compressed, memoized bodies, validators.
+
+The test client decodes br and gzip bodies, so ``content`` is always the original.
+"""
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import Response, StreamingResponse
+
+import server
+
+BODY = b'[{"title": "Noticia"}]' * 100
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("br, gzip", "br"),
+    ("gzip, deflate", "gzip"),
+    ("GZIP", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("br; q=0, gzip;q=0.5", "gzip"),
+    ("*", "br"),
+    ("*, br;q=0", "gzip"),
+    ("identity", None),
+    ("gzip;q=0, br;q=0", None),
+    ("*;q=0", None),
+    ("gzip;q=nope", None),
+    ("", None),
+])
+def test_accept_encoding_negotiation(accept, expected):
+    assert server._negotiate_encoding(accept) == expected
+
+
+@pytest.fixture
+def compressed(monkeypatch):
+    """The middleware around an app serving ``routes`` (path -> response); counts compressions"""
+    routes = {}
+    calls = []
+    compress_body = server.compress_body
+
+    def counting(body, encoding):
+        calls.append(encoding)
+        return compress_body(body, encoding)
+
+    async def app(scope, receive, send):
+        await routes[scope["path"]]()(scope, receive, send)
+
+    monkeypatch.setattr(server, "compress_body", counting)
+    monkeypatch.setattr(server, "collection_versions", {})
+    client = TestClient(server.CompressionMiddleware(app, minimum_size=1024, cache_entries=8))
+    return client, routes, calls
+
+
+def test_compresses_large_text_bodies(compressed):
+    client, routes, _ = compressed
+    routes["/data"] = lambda: Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+    br = client.get("/data", headers={"Accept-Encoding": "br"})
+    assert br.headers["content-encoding"] == "br"
+    assert br.content == BODY and int(br.headers["content-length"]) < len(BODY)
+    assert br.headers["vary"] == "Accept-Encoding"
+    assert br.headers["etag"] == 'W/"v1"'
+
+    gzipped = client.get("/data", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip" and gzipped.content == BODY
+
+    identity = client.get("/data", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers and identity.content == BODY
+    assert identity.headers["etag"] == '"v1"'
+
+
+def test_skips_small_bodies_and_other_content_types(compressed):
+    client, routes, calls = compressed
+    routes["/small"] = lambda: Response(b"[]", media_type="application/json")
+    routes["/image"] = lambda: Response(BODY, media_type="image/png")
+    routes["/events"] = lambda: Response(BODY, media_type="text/event-stream")
+    routes["/stream"] = lambda: StreamingResponse(iter([BODY, BODY]), media_type="application/json")
+    routes["/encoded"] = lambda: Response(gzip.compress(BODY), media_type="application/json",
+                                          headers={"Content-Encoding": "gzip"})
+
+    for path in routes:
+        response = client.get(path, headers={"Accept-Encoding": "br"})
+        assert response.headers.get("content-encoding") != "br", path
+        assert "vary" not in response.headers, path
+    assert calls == []
+
+
+def test_memoized_bodies_follow_collection_versions(compressed):
+    client, routes, calls = compressed
+    body = BODY
+    routes["/api/team"] = lambda: Response(body, media_type="application/json")
+
+    def get():
+        response = client.get("/api/team", headers={"Accept-Encoding": "br"})
+        assert response.content == body
+        return response
+
+    get()
+    get()
+    assert calls == ["br"]
+    client.get("/api/team", headers={"Accept-Encoding": "gzip"})
+    assert calls == ["br", "gzip"]
+
+    server.collection_versions["team"] = 1
+    get()
+    assert calls == ["br", "gzip", "br"]
+
+    # A changed body is never answered from the memo, even at the same version
+    body = BODY.replace(b"Noticia", b"Novedad")
+    get()
+    assert calls == ["br", "gzip", "br", "br"]
+
+    # Routes outside CACHEABLE_ROUTES are compressed every time
+    routes["/api/contact"] = lambda: Response(BODY, media_type="application/json")
+    client.get("/api/contact", headers={"Accept-Encoding": "br"})
+    client.get("/api/contact", headers={"Accept-Encoding": "br"})
+    assert calls[-2:] == ["br", "br"]
+
+
+def test_revalidation_repeats_the_weak_etag(client):
+    client.post("/api/news", json={"title": "Noticia", "content": "Texto largo " * 400})
+
+    first = client.get("/api/home", headers={"Accept-Encoding": "br"})
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"') and first.headers["content-encoding"] == "br"
+    assert client.get("/api/home", headers={"Accept-Encoding": "identity"}).headers["etag"] == etag
+
+    revalidated = client.get("/api/home", headers={"Accept-Encoding": "br", "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.headers["vary"] == "Accept-Encoding"
+    # A strong form of the same tag still matches
+    assert client.get("/api/home", headers={"If-None-Match": etag.removeprefix("W/")}).status_code == 304
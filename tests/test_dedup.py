@@ -0,0 +1,115 @@
+"""External news deduplication: URL keys and near-duplicate titles"""
+import pytest
+
+import server
+
+TITLE = "La DIAN amplía el plazo para declarar renta de personas naturales en 2026"
+
+
+@pytest.mark.parametrize("variant", [
+    "https://www.dian.gov.co/noticias/plazo-renta?id=7",
+    "http://dian.gov.co/noticias/plazo-renta/?id=7",
+    "https://DIAN.gov.co:443/noticias/plazo-renta?utm_source=x&id=7&utm_medium=rss",
+    "https://dian.gov.co/noticias/plazo-renta?fbclid=abc&id=7#comentarios",
+])
+def test_url_variants_share_a_key(variant):
+    assert server.url_key(variant) == server.url_key("https://dian.gov.co/noticias/plazo-renta?id=7")
+
+
+def test_url_keys_keep_distinct_pages_apart():
+    key = server.url_key("https://dian.gov.co/noticias/plazo-renta?id=7")
+    assert server.url_key("https://dian.gov.co/noticias/plazo-renta?id=8") != key
+    assert server.url_key("https://dian.gov.co:8443/noticias/plazo-renta?id=7") != key
+    assert server.url_key("https://dian.gov.co/#/noticias/1") != server.url_key("https://dian.gov.co/#/noticias/2")
+    # Query order does not matter
+    assert server.url_key("https://dian.gov.co/b?x=1&y=2") == server.url_key("https://dian.gov.co/b?y=2&x=1")
+
+
+def test_scraped_links_keep_the_published_url():
+    base = "https://www.dian.gov.co/noticias/"
+    assert server.page_link("plazo-renta/?utm_source=rss&id=7", base) == \
+        "https://www.dian.gov.co/noticias/plazo-renta/?utm_source=rss&id=7"
+    assert server.page_link("/#/detalle/3", base) == "https://www.dian.gov.co/#/detalle/3"
+    for href in ("#top", "mailto:prensa@dian.gov.co", "javascript:void(0)", "ftp://dian.gov.co/x", "  "):
+        assert server.page_link(href, base) is None
+
+
+def distance(a, b):
+    return bin(server.title_simhash(a) ^ server.title_simhash(b)).count("1")
+
+
+@pytest.mark.parametrize("title", [
+    TITLE.replace("2026", "2025"),
+    TITLE.replace("renta de personas", "renta de las personas"),
+    TITLE.removesuffix(" en 2026"),
+    TITLE.upper() + ".",
+])
+def test_near_duplicate_titles(title):
+    assert distance(TITLE, title) <= server.SIMHASH_MAX_DISTANCE
+    assert server.is_near_duplicate(server.title_simhash(title), [server.title_simhash(TITLE)])
+
+
+@pytest.mark.parametrize("title", [
+    TITLE.replace("el plazo", "los plazos"),
+    TITLE.replace("amplía", "extiende"),
+    TITLE.replace("personas naturales", "personas jurídicas"),
+    "Gobernación de Córdoba inaugura nueva sede educativa en Sahagún",
+])
+def test_different_titles(title):
+    assert distance(TITLE, title) > server.SIMHASH_MAX_DISTANCE
+    assert not server.is_near_duplicate(server.title_simhash(title), [server.title_simhash(TITLE)])
+
+
+def test_short_titles_are_not_compared():
+    assert server.title_simhash("Boletín de prensa") is None
+    assert not server.is_near_duplicate(None, [server.title_simhash(TITLE)])
+    # Every band of a comparable title is its own lookup key
+    assert len(server.simhash_bands(server.title_simhash(TITLE))) == server.SIMHASH_BANDS
+
+
+def news(title, url):
+    return server.ExternalNews(title=title, url=url, source="DIAN")
+
+
+def test_filter_new_news_uses_the_seen_set(client):
+    seen = client.portal.call(server.filter_new_news, [news(TITLE, "https://www.dian.gov.co/n/1")])
+    client.portal.call(server.record_seen_news, seen)
+
+    batch = [
+        news("Comunicado sobre la facturación electrónica", "https://dian.gov.co/n/1/?utm_source=rss"),
+        news(TITLE.replace("2026", "2025"), "https://dian.gov.co/n/2"),
+        news(TITLE.replace("personas naturales", "personas jurídicas"), "https://dian.gov.co/n/3"),
+        news(TITLE.replace("personas naturales", "personas jurídicas") + ".", "https://dian.gov.co/n/4"),
+        news("Boletín", "https://dian.gov.co/n/3#comentarios"),
+        news("Boletín", "https://dian.gov.co/n/5"),
+    ]
+    new = client.portal.call(server.filter_new_news, batch)
+    # The original URL is kept for display
+    assert [item.url for _, _, item in new] == ["https://dian.gov.co/n/3", "https://dian.gov.co/n/5"]
+
+
+def test_failed_inserts_are_retried(client, monkeypatch):
+    monkeypatch.setattr(server, "NEWS_SOURCES", {"DIAN": "https://www.dian.gov.co/noticias"})
+    scraped = [news(TITLE, "https://www.dian.gov.co/n/1"),
+               news("Gobernación de Córdoba inaugura nueva sede educativa en Sahagún", "https://www.dian.gov.co/n/2")]
+
+    async def scrape(name, url):
+        return [item.model_copy() for item in scraped]
+    monkeypatch.setattr(server, "scrape_news_from_source", scrape)
+    archive = server.storage.external_news
+    insert_many = archive.insert_many
+    failures = [ConnectionError("archive down")]
+
+    async def flaky_insert(docs):
+        if failures:
+            raise failures.pop()
+        return await insert_many(docs)
+    monkeypatch.setattr(archive, "insert_many", flaky_insert)
+
+    with pytest.raises(ConnectionError):
+        client.portal.call(server.scrape_all_news)
+    assert len(client.portal.call(server.scrape_all_news)) == 2
+    assert len(client.get("/api/external-news").json()) == 2
+    # Nothing is stored twice, and the seen-set now skips both
+    assert client.portal.call(server.scrape_all_news) == []
+    assert client.portal.call(archive.insert_many, [n.model_dump(exclude_none=True) for n in scraped]) == []
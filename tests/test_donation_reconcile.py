@@ -0,0 +1,155 @@
+"""Donation reconciliation against the mock PayPal in conftest.py"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+from storage import SQLiteStorage
+
+
+@pytest.fixture
+def donations(tmp_path, monkeypatch):
+    """Run a scenario with ``server.storage`` on a fresh SQLite database"""
+    def run(scenario):
+        async def main():
+            storage = SQLiteStorage(str(tmp_path / "donations.db"), timedelta(days=30))
+            await storage.connect()
+            monkeypatch.setattr(server, "storage", storage)
+            try:
+                await scenario(storage)
+            finally:
+                await storage.close()
+        asyncio.run(main())
+    return run
+
+
+def donation(payment_id, age, status="created"):
+    return {
+        "id": f"donation-{payment_id}",
+        "paypal_payment_id": payment_id,
+        "amount": 10.0,
+        "currency": "USD",
+        "status": status,
+        "created_at": (datetime.now(timezone.utc) - age).isoformat(),
+    }
+
+
+async def statuses(storage):
+    return {doc["paypal_payment_id"]: doc["status"] for doc in await storage.donations.find()}
+
+
+def test_reconcile_settles_stale_donations(paypal, donations, monkeypatch):
+    monkeypatch.setattr(server, "PAYPAL_CONCURRENCY", 2)
+    monkeypatch.setattr(server, "PAYPAL_REQUESTS_PER_SECOND", 50)
+    # Timed where the limiter lets each lookup go, before the SDK's token
+    # request or the mock server's threads can shift it
+    released = []
+    payment_state = server.paypal_payment_state
+
+    async def timed_payment_state(payment_id):
+        released.append(asyncio.get_running_loop().time())
+        return await payment_state(payment_id)
+    monkeypatch.setattr(server, "paypal_payment_state", timed_payment_state)
+    paypal.states = {"PAY-approved": "approved", "PAY-canceled": "canceled", "PAY-waiting": "created",
+                     "PAY-abandoned": "created", "PAY-recent": "approved", "PAY-done": "approved"}
+
+    async def scenario(storage):
+        for payment_id, age, status in (
+            ("PAY-approved", timedelta(hours=4), "created"),
+            ("PAY-canceled", timedelta(hours=5), "created"),
+            ("PAY-waiting", timedelta(hours=6), "created"),
+            ("PAY-abandoned", timedelta(days=4), "created"),
+            ("PAY-unknown", timedelta(hours=7), "created"),
+            ("PAY-recent", timedelta(minutes=10), "created"),
+            ("PAY-done", timedelta(days=1), "completed"),
+        ):
+            await storage.donations.insert_one(donation(payment_id, age, status))
+
+        counts = await server.reconcile_stale_donations()
+
+        assert counts == {"checked": 5, "updated": 4, "errors": 0}
+        assert await statuses(storage) == {
+            "PAY-approved": "completed", "PAY-canceled": "failed", "PAY-waiting": "created",
+            "PAY-abandoned": "failed", "PAY-unknown": "failed", "PAY-recent": "created", "PAY-done": "completed",
+        }
+        assert await storage.load_checkpoint("donation-reconcile") is None
+    donations(scenario)
+
+    assert sorted(payment_id for payment_id, _ in paypal.lookups) == [
+        "PAY-abandoned", "PAY-approved", "PAY-canceled", "PAY-unknown", "PAY-waiting",
+    ]
+    assert paypal.max_active <= 2
+    assert max(released) - min(released) >= (len(released) - 1) / 50 - 0.001
+
+
+def test_reconcile_resumes_from_checkpoint(paypal, donations, monkeypatch):
+    monkeypatch.setattr(server, "DONATION_RECONCILE_BATCH", 2)
+    ids = [f"PAY-{i}" for i in range(5)]
+    paypal.states = {payment_id: "approved" for payment_id in ids}
+    # The second page fails entirely, as if PayPal went down mid-run
+    paypal.broken = {"PAY-2", "PAY-3"}
+
+    async def scenario(storage):
+        for i, payment_id in enumerate(ids):
+            await storage.donations.insert_one(donation(payment_id, timedelta(hours=10 - i)))
+
+        with pytest.raises(Exception):
+            await server.reconcile_stale_donations()
+        checkpoint = await storage.load_checkpoint("donation-reconcile")
+        assert checkpoint["id"] == "donation-PAY-1"
+        assert list((await statuses(storage)).values()).count("completed") == 2
+
+        paypal.broken.clear()
+        paypal.lookups.clear()
+        counts = await server.reconcile_stale_donations()
+        assert counts == {"checked": 3, "updated": 3, "errors": 0}
+        assert set((await statuses(storage)).values()) == {"completed"}
+    donations(scenario)
+
+    assert sorted(payment_id for payment_id, _ in paypal.lookups) == ["PAY-2", "PAY-3", "PAY-4"]
+
+
+def test_reconcile_gives_up_on_payments_paypal_refuses(paypal, donations, monkeypatch):
+    monkeypatch.setattr(server, "DONATION_RECONCILE_BATCH", 2)
+    paypal.rejected = {"PAY-rejected-old", "PAY-rejected", "PAY-rejected-2"}
+
+    async def scenario(storage):
+        for payment_id, age in (
+            ("PAY-rejected-old", timedelta(days=4)),
+            ("PAY-missing", timedelta(hours=9)),
+            ("PAY-rejected", timedelta(hours=8)),
+            ("PAY-rejected-2", timedelta(hours=7)),
+        ):
+            await storage.donations.insert_one(donation(payment_id, age))
+
+        # The second page fails entirely, but only for those payments
+        counts = await server.reconcile_stale_donations()
+        assert counts == {"checked": 4, "updated": 2, "errors": 2}
+        assert await statuses(storage) == {
+            "PAY-rejected-old": "failed", "PAY-missing": "failed", "PAY-rejected": "created",
+            "PAY-rejected-2": "created",
+        }
+        assert await storage.load_checkpoint("donation-reconcile") is None
+    donations(scenario)
+
+
+def test_reconcile_keeps_donations_settled_during_the_sweep(paypal, donations, monkeypatch):
+    paypal.states = {"PAY-executed": "created", "PAY-approved": "approved"}
+    payment_state = server.paypal_payment_state
+
+    async def scenario(storage):
+        for payment_id, age in (("PAY-executed", timedelta(days=4)), ("PAY-approved", timedelta(hours=5))):
+            await storage.donations.insert_one(donation(payment_id, age))
+
+        async def executed_meanwhile(payment_id):
+            state = await payment_state(payment_id)
+            if payment_id == "PAY-executed":
+                # The donor's own execute call lands while the sweep waits on PayPal
+                await storage.donations.update_one({"id": "donation-PAY-executed"}, {"status": "completed"})
+            return state
+        monkeypatch.setattr(server, "paypal_payment_state", executed_meanwhile)
+
+        await server.reconcile_stale_donations()
+        assert await statuses(storage) == {"PAY-executed": "completed", "PAY-approved": "completed"}
+    donations(scenario)
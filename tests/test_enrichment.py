@@ -0,0 +1,161 @@
+"""Scraped news enrichment from article OpenGraph and meta tags"""
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+import server
+from storage import SQLiteStorage
+
+ARTICLE = """<html><head>
+<meta property="og:description" content="  La DIAN anuncia nuevas medidas.  ">
+<meta name="description" content="Descripción genérica del portal">
+<meta property="og:image" content="/imagenes/boletin.jpg">
+<meta property="article:published_time" content="2026-03-04T15:30:00Z">
+</head><body>...</body></html>"""
+
+
+def test_parse_article_meta():
+    found = server.parse_article_meta(ARTICLE, "https://www.dian.gov.co/prensa/boletin-1")
+    assert found == {
+        "summary": "La DIAN anuncia nuevas medidas.",
+        "image_url": "https://www.dian.gov.co/imagenes/boletin.jpg",
+        "published_at": datetime(2026, 3, 4, 15, 30, tzinfo=timezone.utc),
+        "date": "2026-03-04",
+    }
+
+    fallback = server.parse_article_meta(
+        '<meta name="Description" content="Solo descripción">'
+        '<meta itemprop="datePublished" content="Wed, 04 Mar 2026 10:00:00 -0500">'
+        '<meta property="og:image" content="javascript:alert(1)">',
+        "https://example.gov.co/a",
+    )
+    assert fallback == {
+        "summary": "Solo descripción",
+        "published_at": datetime(2026, 3, 4, 15, 0, tzinfo=timezone.utc),
+        "date": "2026-03-04",
+    }
+    assert server.parse_article_meta('<meta property="article:published_time" content="ayer">', "https://x") == {}
+
+
+class ArticleSite:
+    """Mock transport serving articles and counting requests per host"""
+
+    def __init__(self):
+        self.fetches = Counter()
+        self.active = Counter()
+        self.max_active = Counter()
+        self.failing = set()
+        self.redirects = {}
+
+    async def __call__(self, request):
+        host, path = request.url.host, request.url.path
+        self.fetches[str(request.url)] += 1
+        self.active[host] += 1
+        self.max_active[host] = max(self.max_active[host], self.active[host])
+        await asyncio.sleep(0.01)
+        self.active[host] -= 1
+        if str(request.url) in self.failing:
+            return httpx.Response(503)
+        if str(request.url) in self.redirects:
+            return httpx.Response(302, headers={"location": self.redirects[str(request.url)]})
+        if path == "/missing":
+            return httpx.Response(404)
+        if path == "/pdf":
+            return httpx.Response(200, headers={"content-type": "application/pdf"}, content=b"%PDF")
+        return httpx.Response(200, headers={"content-type": "text/html; charset=utf-8"}, text=ARTICLE)
+
+
+@pytest.fixture
+def enrichment(tmp_path, monkeypatch):
+    """Run a scenario with stored external news and a mock article site"""
+    site = ArticleSite()
+    monkeypatch.setattr(server, "ENRICH_PER_HOST", 2)
+    host_is_public = server._host_is_public
+
+    async def resolve(hostname):
+        # The article sites are public without a DNS lookup; IP literals are checked for real
+        return hostname.endswith(".gov.co") or await host_is_public(hostname)
+    monkeypatch.setattr(server, "_host_is_public", resolve)
+
+    def run(urls, scenario):
+        async def main():
+            storage = SQLiteStorage(str(tmp_path / "enrich.db"), timedelta(days=30))
+            await storage.connect()
+            client = httpx.AsyncClient(transport=httpx.MockTransport(site))
+            monkeypatch.setattr(server, "storage", storage)
+            monkeypatch.setattr(server, "http_client", client)
+            now = datetime.now(timezone.utc)
+            await storage.external_news.insert_many([
+                server.ExternalNews(title=f"Noticia {i}", url=url, source="DIAN", date=now.strftime("%Y-%m-%d"),
+                                    first_seen=now).model_dump(exclude_none=True)
+                for i, url in enumerate(urls)
+            ])
+            try:
+                await scenario(storage)
+            finally:
+                await client.aclose()
+                await storage.close()
+        asyncio.run(main())
+    return site, run
+
+
+def test_enriches_new_items_once_with_per_host_limit(enrichment):
+    site, run = enrichment
+    urls = [f"https://www.dian.gov.co/boletin-{i}" for i in range(6)] + [
+        "https://www.contraloria.gov.co/boletin", "https://www.contraloria.gov.co/missing",
+        "https://www.contraloria.gov.co/pdf",
+    ]
+
+    async def scenario(storage):
+        assert await server.enrich_external_news(urls) == len(urls)
+        items, _ = await storage.external_news.page(None, None, None, 20, None, None)
+        by_url = {item["url"]: item for item in items}
+        assert by_url[urls[0]]["summary"] == "La DIAN anuncia nuevas medidas."
+        assert by_url[urls[0]]["date"] == "2026-03-04"
+        assert "summary" not in by_url["https://www.contraloria.gov.co/missing"]
+        assert await storage.external_news.unenriched(urls) == []
+
+        # Already enriched: nothing is fetched again
+        assert await server.enrich_external_news(urls) == 0
+    run(urls, scenario)
+
+    assert set(site.fetches.values()) == {1}
+    assert site.max_active["www.dian.gov.co"] == 2
+
+
+def test_failed_pages_are_retried_alone(enrichment):
+    site, run = enrichment
+    urls = [f"https://www.dian.gov.co/boletin-{i}" for i in range(3)]
+    site.failing.add(urls[1])
+
+    async def scenario(storage):
+        with pytest.raises(RuntimeError):
+            await server.enrich_external_news(urls)
+        assert await storage.external_news.unenriched(urls) == [urls[1]]
+
+        site.failing.clear()
+        assert await server.enrich_external_news(urls) == 1
+    run(urls, scenario)
+
+    assert site.fetches == {urls[0]: 1, urls[1]: 2, urls[2]: 1}
+
+
+def test_internal_addresses_are_not_fetched(enrichment):
+    site, run = enrichment
+    urls = ["http://127.0.0.1:8001/api/donations", "https://www.dian.gov.co/moved", "https://www.dian.gov.co/boletin"]
+    site.redirects = {
+        "https://www.dian.gov.co/moved": "http://169.254.169.254/latest/meta-data/",
+        "https://www.dian.gov.co/boletin": "/prensa/boletin",
+    }
+
+    async def scenario(storage):
+        assert await server.enrich_external_news(urls) == 3
+        items, _ = await storage.external_news.page(None, None, None, 20, None, None)
+        summaries = {item["url"]: item.get("summary") for item in items}
+        assert summaries == {urls[0]: None, urls[1]: None, urls[2]: "La DIAN anuncia nuevas medidas."}
+    run(urls, scenario)
+
+    assert set(site.fetches) == {urls[1], urls[2], "https://www.dian.gov.co/prensa/boletin"}
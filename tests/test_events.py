@@ -0,0 +1,81 @@
+"""Admin event stream: change stream payloads and stream tickets"""
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+import server
+
+
+def test_change_stream_events_match_published_ones():
+    oid = ObjectId()
+    inserted = {"operationType": "insert", "ns": {"coll": "news"},
+                "fullDocument": {"_id": oid, "id": "news-1", "title": "Noticia"}}
+    assert server.change_event(inserted) == ("news.created", {"id": "news-1", "title": "Noticia"})
+
+    deleted = {"operationType": "delete", "ns": {"coll": "news"}, "documentKey": {"_id": oid},
+               "fullDocumentBeforeChange": {"_id": oid, "id": "news-1", "title": "Noticia"}}
+    assert server.change_event(deleted) == ("news.deleted", {"id": "news-1"})
+
+    # Without pre-images the shape stays the same
+    del deleted["fullDocumentBeforeChange"]
+    assert server.change_event(deleted) == ("news.deleted", {"id": None})
+
+
+def open_stream(ticket):
+    return asyncio.run(server.get_current_admin_sse(ticket=ticket, credentials=None))
+
+
+def test_stream_tickets(public_client):
+    token = server.create_token(server.ADMIN_EMAIL)
+    assert public_client.post("/api/admin/events/ticket").status_code == 401
+    response = public_client.post("/api/admin/events/ticket", headers={"Authorization": f"Bearer {token}"})
+    ticket = response.json()["ticket"]
+    assert response.json()["expires_in"] == server.EVENT_TICKET_SECONDS
+
+    assert open_stream(ticket) == server.ADMIN_EMAIL
+    # The admin token is not accepted in the URL, nor the ticket as a bearer token
+    with pytest.raises(HTTPException):
+        open_stream(token)
+    assert public_client.get("/api/contact", headers={"Authorization": f"Bearer {ticket}"}).status_code == 401
+    assert public_client.get("/api/admin/events", params={"token": token}).status_code == 401
+
+
+def test_expired_tickets_are_refused(public_client, monkeypatch):
+    token = server.create_token(server.ADMIN_EMAIL)
+    monkeypatch.setattr(server, "EVENT_TICKET_SECONDS", -1)
+    response = public_client.post("/api/admin/events/ticket", headers={"Authorization": f"Bearer {token}"})
+    ticket = response.json()["ticket"]
+    with pytest.raises(HTTPException):
+        open_stream(ticket)
+
+
+class FakeDatabase:
+    """Answers buildInfo with ``version`` and records commands and watch options"""
+
+    def __init__(self, version):
+        self.version = version
+        self.commands = []
+        self.watched = []
+
+    async def command(self, name, *args, **kwargs):
+        self.commands.append(name)
+        return {"versionArray": self.version} if name == "buildInfo" else {"ok": 1}
+
+    def watch(self, pipeline, **options):
+        self.watched.append(options)
+        raise asyncio.CancelledError
+
+
+@pytest.mark.parametrize("version, pre_images", [([5, 0, 24, 0], False), ([6, 0, 12, 0], True)])
+def test_change_stream_asks_for_pre_images_only_where_supported(monkeypatch, version, pre_images):
+    db = FakeDatabase(version)
+    monkeypatch.setattr(server, "storage", type("FakeStorage", (), {"db": db})())
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(server.watch_change_stream())
+
+    [options] = db.watched
+    assert ("full_document_before_change" in options) == pre_images
+    assert options["full_document"] == "updateLookup"
+    assert db.commands.count("collMod") == (len(server.EVENT_COLLECTIONS) if pre_images else 0)
@@ -0,0 +1,24 @@
+"""RSS feed and sitemap links come from the configured origin only"""
+import pytest
+
+import server
+
+
+@pytest.fixture
+def client(client, monkeypatch):
+    monkeypatch.setattr(server, "SITE_URL", "https://funsomex.org")
+    client.post("/api/news", json={"title": "Noticia", "content": "Texto"})
+    return client
+
+
+@pytest.mark.parametrize("name", ["feed.xml", "sitemap.xml"])
+def test_spoofed_host_does_not_reach_the_links(client, name):
+    body = client.get(f"/api/{name}", headers={"Host": "evil.example"}).text
+    assert "https://funsomex.org/" in body and "evil.example" not in body
+    assert "evil.example" not in client.get(f"/api/{name}").text
+
+
+@pytest.mark.parametrize("name", ["feed.xml", "sitemap.xml"])
+def test_feeds_need_a_configured_origin(client, monkeypatch, name):
+    monkeypatch.setattr(server, "SITE_URL", "")
+    assert client.get(f"/api/{name}", headers={"Host": "evil.example"}).status_code == 503
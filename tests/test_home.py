@@ -0,0 +1,88 @@
+"""The aggregated home page payload: contents, concurrent reads, revalidation"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def client(client):
+    """An admin client with a few news, projects and donations"""
+    storage = server.storage
+    now = datetime.now(timezone.utc)
+    for i in range(5):
+        client.post("/api/news", json={"title": f"Noticia {i}", "content": "Texto largo " * 200})
+        client.post("/api/projects", json={
+            "title": f"Proyecto {i}", "description": "Descripción " * 100,
+            "image_url": f"https://example.com/{i}.jpg", "category": "salud",
+        })
+    client.portal.call(storage.external_news.insert_many, [
+        server.ExternalNews(title=f"Boletín {i}", url=f"https://www.dian.gov.co/b-{i}", source="DIAN",
+                            first_seen=now - timedelta(minutes=i)).model_dump(exclude_none=True)
+        for i in range(8)
+    ])
+    for i, status in enumerate(("completed", "completed", "created")):
+        client.portal.call(storage.donations.insert_one, {
+            "id": f"donation-{i}", "paypal_payment_id": f"PAY-{i}", "amount": 10.0, "currency": "USD",
+            "status": status, "created_at": now.isoformat(),
+        })
+    client.portal.call(server.mark_collection_changed, "external_news", "donations")
+    return client
+
+
+def test_home_matches_the_separate_endpoints(client):
+    home = client.get("/api/home").json()
+
+    assert home["foundation_info"] == client.get("/api/foundation-info").json()
+    assert home["news"] == client.get(f"/api/news?view=card&limit={server.HOME_NEWS}").json()
+    assert home["external_news"] == client.get(
+        f"/api/external-news?view=card&limit={server.HOME_EXTERNAL_NEWS}").json()
+    assert home["projects"] == client.get("/api/projects?view=card").json()[:server.HOME_PROJECTS]
+    assert home["donation_stats"] == {"total_amount": 20.0, "total_donations": 2}
+    assert [n["title"] for n in home["news"]] == ["Noticia 4", "Noticia 3", "Noticia 2"]
+    assert "content" not in home["news"][0] and "description" not in home["projects"][0]
+
+
+def test_home_reads_run_concurrently(client, monkeypatch):
+    storage = server.storage
+    active = max_active = 0
+
+    def slow(func):
+        async def wrapper(*args, **kwargs):
+            nonlocal active, max_active
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            return await func(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(storage.news, "find", slow(storage.news.find))
+    monkeypatch.setattr(storage.projects, "find", slow(storage.projects.find))
+    monkeypatch.setattr(storage.external_news, "page", slow(storage.external_news.page))
+    monkeypatch.setattr(storage.donations, "total", slow(storage.donations.total))
+    client.portal.call(server.mark_collection_changed, "news")
+
+    assert client.get("/api/home").status_code == 200
+    assert max_active == 4
+
+
+def test_home_is_revalidated_until_its_data_changes(client):
+    first = client.get("/api/home", headers={"Accept-Encoding": "br"})
+    assert first.headers["content-encoding"] == "br"
+    assert first.headers["cache-control"] == server.HOME_CACHE_CONTROL
+    etag = first.headers["etag"]
+
+    assert client.get("/api/home", headers={"If-None-Match": etag}).status_code == 304
+
+    # Team members are not on the home page
+    client.post("/api/team", json={"name": "Ana", "role": "Directora", "bio": "Bio"})
+    assert client.get("/api/home", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/api/news", json={"title": "Última hora", "content": "Texto"})
+    changed = client.get("/api/home", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["news"][0]["title"] == "Última hora"
+    assert changed.headers["etag"].removeprefix("W/") != etag.removeprefix("W/")
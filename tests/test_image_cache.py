@@ -0,0 +1,65 @@
+"""Image cache eviction over a directory shared by several workers"""
+import os
+import time
+
+import server
+
+
+def write(cache, name, size, age):
+    """A cached variant of ``size`` bytes last used ``age`` seconds ago"""
+    path = cache.root / "variants" / name
+    path.write_bytes(b"x" * size)
+    used = time.time() - age
+    os.utime(path, (used, used))
+    return path
+
+
+def cached(cache):
+    return sorted(path.name for path in (cache.root / "variants").iterdir())
+
+
+def test_workers_evict_by_shared_last_use(tmp_path):
+    first = server.ImageCache(tmp_path, 1000, grace_seconds=30)
+    second = server.ImageCache(tmp_path, 1000, grace_seconds=30)
+    first.load()
+    second.load()
+    a = write(first, "a.webp", 400, age=300)
+    write(first, "b.webp", 400, age=200)
+
+    # Served by the other worker, which this one has never seen
+    assert second.touch(a)
+    c = write(first, "c.webp", 400, age=0)
+    first.add(c, 400)
+    assert cached(first) == ["a.webp", "c.webp"]
+    assert not first.touch(tmp_path / "variants" / "b.webp")
+
+
+def test_recently_used_files_are_kept_over_budget(tmp_path):
+    cache = server.ImageCache(tmp_path, 1000, grace_seconds=30)
+    cache.load()
+    write(cache, "old.webp", 600, age=120)
+    write(cache, "in-use.webp", 600, age=10)
+    new = write(cache, "new.webp", 600, age=0)
+    cache.add(new, 600)
+    assert cached(cache) == ["in-use.webp", "new.webp"]
+
+
+def test_scans_after_a_share_of_the_budget(tmp_path):
+    cache = server.ImageCache(tmp_path, 5000, grace_seconds=0)
+    cache.load()
+    write(cache, "old.webp", 5000, age=60)
+    small = write(cache, "small.webp", 10, age=0)
+    cache.add(small, 10)
+    # Not enough written since the last scan to look again
+    assert cached(cache) == ["old.webp", "small.webp"]
+    cache.add(write(cache, "large.webp", 100, age=0), 100)
+    assert cached(cache) == ["large.webp", "small.webp"]
+
+
+def test_startup_keeps_temporary_files_of_live_workers(tmp_path):
+    cache = server.ImageCache(tmp_path, 1000)
+    cache.load()
+    write(cache, "abandoned.webp.tmp", 10, age=7200)
+    write(cache, "writing.webp.tmp", 10, age=1)
+    server.ImageCache(tmp_path, 1000).load()
+    assert cached(cache) == ["writing.webp.tmp"]
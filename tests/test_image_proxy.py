@@ -0,0 +1,114 @@
+"""Image proxy: which sources it fetches and how render failures surface"""
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+import server
+
+PUBLIC = "http://93.184.216.34"
+
+
+def png_bytes():
+    out = io.BytesIO()
+    Image.new("RGB", (40, 20), (200, 30, 30)).save(out, "PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def outgoing(tmp_path, monkeypatch):
+    """Outgoing requests go to ``routes`` (path -> response); returns them and the URLs requested"""
+    routes = {}
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return routes.get(request.url.path, httpx.Response(404))
+
+    monkeypatch.setattr(server, "image_cache", server.ImageCache(tmp_path / "cache", 10 * 1024 * 1024))
+    monkeypatch.setattr(server, "http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    # Renders in a thread so tests can replace _render_image_variant
+    monkeypatch.setattr(server, "_image_pool", ThreadPoolExecutor(1))
+    return routes, requested
+
+
+@pytest.fixture
+def app_state(app_state, outgoing):
+    """The app starts with the mock network and image cache in place"""
+    return app_state
+
+
+@pytest.fixture
+def proxy(client, outgoing):
+    client.post("/api/projects", json={
+        "title": "Proyecto", "description": "Descripción", "category": "salud",
+        "image_url": f"{PUBLIC}/foto.png",
+    })
+    return (client, *outgoing)
+
+
+def image_path(url):
+    return f"/api/images?url={url}&w=160&format=jpeg"
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/admin", "http://localhost/admin", "http://10.0.0.5/x", "http://169.254.169.254/latest",
+    "http://[::1]/x", "http://[::ffff:127.0.0.1]/x", "http://0.0.0.0/x",
+])
+def test_internal_hosts_are_rejected(url):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server._check_image_host(url))
+    assert error.value.status_code == 400
+
+
+def test_only_hosts_referenced_by_content_are_proxied(proxy):
+    client, routes, requested = proxy
+    routes["/foto.png"] = httpx.Response(200, headers={"content-type": "image/png"}, content=png_bytes())
+
+    response = client.get(image_path(f"{PUBLIC}/foto.png"))
+    assert response.status_code == 200 and response.headers["content-type"] == "image/jpeg"
+
+    assert client.get(image_path("http://metadata.google.internal/computeMetadata/v1/")).status_code == 403
+    assert client.get(image_path("http://203.0.113.9/otra.png")).status_code == 403
+    assert requested == [f"{PUBLIC}/foto.png"]
+
+
+def test_redirects_into_the_internal_network_are_not_followed(proxy):
+    client, routes, requested = proxy
+    routes["/foto.png"] = httpx.Response(302, headers={"location": "http://127.0.0.1:8001/api/donations"})
+
+    assert client.get(image_path(f"{PUBLIC}/foto.png")).status_code == 400
+    assert requested == [f"{PUBLIC}/foto.png"]
+
+
+def test_render_failures(proxy, monkeypatch):
+    client, routes, _ = proxy
+    routes["/foto.png"] = httpx.Response(200, headers={"content-type": "image/png"}, content=b"not an image")
+    assert client.get(image_path(f"{PUBLIC}/foto.png")).status_code == 415
+
+    def disk_full(*args):
+        raise OSError(28, "No space left on device")
+    monkeypatch.setattr(server, "_render_image_variant", disk_full)
+    assert client.get(image_path(f"{PUBLIC}/foto.png")).status_code == 500
+
+
+def test_enriched_external_news_images_are_proxied(proxy):
+    client, routes, requested = proxy
+    routes["/boletin.png"] = httpx.Response(200, headers={"content-type": "image/png"}, content=png_bytes())
+    source = "http://93.184.216.35/boletin.png"
+    assert client.get(image_path(source)).status_code == 403
+
+    async def enrich():
+        await server.storage.external_news.insert_many([server.ExternalNews(
+            title="Boletín", url="https://www.dian.gov.co/boletin", source="DIAN",
+        ).model_dump(exclude_none=True)])
+        await server.storage.external_news.enrich([("https://www.dian.gov.co/boletin", {"image_url": source})])
+        await server.mark_collection_changed("external_news")
+    client.portal.call(enrich)
+
+    assert client.get(image_path(source)).status_code == 200
+    assert requested == [source]
@@ -0,0 +1,163 @@
+"""Every query the routes make must be served by an index.
+
+The routes run against a storage whose collections record each filter and
+sort they are queried with; each recorded query is then explained and the
+test fails on a full scan (COLLSCAN / SCAN) or an in-memory sort (SORT /
+TEMP B-TREE). SQLite always runs; MongoDB runs when STORAGE_TEST_MONGO_URL
+is set.
+"""
+import os
+import uuid
+from datetime import timedelta
+
+import pytest
+
+import server
+from storage import COLLECTIONS, MongoStorage
+
+MONGO_URL = os.environ.get("STORAGE_TEST_MONGO_URL")
+
+BACKENDS = [
+    "sqlite",
+    pytest.param("mongo", marks=pytest.mark.skipif(not MONGO_URL, reason="STORAGE_TEST_MONGO_URL not set")),
+]
+
+
+class RecordingCollection:
+    """Forwards to a collection, noting the (filter, sort) of every query"""
+
+    def __init__(self, name, target, queries):
+        self.name = name
+        self.target = target
+        self.queries = queries
+
+    def record(self, where, sort=None):
+        self.queries[self.name, repr(where), repr(sort)] = (self.target, where, sort)
+
+    async def find(self, where=None, fields=None, sort=None, limit=0):
+        self.record(where, sort)
+        return await self.target.find(where, fields, sort, limit)
+
+    async def find_one(self, where, fields=None, sort=None):
+        self.record(where, sort)
+        return await self.target.find_one(where, fields, sort)
+
+    async def insert_one(self, doc):
+        return await self.target.insert_one(doc)
+
+    async def update_one(self, where, fields):
+        self.record(where)
+        return await self.target.update_one(where, fields)
+
+    async def delete_one(self, where):
+        self.record(where)
+        return await self.target.delete_one(where)
+
+    async def count(self, where=None):
+        self.record(where)
+        return await self.target.count(where)
+
+    async def total(self, field, where=None):
+        self.record(where)
+        return await self.target.total(field, where)
+
+    async def bulk_write(self, creates, updates, deletes, where=None):
+        for item_id, _ in updates:
+            self.record({**(where or {}), "id": item_id})
+        for item_id in deletes:
+            self.record({"id": item_id})
+        return await self.target.bulk_write(creates, updates, deletes, where)
+
+
+class RecordingArchive:
+    def __init__(self, target, queries):
+        self.target = target
+        self.queries = queries
+
+    async def insert_many(self, docs):
+        return await self.target.insert_many(docs)
+
+    async def page(self, source, since, until, limit, cursor, fields):
+        self.queries["external_news", repr(source), repr((since, until))] = (self.target, source, (since, until))
+        return await self.target.page(source, since, until, limit, cursor, fields)
+
+    async def image_urls(self):
+        return await self.target.image_urls()
+
+
+@pytest.fixture(params=BACKENDS)
+def app_state(request, app_state, monkeypatch):
+    """The app on each backend; no background jobs, so only the routes' own queries are audited"""
+    if request.param == "mongo":
+        name = f"funsomex_audit_{uuid.uuid4().hex[:12]}"
+        monkeypatch.setattr(server, "create_storage", lambda: MongoStorage(MONGO_URL, name, timedelta(days=30)))
+    return request.param
+
+
+def test_route_queries_use_indexes(app_state, paypal, client):
+    queries = {}
+    storage = server.storage
+    for name in COLLECTIONS:
+        setattr(storage, name, RecordingCollection(name, getattr(storage, name), queries))
+    storage.external_news = RecordingArchive(storage.external_news, queries)
+
+    news = client.post("/api/news", json={"title": "Noticia", "content": "Texto", "category": "comunidad"}).json()
+    member = client.post("/api/team", json={"name": "Ana", "role": "Directora", "bio": "Bio"}).json()
+    project = client.post("/api/projects", json={
+        "title": "Proyecto", "description": "Descripción", "image_url": "https://example.com/p.jpg",
+        "category": "salud",
+    }).json()
+    contact = client.post("/api/contact", json={
+        "name": "Luis", "email": "luis@example.com", "subject": "Hola", "message": "Mensaje",
+    }).json()
+    client.portal.call(storage.donations.insert_one, {
+        "id": "donation-1", "paypal_payment_id": "PAY-1", "amount": 5.0, "currency": "USD",
+        "status": "created", "created_at": "2026-01-01T00:00:00+00:00",
+    })
+    paypal.states["PAY-1"] = "approved"
+
+    requests = [
+        ("GET", "/api/news", None),
+        ("GET", "/api/news?category=comunidad", None),
+        ("GET", "/api/news?view=card", None),
+        ("GET", f"/api/news/{news['id']}", None),
+        ("PUT", f"/api/news/{news['id']}", {"title": "Noticia editada"}),
+        ("POST", "/api/news/bulk", {"update": [{"id": news["id"], "category": "general"}]}),
+        ("GET", "/api/external-news", None),
+        ("GET", "/api/external-news/archive?source=DIAN", None),
+        ("GET", "/api/team", None),
+        ("PUT", "/api/team/reorder", {"ids": [member["id"]]}),
+        ("GET", "/api/projects", None),
+        ("GET", "/api/projects?category=salud&view=card", None),
+        ("GET", "/api/feed.xml", None),
+        ("GET", "/api/sitemap.xml", None),
+        ("GET", "/api/home", None),
+        ("GET", "/api/contact", None),
+        ("PUT", f"/api/contact/{contact['id']}/read", None),
+        ("GET", "/api/donations", None),
+        ("GET", "/api/donations/stats", None),
+        ("POST", "/api/donations/execute-payment?payment_id=PAY-1&payer_id=PAYER", None),
+        ("DELETE", f"/api/news/{news['id']}", None),
+        ("DELETE", f"/api/team/{member['id']}", None),
+        ("DELETE", f"/api/projects/{project['id']}", None),
+    ]
+    for method, path, body in requests:
+        response = client.request(method, path, json=body)
+        assert response.status_code < 500, f"{method} {path}: {response.text}"
+    client.portal.call(server.reconcile_stale_donations)
+
+    problems = {}
+    for (name, _, _), (target, where, sort) in queries.items():
+        if name == "external_news":
+            found = client.portal.call(target.explain, where, *sort)
+        else:
+            found = client.portal.call(target.explain, where, sort)
+        if found:
+            problems[f"{name} {where!r} sort={sort!r}"] = found
+    if app_state == "mongo":
+        client.portal.call(storage.client.drop_database, storage.name)
+
+    assert len(queries) >= 15
+    assert not problems, "queries without a usable index:\n" + "\n".join(
+        f"  {query}: {found}" for query, found in problems.items()
+    )
@@ -0,0 +1,33 @@
+"""List views and the generated summaries their cards show"""
+from fastapi.testclient import TestClient
+
+import server
+
+
+def test_editing_the_text_regenerates_the_summary(client):
+    news = client.post("/api/news", json={"title": "Noticia", "content": "Texto original"}).json()
+    custom = client.post("/api/news", json={"title": "Otra", "content": "Texto", "summary": "Resumen propio"}).json()
+
+    assert client.put(f"/api/news/{news['id']}", json={"content": "Texto   nuevo"}).json()["summary"] == "Texto nuevo"
+    assert client.put(f"/api/news/{news['id']}", json={"content": "Otro texto", "summary": "A mano"}).json()[
+        "summary"] == "A mano"
+    client.post("/api/news/bulk", json={"update": [{"id": news["id"], "content": "Desde bulk"},
+                                                   {"id": custom["id"], "title": "Solo título"}]})
+    cards = {card["id"]: card["summary"] for card in client.get("/api/news?view=card").json()}
+    assert cards == {news["id"]: "Desde bulk", custom["id"]: "Resumen propio"}
+
+    project = client.post("/api/projects", json={
+        "title": "Proyecto", "description": "Descripción vieja", "image_url": "https://example.com/p.jpg",
+        "category": "salud",
+    }).json()
+    client.post("/api/projects/bulk", json={"update": [{"id": project["id"], "description": "Descripción nueva"}]})
+    assert client.get("/api/projects?view=card").json()[0]["summary"] == "Descripción nueva"
+
+
+def test_full_view_does_not_fall_back_to_cards(client):
+    client.portal.call(server.storage.news.insert_one, {
+        "id": "broken", "title": "Sin contenido", "published_date": "2026-01-01T00:00:00+00:00",
+    })
+    assert client.get("/api/news?view=card").status_code == 200
+    # Same running app, but errors come back as responses
+    assert TestClient(server.app, raise_server_exceptions=False).get("/api/news").status_code == 500
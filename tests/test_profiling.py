@@ -0,0 +1,84 @@
+"""Opt-in request profiling: triggers, timed calls, the report ring buffer"""
+import asyncio
+import json
+import pstats
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+
+@pytest.fixture
+def profiled(app_state, tmp_path, monkeypatch):
+    """A client for the app wrapped in the profiling middleware"""
+    store = server.ProfileStore(tmp_path / "profiles", 2)
+    monkeypatch.setattr(server, "profile_store", store)
+    monkeypatch.setattr(server, "PROFILING", True)
+    app = server.ProfilingMiddleware(server.app, sample_rate=0, store=store)
+    with TestClient(app) as client:
+        yield client, store
+
+
+def test_profiles_only_requests_that_ask(profiled):
+    client, store = profiled
+    token = server.create_token(server.ADMIN_EMAIL)
+
+    assert client.get("/api/news").status_code == 200
+    assert client.get("/api/news", headers={"X-Profile": "not-a-token"}).status_code == 200
+    assert store.list() == []
+
+    assert client.get("/api/news?category=general", headers={"X-Profile": token}).status_code == 200
+    [summary] = store.list()
+    assert summary["path"] == "/api/news" and summary["status"] == 200 and summary["trigger"] == "header"
+
+    report = json.loads(store.path(summary["id"], "json").read_text())
+    assert report["query"] == "category=general"
+    assert any(call["kind"] == "db" and call["name"] == "find news" for call in report["calls"])
+    assert report["call_totals"]["db"]["count"] == len(report["calls"])
+    assert report["functions"] and report["functions"][0]["cumulative_ms"] >= report["functions"][-1]["cumulative_ms"]
+
+
+def test_report_ring_buffer_and_admin_routes(profiled):
+    client, store = profiled
+    token = server.create_token(server.ADMIN_EMAIL)
+    for path in ("/api/news", "/api/team", "/api/projects"):
+        client.get(path, headers={"X-Profile": token})
+
+    assert len(list(store.root.glob("*.json"))) == 2
+    assert len(list(store.root.glob("*.pstats"))) == 2
+
+    auth = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/admin/profiles").status_code == 401
+    listed = client.get("/api/admin/profiles", headers=auth).json()
+    assert [item["path"] for item in listed] == ["/api/projects", "/api/team"]
+
+    report = client.get(f"/api/admin/profiles/{listed[0]['id']}", headers=auth)
+    assert report.status_code == 200 and report.json()["id"] == listed[0]["id"]
+    stats = client.get(f"/api/admin/profiles/{listed[0]['id']}?format=pstats", headers=auth)
+    assert stats.status_code == 200
+    stats_path = store.root / "download.pstats"
+    stats_path.write_bytes(stats.content)
+    assert pstats.Stats(str(stats_path)).total_calls > 0
+
+    assert client.get("/api/admin/profiles/../../server.py", headers=auth).status_code == 404
+    assert client.get("/api/admin/profiles/20260101T000000000000-deadbeef", headers=auth).status_code == 404
+
+
+def test_outgoing_http_calls_are_timed():
+    async def scenario():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, text="ok"))
+        hooks = {"request": [server.http_request_started], "response": [server.http_response_received]}
+        async with httpx.AsyncClient(transport=transport, event_hooks=hooks) as client:
+            await client.get("https://example.com/outside")
+            calls = []
+            token = server.profile_calls.set(calls)
+            try:
+                await client.get("https://example.com/inside")
+            finally:
+                server.profile_calls.reset(token)
+        return calls
+
+    [(kind, name, _, seconds)] = asyncio.run(scenario())
+    assert kind == "http" and name == "GET example.com/inside" and seconds >= 0
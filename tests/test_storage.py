@@ -0,0 +1,379 @@
+"""Contract tests every storage backend must pass.
+
+SQLite always runs. MongoDB runs when STORAGE_TEST_MONGO_URL points at a
+server; each test uses a throwaway database that is dropped afterwards.
+"""
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from storage import MongoStorage, SQLiteStorage
+
+MONGO_URL = os.environ.get("STORAGE_TEST_MONGO_URL")
+RETENTION = timedelta(days=30)
+
+BACKENDS = [
+    "sqlite",
+    pytest.param("mongo", marks=pytest.mark.skipif(not MONGO_URL, reason="STORAGE_TEST_MONGO_URL not set")),
+]
+
+
+@pytest.fixture(params=BACKENDS)
+def contract(request, tmp_path):
+    """Run an async scenario against a fresh, connected storage"""
+    def run(scenario):
+        async def main():
+            if request.param == "sqlite":
+                storage = SQLiteStorage(str(tmp_path / "contract.db"), RETENTION)
+            else:
+                storage = MongoStorage(MONGO_URL, f"funsomex_contract_{uuid.uuid4().hex[:12]}", RETENTION)
+            await storage.connect()
+            try:
+                await scenario(storage)
+            finally:
+                if request.param == "mongo":
+                    await storage.client.drop_database(storage.name)
+                await storage.close()
+        asyncio.run(main())
+    return run
+
+
+def news_doc(i, **fields):
+    return {
+        "id": f"news-{i}",
+        "title": f"Noticia {i}",
+        "category": "general" if i % 2 else "proyectos",
+        "published_date": f"2026-01-{i + 1:02d}T10:00:00+00:00",
+        "is_external": False,
+        **fields,
+    }
+
+
+def test_find_sort_limit_and_fields(contract):
+    async def scenario(storage):
+        for i in range(5):
+            await storage.news.insert_one(news_doc(i))
+        docs = await storage.news.find(sort=[("published_date", -1)], limit=3)
+        assert [doc["id"] for doc in docs] == ["news-4", "news-3", "news-2"]
+        assert docs[0] == news_doc(4)
+
+        cards = await storage.news.find({"category": "general"}, ["id", "title"], sort=[("published_date", 1)])
+        assert cards == [{"id": "news-1", "title": "Noticia 1"}, {"id": "news-3", "title": "Noticia 3"}]
+
+        assert await storage.news.find_one({"id": "news-2"}) == news_doc(2)
+        assert await storage.news.find_one({"id": "missing"}) is None
+        latest = await storage.news.find_one({}, ["published_date"], sort=[("published_date", -1)])
+        assert latest == {"published_date": news_doc(4)["published_date"]}
+    contract(scenario)
+
+
+def test_filter_operators(contract):
+    async def scenario(storage):
+        await storage.news.insert_one(news_doc(0, summary="Resumen"))
+        await storage.news.insert_one(news_doc(1, summary=None))
+        await storage.news.insert_one(news_doc(2))
+
+        def ids(docs):
+            return sorted(doc["id"] for doc in docs)
+
+        # None matches both null and missing fields
+        assert ids(await storage.news.find({"summary": None})) == ["news-1", "news-2"]
+        assert ids(await storage.news.find({"summary": {"$exists": True}})) == ["news-0", "news-1"]
+        assert ids(await storage.news.find({"summary": {"$exists": False}})) == ["news-2"]
+        assert ids(await storage.news.find({"id": {"$in": ["news-0", "news-2", "nope"]}})) == ["news-0", "news-2"]
+        assert await storage.news.find({"id": {"$in": []}}) == []
+        assert ids(await storage.news.find({"published_date": {"$gte": "2026-01-02", "$lt": "2026-01-03"}})) == ["news-1"]
+        assert ids(await storage.news.find({"is_external": False, "category": "proyectos"})) == ["news-0", "news-2"]
+        assert await storage.news.count() == 3
+        assert await storage.news.count({"category": "general"}) == 1
+    contract(scenario)
+
+
+def test_insert_update_delete(contract):
+    async def scenario(storage):
+        await storage.team.insert_one({"id": "m1", "name": "Ana", "order": 0})
+        with pytest.raises(DuplicateKeyError):
+            await storage.team.insert_one({"id": "m1", "name": "Otra", "order": 1})
+
+        assert await storage.team.update_one({"id": "m1"}, {"order": 3, "email": None})
+        assert await storage.team.find_one({"id": "m1"}) == {"id": "m1", "name": "Ana", "order": 3, "email": None}
+        assert not await storage.team.update_one({"id": "m2"}, {"order": 1})
+
+        assert await storage.team.delete_one({"id": "m1"})
+        assert not await storage.team.delete_one({"id": "m1"})
+        assert await storage.team.count() == 0
+    contract(scenario)
+
+
+def test_total(contract):
+    async def scenario(storage):
+        assert await storage.donations.total("amount", {"status": "completed"}) == (0, 0)
+        for i, (amount, status) in enumerate([(10.0, "completed"), (5.5, "completed"), (99.0, "created")]):
+            await storage.donations.insert_one({"id": f"d{i}", "amount": amount, "status": status})
+        assert await storage.donations.total("amount", {"status": "completed"}) == (15.5, 2)
+    contract(scenario)
+
+
+def test_bulk_write_reports_failures_by_index(contract):
+    async def scenario(storage):
+        await storage.projects.insert_one({"id": "p1", "title": "Uno"})
+        await storage.projects.insert_one({"id": "p2", "title": "Dos"})
+        errors = await storage.projects.bulk_write(
+            [{"id": "p3", "title": "Tres"}, {"id": "p1", "title": "Duplicado"}],
+            [("p2", {"title": "Dos bis"})],
+            ["p1"],
+        )
+        assert list(errors) == [1]
+        docs = await storage.projects.find(sort=[("id", 1)])
+        assert docs == [{"id": "p2", "title": "Dos bis"}, {"id": "p3", "title": "Tres"}]
+        assert await storage.projects.bulk_write([], [], []) == {}
+    contract(scenario)
+
+
+def test_bulk_write_updates_only_matching_items(contract):
+    async def scenario(storage):
+        await storage.donations.insert_one({"id": "d1", "status": "created"})
+        await storage.donations.insert_one({"id": "d2", "status": "completed"})
+        errors = await storage.donations.bulk_write(
+            [], [("d1", {"status": "failed"}), ("d2", {"status": "failed"})], [], {"status": "created"},
+        )
+        assert errors == {}
+        docs = await storage.donations.find(sort=[("id", 1)])
+        assert [doc["status"] for doc in docs] == ["failed", "completed"]
+    contract(scenario)
+
+
+def test_external_news_pages(contract):
+    async def scenario(storage):
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        # Items inserted in the same refresh share first_seen
+        await storage.external_news.insert_many([
+            {"title": f"Externa {i}", "url": f"https://example.gov.co/{i}", "source": "A" if i % 2 else "B",
+             "date": None, "first_seen": now - timedelta(hours=i // 3)}
+            for i in range(10)
+        ])
+
+        seen, cursor = [], None
+        while True:
+            items, cursor = await storage.external_news.page(None, None, None, 4, cursor, ["title"])
+            seen += [item["title"] for item in items]
+            if cursor is None:
+                break
+        assert len(seen) == 10 and len(set(seen)) == 10
+        # Newest refresh first
+        assert set(seen[:3]) == {"Externa 0", "Externa 1", "Externa 2"}
+
+        items, cursor = await storage.external_news.page("A", now - timedelta(hours=1), None, 10, None, None)
+        assert sorted(item["url"] for item in items) == [f"https://example.gov.co/{i}" for i in (1, 3, 5)]
+        assert cursor is None
+        items, _ = await storage.external_news.page(None, None, now - timedelta(hours=2), 10, None, ["title"])
+        assert sorted(item["title"] for item in items) == ["Externa 9"]
+
+        with pytest.raises(ValueError):
+            await storage.external_news.page(None, None, None, 4, "not-a-cursor", None)
+    contract(scenario)
+
+
+def test_external_news_inserts_skip_stored_urls(contract):
+    async def scenario(storage):
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+
+        def item(i):
+            return {"title": f"Externa {i}", "url": f"https://example.gov.co/{i}", "source": "A", "first_seen": now}
+
+        assert await storage.external_news.insert_many([item(0), item(1)]) == [item(0), item(1)]
+        assert await storage.external_news.insert_many([item(1), item(2)]) == [item(2)]
+        assert await storage.external_news.insert_many([]) == []
+        items, _ = await storage.external_news.page(None, None, None, 10, None, ["url"])
+        assert sorted(doc["url"] for doc in items) == [f"https://example.gov.co/{i}" for i in range(3)]
+    contract(scenario)
+
+
+def test_external_news_enrichment(contract):
+    async def scenario(storage):
+        now = datetime.now(timezone.utc)
+        urls = [f"https://example.gov.co/{i}" for i in range(3)]
+        await storage.external_news.insert_many([
+            {"title": f"Externa {i}", "url": url, "source": "A", "first_seen": now} for i, url in enumerate(urls)
+        ])
+        assert sorted(await storage.external_news.unenriched(urls + ["https://example.gov.co/x"])) == urls
+        assert await storage.external_news.unenriched([]) == []
+
+        await storage.external_news.enrich([
+            (urls[0], {"summary": "Resumen", "image_url": "https://example.gov.co/a.jpg", "enriched_at": now}),
+            (urls[1], {"enriched_at": now}),
+        ])
+        assert await storage.external_news.unenriched(urls) == [urls[2]]
+        items, _ = await storage.external_news.page(None, None, None, 10, None, ["url", "title", "summary"])
+        by_url = {item["url"]: item for item in items}
+        assert by_url[urls[0]]["summary"] == "Resumen" and by_url[urls[0]]["title"] == "Externa 0"
+        assert "summary" not in by_url[urls[1]]
+        assert await storage.external_news.image_urls() == ["https://example.gov.co/a.jpg"]
+    contract(scenario)
+
+
+def test_cache_versions(contract):
+    async def scenario(storage):
+        assert await storage.bump_version("news") == 1
+        assert await storage.bump_version("news") == 2
+        assert await storage.bump_version("team") == 1
+        assert await storage.load_versions() == {"news": 2, "team": 1}
+    contract(scenario)
+
+
+def test_leases(contract):
+    async def scenario(storage):
+        assert await storage.acquire_lease("news-refresh", "a", 60)
+        assert await storage.acquire_lease("news-refresh", "a", 60)
+        assert not await storage.acquire_lease("news-refresh", "b", 60)
+        await storage.release_leases("a")
+        assert await storage.acquire_lease("news-refresh", "b", 0.01)
+        await asyncio.sleep(0.05)
+        # An expired lease can be taken over
+        assert await storage.acquire_lease("news-refresh", "a", 60)
+    contract(scenario)
+
+
+def test_seen_set(contract):
+    async def scenario(storage):
+        now = datetime.now(timezone.utc)
+        entries = [
+            {"key": "k1", "url": "u1", "source": "A", "simhash": "00ff", "bands": ["0:ff", "1:0"], "first_seen": now},
+            {"key": "k2", "url": "u2", "source": "A", "simhash": None, "bands": [], "first_seen": now},
+        ]
+        assert await storage.record_seen(entries) == set()
+        assert await storage.record_seen([{**entries[1], "url": "otra"}, {**entries[0], "key": "k3"}]) == {0}
+
+        found = await storage.find_seen(["k2"], ["1:0"])
+        assert sorted(doc["key"] for doc in found) == ["k1", "k2", "k3"]
+        assert {doc["key"]: doc["simhash"] for doc in found}["k1"] == "00ff"
+        assert await storage.find_seen([], []) == []
+    contract(scenario)
+
+
+def test_rendered_feeds(contract):
+    async def scenario(storage):
+        assert await storage.load_rendered("feed.xml") is None
+        doc = {"body": b"<rss/>", "etag": '"abc"', "last_modified": datetime(2026, 1, 1, tzinfo=timezone.utc),
+               "versions": {"news": 1}}
+        await storage.save_rendered("feed.xml", doc)
+        await storage.save_rendered("feed.xml", {**doc, "versions": {"news": 2}})
+        stored = await storage.load_rendered("feed.xml")
+        assert stored["body"] == b"<rss/>" and stored["etag"] == '"abc"' and stored["versions"] == {"news": 2}
+    contract(scenario)
+
+
+def test_checkpoints(contract):
+    async def scenario(storage):
+        assert await storage.load_checkpoint("batch") is None
+        await storage.save_checkpoint("batch", {"created_at": "2026-01-01T00:00:00+00:00", "id": "a"})
+        await storage.save_checkpoint("batch", {"created_at": "2026-01-02T00:00:00+00:00", "id": "b"})
+        assert await storage.load_checkpoint("batch") == {"created_at": "2026-01-02T00:00:00+00:00", "id": "b"}
+        await storage.save_checkpoint("batch", None)
+        assert await storage.load_checkpoint("batch") is None
+        await storage.save_checkpoint("other", None)
+    contract(scenario)
+
+
+def test_sqlite_expire(tmp_path):
+    async def scenario():
+        storage = SQLiteStorage(str(tmp_path / "expire.db"), RETENTION)
+        await storage.connect()
+        now = datetime.now(timezone.utc)
+        await storage.external_news.insert_many([
+            {"title": "Vieja", "url": "u1", "source": "A", "first_seen": now - RETENTION - timedelta(days=1)},
+            {"title": "Nueva", "url": "u2", "source": "A", "first_seen": now},
+        ])
+        await storage.expire()
+        items, _ = await storage.external_news.page(None, None, None, 10, None, ["title"])
+        assert [item["title"] for item in items] == ["Nueva"]
+        await storage.close()
+    asyncio.run(scenario())
+
+
+def job_doc(kind, priority=0, dedupe_key=None, run_at=None):
+    now = datetime.now(timezone.utc)
+    return {
+        "id": uuid.uuid4().hex, "kind": kind, "payload": {"n": 1}, "priority": priority,
+        "dedupe_key": dedupe_key, "status": "queued", "attempts": 0, "run_at": run_at or now,
+        "last_error": None, "created_at": now, "finished_at": None,
+    }
+
+
+def test_jobs_claim_by_priority_then_age(contract):
+    async def scenario(storage):
+        now = datetime.now(timezone.utc)
+        low, _ = await storage.enqueue_job(job_doc("low", 0, run_at=now - timedelta(minutes=5)))
+        high, _ = await storage.enqueue_job(job_doc("high", 10))
+        later, _ = await storage.enqueue_job(job_doc("later", 10, run_at=now + timedelta(hours=1)))
+        first = await storage.claim_job("w1", 60)
+        assert first["id"] == high and first["attempts"] == 1 and first["status"] == "running"
+        assert first["payload"] == {"n": 1}
+        assert (await storage.claim_job("w2", 60))["id"] == low
+        # Not due yet
+        assert await storage.claim_job("w3", 60) is None
+        assert (await storage.get_job(later))["status"] == "queued"
+    contract(scenario)
+
+
+def test_jobs_dedupe_queued(contract):
+    async def scenario(storage):
+        first, created = await storage.enqueue_job(job_doc("scrape", 0, "scrape"))
+        assert created
+        again, created = await storage.enqueue_job(job_doc("scrape", 10, "scrape"))
+        assert (again, created) == (first, False)
+        # The merged job keeps the higher priority
+        assert (await storage.get_job(first))["priority"] == 10
+        assert (await storage.claim_job("w1", 60))["id"] == first
+        # Once running, an identical job can be queued again
+        second, created = await storage.enqueue_job(job_doc("scrape", 0, "scrape"))
+        assert created and second != first
+        # Two jobs without a key never merge
+        assert (await storage.enqueue_job(job_doc("x")))[1] and (await storage.enqueue_job(job_doc("x")))[1]
+    contract(scenario)
+
+
+def test_jobs_finish_retry_and_ownership(contract):
+    async def scenario(storage):
+        job_id, _ = await storage.enqueue_job(job_doc("a"))
+        await storage.claim_job("w1", 60)
+        assert await storage.extend_job_lease(job_id, "w1", 60)
+        assert not await storage.extend_job_lease(job_id, "w2", 60)
+        assert not await storage.finish_job(job_id, "w2", "done")
+
+        assert await storage.retry_job(job_id, "w1", datetime.now(timezone.utc) - timedelta(seconds=1), "boom")
+        job = await storage.get_job(job_id)
+        assert job["status"] == "queued" and job["last_error"] == "boom" and job["lease_owner"] is None
+        assert (await storage.claim_job("w2", 60))["attempts"] == 2
+        assert await storage.finish_job(job_id, "w2", "done")
+        job = await storage.get_job(job_id)
+        assert job["status"] == "done" and job["finished_at"] is not None and job["last_error"] is None
+        assert not await storage.finish_job(job_id, "w2", "failed", "late")
+        assert await storage.get_job("missing") is None
+    contract(scenario)
+
+
+def test_jobs_expired_lease_is_reclaimed(contract):
+    async def scenario(storage):
+        job_id, _ = await storage.enqueue_job(job_doc("a"))
+        await storage.claim_job("w1", 0.01)
+        await asyncio.sleep(0.05)
+        job = await storage.claim_job("w2", 60)
+        assert job["id"] == job_id and job["attempts"] == 2
+        # The first consumer lost it
+        assert not await storage.finish_job(job_id, "w1", "done")
+    contract(scenario)
+
+
+def test_jobs_retry_into_queued_duplicate_cancels(contract):
+    async def scenario(storage):
+        job_id, _ = await storage.enqueue_job(job_doc("scrape", dedupe_key="scrape"))
+        await storage.claim_job("w1", 60)
+        await storage.enqueue_job(job_doc("scrape", dedupe_key="scrape"))
+        assert await storage.retry_job(job_id, "w1", datetime.now(timezone.utc), "boom")
+        assert (await storage.get_job(job_id))["status"] == "cancelled"
+    contract(scenario)